@@ -3,10 +3,21 @@ from flask import Flask, render_template, redirect, url_for
 from flask_login import LoginManager, current_user
 from dotenv import load_dotenv
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from backend.database.db_setup import setup_db
-from backend.database.models import User
-from backend.routes import auth_bp, contact_bp, lead_bp, order_bp, invoice_bp, receipt_bp, accounting_bp
+from backend.database.stats import get_stats
+from backend.database.activity import recent_activity, describe
+from backend.routes import auth_bp, contact_bp, lead_bp, order_bp, invoice_bp, receipt_bp, accounting_bp, change_bp, stream_bp, dashboard_bp, activity_bp, metrics_bp, token_bp
 from backend.config import config
+from backend.commands import register_commands
+from backend.utils.broker import init_broker
+from backend.utils.analytics import init_analytics
+from backend.utils.cache import init_cache
+from backend.utils.report_cache import init_report_cache
+from backend.utils.user_cache import init_user_cache
+from backend.utils.tokens import init_tokens
+from backend.utils.passwords import init_passwords
+from backend.utils.replicas import init_replicas
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +29,11 @@ def create_app(config_name='default'):
     # Configure the app
     app.config.from_object(config[config_name])
     
+    # Behind a reverse proxy, request.remote_addr (and so the login throttle) should see the client
+    hops = app.config['PROXY_FIX_HOPS']
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    
     # Set up CORS
     CORS(app, 
          supports_credentials=True, 
@@ -44,9 +60,18 @@ def create_app(config_name='default'):
     login_manager.login_view = 'auth.login'
     login_manager.init_app(app)
     
+    # Password hashing off the request threads, and the failed-login throttle
+    init_passwords(app)
+    
+    # current_user is a cached, detached copy of the user's profile
+    user_cache = init_user_cache(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return user_cache.get(int(user_id))
+
+    # Integrations can send `Authorization: Bearer <token>` instead of a session cookie
+    init_tokens(app, login_manager)
     
     # Register blueprints
     app.register_blueprint(auth_bp)
@@ -56,12 +81,42 @@ def create_app(config_name='default'):
     app.register_blueprint(invoice_bp)
     app.register_blueprint(receipt_bp)
     app.register_blueprint(accounting_bp)
+    app.register_blueprint(change_bp)
+    app.register_blueprint(stream_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(activity_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(token_bp)
+    
+    # Fan committed changes out to /api/stream
+    init_broker(app)
+    init_analytics(app)
+    init_cache(app)
+    init_report_cache(app)
+    
+    # Read-only requests read from the replicas, if any
+    init_replicas(app, db)
+    
+    # Register CLI commands
+    register_commands(app)
     
     # Home route
     @app.route('/')
     def index():
         if current_user.is_authenticated:
-            return render_template('index.html')
+            stats = get_stats(current_user.id)
+            activity = [{
+                'title': entry.title,
+                'time': entry.created_at.strftime('%Y-%m-%d %H:%M'),
+                'description': describe(entry),
+                'user': current_user.name
+            } for entry in recent_activity(current_user.id, app.config['ACTIVITY_RETENTION_DAYS'])]
+            return render_template('index.html',
+                                   contacts_count=stats.contacts_count,
+                                   leads_count=stats.leads_count,
+                                   orders_count=stats.orders_count,
+                                   invoices_count=stats.invoices_count,
+                                   recent_activity=activity)
         return redirect(url_for('auth.login'))
     
     return app
@@ -0,0 +1,88 @@
+import click
+from backend.database.index_check import check_indexes
+from backend.database.stats import rebuild_stats
+from backend.database.activity import prune_activity
+from backend.database.payments import payment_mismatches, payment_status, repair_payments
+from backend.database.rollups import rollup_mismatches, rebuild_rollups
+from backend.database.replicas import copy_to_replicas
+from backend.database.engine import replica_binds
+from backend.database.models import db
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+
+    @app.cli.command('check-indexes')
+    def check_indexes_command():
+        """EXPLAIN the hot per-user queries and verify each one uses its index."""
+        failures = 0
+        for name, ok, plan in check_indexes():
+            click.echo(f"{'OK  ' if ok else 'FAIL'} {name}")
+            if not ok:
+                failures += 1
+                click.echo(f'     {plan}')
+
+        if failures:
+            raise click.ClickException(f'{failures} hot queries are not using their index')
+    
+    @app.cli.command('repair-stats')
+    @click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+    def repair_stats_command(user_id):
+        """Recompute the per-user counters from the base tables."""
+        count = rebuild_stats(user_id)
+        click.echo(f'Rebuilt stats for {count} user(s)')
+    
+    @app.cli.command('prune-activity')
+    def prune_activity_command():
+        """Delete activity older than ACTIVITY_RETENTION_DAYS."""
+        count = prune_activity(app.config['ACTIVITY_RETENTION_DAYS'])
+        click.echo(f'Deleted {count} activity row(s)')
+    
+    @app.cli.command('repair-payments')
+    @click.option('--user-id', type=int, default=None, help='Only check this user.')
+    @click.option('--check', is_flag=True, help='Report drifted invoices without changing them.')
+    def repair_payments_command(user_id, check):
+        """Verify each invoice's amount_paid and status against its receipts and repair any drift."""
+        if check:
+            mismatches = [(invoice.invoice_number, invoice.amount_paid, expected,
+                           invoice.status, payment_status(expected, invoice.amount))
+                          for invoice, expected in payment_mismatches(user_id)]
+        else:
+            mismatches = repair_payments(user_id)
+        for number, stored, expected, stored_status, expected_status in mismatches:
+            click.echo(f'{number}: amount_paid {stored:.2f}, receipts total {expected:.2f}, '
+                       f'status {stored_status} (expected {expected_status})')
+
+        if check and mismatches:
+            raise click.ClickException(f'{len(mismatches)} invoice(s) have drifted from their receipts')
+        click.echo(f"{'Found' if check else 'Repaired'} {len(mismatches)} drifted invoice(s)")
+    
+    @app.cli.command('repair-rollups')
+    @click.option('--user-id', type=int, default=None, help='Only this user.')
+    @click.option('--check', is_flag=True, help='Report drifted day totals without changing them.')
+    def repair_rollups_command(user_id, check):
+        """Verify the daily accounting totals against the entries, or rebuild them."""
+        if not check:
+            count = rebuild_rollups(user_id)
+            click.echo(f'Rebuilt {count} day total(s)')
+            return
+
+        mismatches = rollup_mismatches(user_id)
+        for (uid, day, entry_type, category), stored, expected in mismatches:
+            click.echo(f'user {uid} {day} {entry_type}/{category}: '
+                       f'stored {stored[0]:.2f} in {stored[1]}, entries {expected[0]:.2f} in {expected[1]}')
+        if mismatches:
+            raise click.ClickException(f'{len(mismatches)} day total(s) have drifted from the entries')
+        click.echo('Daily accounting totals match the entries')
+    
+    @app.cli.command('sync-replicas')
+    def sync_replicas_command():
+        """Copy the SQLite primary over each SQLite replica file (for trying replicas out locally)."""
+        replicas = [db.engines[key].url for key in replica_binds(app.config)]
+        if not replicas:
+            raise click.ClickException('No REPLICA_DATABASE_URLS are configured')
+        try:
+            copied = copy_to_replicas(db.engine.url, replicas)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        for path in copied:
+            click.echo(f'Copied the primary to {path}')
@@ -13,6 +13,86 @@ class Config:
     SESSION_PERMANENT = False
     DEBUG = False
     TESTING = False
+    
+    # Change notifications for /api/stream: 'local' (single process) or
+    # 'unix' (every gunicorn worker on the host, via sockets in EVENT_BROKER_PATH)
+    EVENT_BROKER = os.environ.get('EVENT_BROKER', 'local')
+    EVENT_BROKER_PATH = os.environ.get('EVENT_BROKER_PATH', '/tmp/swiftcrm-events')
+    # Seconds between keep-alive comments, and before a stream is closed for the client to reconnect
+    STREAM_HEARTBEAT = 15
+    STREAM_LIFETIME = 300
+    # Open streams allowed per process; past it /api/stream answers 503. Each open
+    # stream holds one of the worker's request threads (GUNICORN_THREADS), so keep
+    # this well below them to leave threads for regular requests
+    STREAM_MAX_PER_PROCESS = int(os.environ.get('STREAM_MAX_PER_PROCESS', 50))
+    # Days of history kept in the activity feed
+    ACTIVITY_RETENTION_DAYS = 90
+    # Users whose accounting cubes each process keeps in memory for /api/accounting/pivot
+    PIVOT_CACHE_USERS = 32
+    # Where cached results live: 'memory' (each process keeps its own CACHE_SIZE
+    # entries), 'sqlite' (every worker on the host, in the file CACHE_PATH) or
+    # 'redis' (every host, via the server at CACHE_URL; needs the redis package)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_SIZE = 4096
+    CACHE_PATH = os.environ.get('CACHE_PATH', '/tmp/swiftcrm-cache.db')
+    CACHE_URL = os.environ.get('CACHE_URL', 'redis://localhost:6379/0')
+    CACHE_KEY_PREFIX = 'swiftcrm:'
+    # Seconds a cached report (accounting summary, dashboard totals) is kept
+    REPORT_CACHE_TTL = 300
+    # Signed-in users each process keeps in memory for Flask-Login, and seconds
+    # before one is reloaded anyway (edits made through other processes aren't seen until then)
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL = 60
+    # Lifetime of API tokens in days when none is asked for, and the longest allowed
+    API_TOKEN_DEFAULT_DAYS = 90
+    API_TOKEN_MAX_DAYS = 365
+    # Seconds between each process's reloads of the revoked tokens
+    API_TOKEN_REVOCATION_REFRESH = 30
+    # werkzeug method and cost for new password hashes; older hashes are
+    # replaced on the next successful login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000000')
+    # Threads per process that hash passwords, and hashes allowed to wait for one
+    # before logins are answered with 503
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_QUEUE = 32
+    # Failed logins per account and per client address within the window (seconds).
+    # Past LOGIN_MAX_FAILURES an account's next login must wait LOGIN_FAILURE_DELAY
+    # seconds after its last failure, doubling with each further failure; past
+    # LOGIN_MAX_FAILURES_PER_ADDRESS the address is refused until the window ends
+    LOGIN_MAX_FAILURES = 5
+    LOGIN_MAX_FAILURES_PER_ADDRESS = 50
+    LOGIN_FAILURE_WINDOW = 300
+    LOGIN_FAILURE_DELAY = 1
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto headers are
+    # trusted for the client's address and scheme; 0 uses the connection's own
+    PROXY_FIX_HOPS = int(os.environ.get('PROXY_FIX_HOPS', 0))
+    # SQLite: PRAGMAs run on every new connection. WAL lets readers carry on while
+    # a write commits; with it, synchronous=NORMAL only syncs at checkpoints (a
+    # power cut can lose the last commits, but not corrupt the file). busy_timeout
+    # is how long (ms) a writer waits for the lock before 'database is locked';
+    # cache_size is per connection (negative: KiB), mmap_size in bytes
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,
+        'mmap_size': 268435456,
+    }
+    # PostgreSQL: connections each process keeps open, extra ones it may open under
+    # load, a liveness check before a pooled connection is handed out, and seconds
+    # after which one is replaced (before the server or a proxy drops it)
+    POSTGRES_POOL = {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+    # Read replicas, as space-separated URLs. Read-only requests (GET) query one of
+    # them, picked per request; writes use the primary, and so does every request
+    # from a user for REPLICA_STICKY_SECONDS after they write or log in, which
+    # should be longer than the replicas lag behind
+    REPLICA_DATABASE_URLS = os.environ.get('REPLICA_DATABASE_URLS', '').split()
+    REPLICA_STICKY_SECONDS = 5
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -22,12 +102,24 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REPLICA_DATABASE_URLS = []
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
     
 class ProductionConfig(Config):
     """Production configuration"""
-    # Make sure to set these in environment variables
+    # Make sure to set these in environment variables (DATABASE_URL falls back to the SQLite file)
     SECRET_KEY = os.environ.get('SECRET_KEY')
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    EVENT_BROKER = os.environ.get('EVENT_BROKER', 'unix')
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
+    # Each gunicorn worker runs many request threads; past pool_size + max_overflow
+    # busy connections a request waits up to pool_timeout seconds for one
+    POSTGRES_POOL = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
 
 # Configuration dictionary
 config = {
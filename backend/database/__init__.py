@@ -1,4 +1,4 @@
 # This file initializes the database package
-from .models import db, User, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry
+from .models import db, User, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry, CollectionVersion, Change, UserStats, Activity, AccountingDay, ApiToken
 
-__all__ = ['db', 'User', 'Contact', 'Lead', 'Order', 'OrderItem', 'Invoice', 'Receipt', 'AccountingEntry']
+__all__ = ['db', 'User', 'Contact', 'Lead', 'Order', 'OrderItem', 'Invoice', 'Receipt', 'AccountingEntry', 'CollectionVersion', 'Change', 'UserStats', 'Activity', 'AccountingDay', 'ApiToken']
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from .models import db, User, Activity, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry
+from .versions import COLLECTIONS, changed_objects
+
+# Model -> attributes joined into the label shown in the feed, captured at write time
+TITLE_FIELDS = {
+    Contact: ('name',),
+    Lead: ('title',),
+    Order: ('order_number',),
+    Invoice: ('invoice_number',),
+    Receipt: ('receipt_number',),
+    AccountingEntry: ('entry_type', 'category'),
+}
+
+# Collection -> how one of its records is named in the feed
+LABELS = {
+    'contacts': 'Contact',
+    'leads': 'Lead',
+    'orders': 'Order',
+    'invoices': 'Invoice',
+    'receipts': 'Receipt',
+    'accounting_entries': 'Accounting entry',
+}
+
+def describe(activity):
+    """A short sentence for an activity row, e.g. 'Invoice updated'"""
+    return f"{LABELS.get(activity.collection, activity.collection)} {activity.action}"
+
+def _title(obj):
+    # Read loaded state only: a deleted row can't be lazy-loaded any more
+    state = inspect(obj).dict
+    parts = [str(state[name]) for name in TITLE_FIELDS[type(obj)] if state.get(name) is not None]
+    return ' - '.join(parts)[:200] or None
+
+def activity_rows(session, written):
+    """Activity rows for the objects written by the flush in progress"""
+    # Records created earlier in this transaction aren't logged again as updated,
+    # e.g. an order whose total is set once its items have been added
+    created = session.info.setdefault('created_activity', set())
+    now = datetime.utcnow()
+    rows = []
+    for obj, user_id, action in written:
+        if isinstance(obj, OrderItem):
+            continue
+        key = (COLLECTIONS[type(obj)], obj.id)
+        if action == 'updated' and key in created:
+            continue
+        if action == 'created':
+            created.add(key)
+        rows.append({
+            'user_id': user_id,
+            'collection': key[0],
+            'resource_id': obj.id,
+            'action': action,
+            'title': _title(obj),
+            'created_at': now,
+        })
+    return rows
+
+def activity_query(user_id, retention_days):
+    """The user's activity inside the retention window, whether or not older rows were pruned yet"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    return Activity.query.filter(Activity.user_id == user_id, Activity.created_at >= cutoff)
+
+def recent_activity(user_id, retention_days, limit=10):
+    return activity_query(user_id, retention_days).order_by(
+        Activity.created_at.desc(), Activity.id.desc()
+    ).limit(limit).all()
+
+def prune_activity(retention_days):
+    """Delete activity older than the retention window, one indexed range per user. Returns the row count."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+    for user_id in db.session.scalars(db.select(User.id)).all():
+        result = db.session.execute(
+            Activity.__table__.delete().where(Activity.user_id == user_id, Activity.created_at < cutoff)
+        )
+        deleted += result.rowcount
+    db.session.commit()
+    return deleted
+
+@event.listens_for(Session, 'after_flush')
+def _record_activity(session, flush_context):
+    rows = activity_rows(session, changed_objects(session))
+    if rows:
+        session.connection().execute(Activity.__table__.insert(), rows)
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _forget_created(session):
+    # Ids can be reused once a transaction ends (SQLite reuses deleted rowids)
+    session.info.pop('created_activity', None)
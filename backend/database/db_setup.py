@@ -1,23 +1,36 @@
 from flask_migrate import Migrate
 from .models import db
+from .engine import engine_options, replica_binds, set_sqlite_pragmas
+from . import versions, stats, activity, payments, rollups, users  # register the flush hooks that maintain versions, the change feed, user stats, activity, invoice payments and daily accounting totals, and announce account changes
 import os
 
+# Alembic scripts live next to the backend package so `flask db` works from any cwd
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
 def setup_db(app):
     """
     Set up the database with the Flask app
     """
-    # Configure the database
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///swiftcrm.db')
+    # Configure the database; the URI comes from the app's config class
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    # Read replicas are extra binds without tables of their own; utils/replicas.py routes reads to them
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), **replica_binds(app.config)}
     
     # Initialize the database with the app
     db.init_app(app)
     
+    # Tune SQLite connections as they're opened (no-op on other databases)
+    with app.app_context():
+        for engine in db.engines.values():
+            set_sqlite_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+    
     # Set up migrations
-    migrate = Migrate(app, db)
+    migrate = Migrate(app, db, directory=MIGRATIONS_DIR)
     
-    # Create tables if they don't exist
+    # Create tables if they don't exist, on the primary only: replicas get theirs from it
+    # (and db.metadatas keeps every bind key any app has had, so '__all__' can name absent ones)
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
     
     return db
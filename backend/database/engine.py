@@ -0,0 +1,31 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def engine_options(config, url=None):
+    """
+    Engine options for the database at `url` (default: the primary): PostgreSQL
+    gets the POSTGRES_POOL settings, under any set in SQLALCHEMY_ENGINE_OPTIONS
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if make_url(url or config['SQLALCHEMY_DATABASE_URI']).get_backend_name() == 'postgresql':
+        options = {**config['POSTGRES_POOL'], **options}
+    return options
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries for the REPLICA_DATABASE_URLS, each with its engine options"""
+    return {
+        f'replica_{n}': {'url': url, **engine_options(config, url)}
+        for n, url in enumerate(config['REPLICA_DATABASE_URLS'])
+    }
+
+def set_sqlite_pragmas(engine, pragmas):
+    """Run `PRAGMA name=value` for each of `pragmas` on every connection `engine` opens, if it's SQLite"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
@@ -0,0 +1,96 @@
+from sqlalchemy import select
+from datetime import datetime, timedelta
+from .models import db, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry, Change
+
+def hot_queries(user_id=1):
+    """
+    The per-user access paths the routes hit most, paired with the indexes
+    that are expected to serve them
+    """
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=30)
+
+    return [
+        ('contacts by user',
+         select(Contact).where(Contact.user_id == user_id),
+         {'ix_contacts_user_id_created_at'}),
+        ('leads by user',
+         select(Lead).where(Lead.user_id == user_id),
+         {'ix_leads_user_id_created_at', 'ix_leads_user_id_status'}),
+        ('leads by contact',
+         select(Lead).where(Lead.contact_id == 1),
+         {'ix_leads_contact_id'}),
+        ('orders by user',
+         select(Order).where(Order.user_id == user_id),
+         {'ix_orders_user_id_created_at', 'ix_orders_user_id_status'}),
+        ('order items by order',
+         select(OrderItem).where(OrderItem.order_id == 1),
+         {'ix_order_items_order_id'}),
+        ('unpaid invoices by user',
+         select(Invoice).where(Invoice.user_id == user_id, Invoice.status == 'Unpaid'),
+         {'ix_invoices_user_id_status_due_date'}),
+        ('unpaid invoices due this week',
+         select(Invoice).where(
+             Invoice.user_id == user_id,
+             Invoice.status == 'Unpaid',
+             Invoice.due_date >= end_date,
+             Invoice.due_date < end_date + timedelta(days=7)
+         ).order_by(Invoice.due_date),
+         {'ix_invoices_user_id_status_due_date'}),
+        ('qualified leads',
+         select(Lead).where(Lead.user_id == user_id, Lead.status == 'Qualified'),
+         {'ix_leads_user_id_status'}),
+        ('invoices by contact',
+         select(Invoice).where(Invoice.contact_id == 1),
+         {'ix_invoices_contact_id'}),
+        ('invoices by order',
+         select(Invoice).where(Invoice.order_id == 1),
+         {'ix_invoices_order_id'}),
+        ('recent receipts by user',
+         select(Receipt).where(Receipt.user_id == user_id).order_by(Receipt.created_at.desc()).limit(5),
+         {'ix_receipts_user_id_created_at'}),
+        ('receipts by invoice',
+         select(Receipt).where(Receipt.invoice_id == 1),
+         {'ix_receipts_invoice_id'}),
+        ('accounting entries by date',
+         select(AccountingEntry).where(AccountingEntry.user_id == user_id).order_by(AccountingEntry.date.desc()),
+         {'ix_accounting_entries_user_id_date'}),
+        ('accounting totals by type and period',
+         select(AccountingEntry.amount).where(
+             AccountingEntry.user_id == user_id,
+             AccountingEntry.entry_type == 'Income',
+             AccountingEntry.date >= start_date,
+             AccountingEntry.date <= end_date
+         ),
+         {'ix_accounting_entries_user_id_entry_type_date'}),
+        ('changes since cursor',
+         select(Change).where(Change.user_id == user_id, Change.seq > 0).order_by(Change.seq).limit(100),
+         {'ix_changes_user_id_seq'}),
+    ]
+
+def explain(statement):
+    """Return the query plan of a statement as a single string"""
+    engine = db.engine
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+
+    with engine.connect() as conn:
+        if engine.dialect.name == 'sqlite':
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql).all()
+            return '\n'.join(str(row[-1]) for row in rows)
+        if engine.dialect.name == 'postgresql':
+            # Small tables would otherwise be planned as sequential scans
+            conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        rows = conn.exec_driver_sql('EXPLAIN ' + sql).all()
+        return '\n'.join(str(row[0]) for row in rows)
+
+def check_indexes(user_id=1):
+    """
+    EXPLAIN every hot query and report whether one of its expected indexes is used.
+    Returns a list of (name, ok, plan) tuples.
+    """
+    results = []
+    for name, statement, expected in hot_queries(user_id):
+        plan = explain(statement)
+        ok = any(index_name in plan for index_name in expected)
+        results.append((name, ok, plan))
+    return results
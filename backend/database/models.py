@@ -2,8 +2,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
 import uuid
+from .replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model, UserMixin):
     __tablename__ = 'users'
@@ -27,6 +28,9 @@ class User(db.Model, UserMixin):
 
 class Contact(db.Model):
     __tablename__ = 'contacts'
+    __table_args__ = (
+        db.Index('ix_contacts_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -49,6 +53,10 @@ class Contact(db.Model):
 
 class Lead(db.Model):
     __tablename__ = 'leads'
+    __table_args__ = (
+        db.Index('ix_leads_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_leads_user_id_status', 'user_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -58,13 +66,17 @@ class Lead(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=False)
+    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=False, index=True)
     
     def __repr__(self):
         return f'<Lead {self.title}>'
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index('ix_orders_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_orders_user_id_status', 'user_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(50), unique=True, nullable=False, default=lambda: f"ORD-{uuid.uuid4().hex[:8].upper()}")
@@ -74,7 +86,7 @@ class Order(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=False)
+    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=False, index=True)
     
     # Relationships
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete-orphan")
@@ -90,25 +102,31 @@ class OrderItem(db.Model):
     product_name = db.Column(db.String(100), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     
     def __repr__(self):
         return f'<OrderItem {self.product_name}>'
 
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_invoices_user_id_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_invoices_user_id_due_date', 'user_id', 'due_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     invoice_number = db.Column(db.String(50), unique=True, nullable=False, default=lambda: f"INV-{uuid.uuid4().hex[:8].upper()}")
     amount = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='Unpaid')  # Unpaid, Partial, Paid
+    amount_paid = db.Column(db.Float, nullable=False, default=0, server_default='0')  # sum of the receipts, kept by database/payments.py
     due_date = db.Column(db.DateTime, nullable=False)
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=False)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)
+    contact_id = db.Column(db.Integer, db.ForeignKey('contacts.id'), nullable=False, index=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True, index=True)
     
     # Relationships
     receipts = db.relationship('Receipt', backref='invoice', lazy=True)
@@ -118,6 +136,9 @@ class Invoice(db.Model):
 
 class Receipt(db.Model):
     __tablename__ = 'receipts'
+    __table_args__ = (
+        db.Index('ix_receipts_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     receipt_number = db.Column(db.String(50), unique=True, nullable=False, default=lambda: f"REC-{uuid.uuid4().hex[:8].upper()}")
@@ -126,13 +147,17 @@ class Receipt(db.Model):
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False, index=True)
     
     def __repr__(self):
         return f'<Receipt {self.receipt_number}>'
 
 class AccountingEntry(db.Model):
     __tablename__ = 'accounting_entries'
+    __table_args__ = (
+        db.Index('ix_accounting_entries_user_id_date', 'user_id', 'date'),
+        db.Index('ix_accounting_entries_user_id_entry_type_date', 'user_id', 'entry_type', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     entry_type = db.Column(db.String(20), nullable=False)  # Income, Expense
@@ -145,3 +170,96 @@ class AccountingEntry(db.Model):
     
     def __repr__(self):
         return f'<AccountingEntry {self.entry_type} - {self.amount}>'
+
+class CollectionVersion(db.Model):
+    __tablename__ = 'collection_versions'
+    
+    # One counter per user and collection, bumped by every flush that writes to the collection
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    collection = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CollectionVersion {self.collection} v{self.version}>'
+
+class Change(db.Model):
+    __tablename__ = 'changes'
+    __table_args__ = (
+        db.Index('ix_changes_user_id_seq', 'user_id', 'seq'),
+    )
+    
+    # Latest write to each resource, numbered from the user's change sequence;
+    # deleted resources keep their row as a tombstone
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    collection = db.Column(db.String(50), primary_key=True)
+    resource_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    seq = db.Column(db.Integer, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Change {self.collection} {self.resource_id} #{self.seq}>'
+
+class UserStats(db.Model):
+    __tablename__ = 'user_stats'
+    
+    # Per-user totals kept up to date by session events (database/stats.py)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    contacts_count = db.Column(db.Integer, nullable=False, default=0)
+    leads_count = db.Column(db.Integer, nullable=False, default=0)
+    orders_count = db.Column(db.Integer, nullable=False, default=0)
+    invoices_count = db.Column(db.Integer, nullable=False, default=0)
+    receipts_count = db.Column(db.Integer, nullable=False, default=0)
+    accounting_entries_count = db.Column(db.Integer, nullable=False, default=0)
+    pipeline_value = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
+
+class Activity(db.Model):
+    __tablename__ = 'activity'
+    __table_args__ = (
+        db.Index('ix_activity_user_id_created_at', 'user_id', 'created_at'),
+    )
+    
+    # Append-only log of writes, pruned after ACTIVITY_RETENTION_DAYS
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    collection = db.Column(db.String(50), nullable=False)
+    resource_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(20), nullable=False)  # created, updated, deleted
+    title = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Activity {self.collection} {self.resource_id} {self.action}>'
+
+class AccountingDay(db.Model):
+    __tablename__ = 'accounting_days'
+    
+    # Per-day totals of accounting entries kept up to date by session events (database/rollups.py)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    entry_type = db.Column(db.String(20), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Float, nullable=False, default=0)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<AccountingDay {self.user_id} {self.day} {self.entry_type} {self.category}>'
+
+class ApiToken(db.Model):
+    __tablename__ = 'api_tokens'
+    
+    # Bearer tokens issued to integrations. Requests verify the signed token
+    # itself; rows are only read to list tokens and to load the revoked ones (utils/tokens.py)
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    scopes = db.Column(db.String(500), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<ApiToken {self.id} {self.name}>'
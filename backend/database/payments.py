@@ -0,0 +1,121 @@
+from sqlalchemy import case, event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+from .models import db, Invoice, Receipt
+from .stats import loaded_value
+
+# Stored and recomputed totals closer than this (half a cent) are considered equal
+PAYMENT_TOLERANCE = 0.005
+
+def payment_status(paid, amount):
+    """The invoice status implied by how much has been paid against it"""
+    if paid >= amount:
+        return 'Paid'
+    return 'Partial' if paid > 0 else 'Unpaid'
+
+def _payment_status_sql(paid, amount):
+    return case((paid >= amount, 'Paid'), (paid > 0, 'Partial'), else_='Unpaid')
+
+def _invoice(session, invoice_id, receipt=None):
+    if invoice_id is not None:
+        return session.get(Invoice, int(invoice_id))
+    # A receipt attached through the relationship only gets its invoice_id at flush time
+    return inspect(receipt).dict.get('invoice') if receipt is not None else None
+
+def payment_deltas(session):
+    """{invoice: change in amount paid} for the flush about to run"""
+    deltas = {}
+
+    def add(invoice, amount):
+        if invoice is not None and amount and invoice not in session.deleted:
+            deltas[invoice] = deltas.get(invoice, 0) + amount
+
+    for obj in session.new:
+        if isinstance(obj, Receipt):
+            add(_invoice(session, obj.invoice_id, obj), obj.amount)
+
+    for obj in session.deleted:
+        if isinstance(obj, Receipt):
+            add(_invoice(session, loaded_value(obj, 'invoice_id')), -loaded_value(obj, 'amount'))
+
+    for obj in session.dirty:
+        if isinstance(obj, Receipt) and session.is_modified(obj, include_collections=False):
+            add(_invoice(session, loaded_value(obj, 'invoice_id')), -loaded_value(obj, 'amount'))
+            add(_invoice(session, obj.invoice_id, obj), obj.amount)
+
+    return deltas
+
+def apply_payments(deltas):
+    """
+    Add the deltas to each invoice's amount_paid and re-derive its status. Saved
+    invoices get `amount_paid = amount_paid + delta` evaluated by the database, so
+    the cost doesn't grow with the number of receipts and concurrent payments
+    don't overwrite each other.
+
+    Payments to different invoices don't wait on each other's invoice row, but
+    the same commit also bumps the owner's collection versions and change
+    sequence (versions.py). Those rows stay locked from the flush to the commit,
+    which keeps the change feed in order, so one user's payments still commit
+    one at a time. Different users' payments don't wait on each other.
+    """
+    for invoice, delta in deltas.items():
+        if inspect(invoice).key is None:
+            invoice.amount_paid = (invoice.amount_paid or 0) + delta
+            invoice.status = payment_status(invoice.amount_paid, invoice.amount)
+            continue
+        paid = Invoice.amount_paid + delta
+        # The UPDATE sees the old row, so a new amount set in this flush is passed in as a value
+        amount = invoice.amount if inspect(invoice).attrs.amount.history.has_changes() else Invoice.amount
+        invoice.amount_paid = paid
+        invoice.status = _payment_status_sql(paid, amount)
+
+def repricing(session, deltas):
+    """Saved invoices in the flush about to run whose amount changed, other than those being paid"""
+    return [
+        obj for obj in session.dirty
+        if isinstance(obj, Invoice) and obj not in deltas and inspect(obj).key is not None
+        and inspect(obj).attrs.amount.history.has_changes()
+    ]
+
+def payment_mismatches(user_id=None):
+    """
+    (invoice, sum of its receipts) for every invoice whose amount_paid has drifted
+    from its receipts, or whose status doesn't match what's been paid
+    """
+    totals = select(Receipt.invoice_id, func.sum(Receipt.amount).label('paid')).group_by(Receipt.invoice_id).subquery()
+    expected = func.coalesce(totals.c.paid, 0)
+    statement = (
+        select(Invoice, expected)
+        .outerjoin(totals, totals.c.invoice_id == Invoice.id)
+        .where(or_(
+            func.abs(Invoice.amount_paid - expected) > PAYMENT_TOLERANCE,
+            Invoice.status != _payment_status_sql(expected, Invoice.amount),
+        ))
+        .order_by(Invoice.id)
+    )
+    if user_id is not None:
+        statement = statement.where(Invoice.user_id == user_id)
+    return db.session.execute(statement).all()
+
+def repair_payments(user_id=None):
+    """
+    Reset amount_paid to the sum of the receipts, and re-derive the status, for
+    every invoice where they disagree. Returns (invoice_number, old amount_paid,
+    new amount_paid, old status, new status) per repaired invoice.
+    """
+    repaired = []
+    for invoice, expected in payment_mismatches(user_id):
+        status = payment_status(expected, invoice.amount)
+        repaired.append((invoice.invoice_number, invoice.amount_paid, expected, invoice.status, status))
+        invoice.amount_paid = expected
+        invoice.status = status
+    db.session.commit()
+    return repaired
+
+@event.listens_for(Session, 'before_flush')
+def _track_payments(session, flush_context, instances):
+    deltas = payment_deltas(session)
+    if deltas:
+        apply_payments(deltas)
+    # A new amount changes what counts as paid; amount_paid is read by the UPDATE, so concurrent payments are seen
+    for invoice in repricing(session, deltas):
+        invoice.status = _payment_status_sql(Invoice.amount_paid, invoice.amount)
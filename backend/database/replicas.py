@@ -0,0 +1,64 @@
+import sqlite3
+from blinker import Namespace
+from flask import current_app, has_request_context
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+# Sent after a commit, inside a request, that wrote to the primary: send()
+primary_written = Namespace().signal('primary-written')
+
+class RoutingSession(FlaskSession):
+    """
+    db.session. When the app has read replicas (utils/replicas.py), the router
+    may send a statement to one of them; otherwise, or when it declines, the
+    statement goes to the primary as usual.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            router = current_app.extensions.get('replicas')
+            if router is not None:
+                engine = router.engine_for(self, clause)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(Session, 'after_flush')
+def _track_writes(session, flush_context):
+    # The rest of the transaction reads from the primary, and its commit is announced
+    session.info['wrote'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _announce_writes(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        primary_written.send()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_writes(session):
+    session.info.pop('wrote', None)
+
+def copy_to_replicas(primary_url, replica_urls):
+    """
+    Overwrite each SQLite replica file with a consistent snapshot of the SQLite
+    primary, for trying replicas out locally. Returns the replica paths copied.
+    """
+    primary = make_url(primary_url)
+    replicas = [make_url(url) for url in replica_urls]
+    if any(url.get_backend_name() != 'sqlite' for url in [primary] + replicas):
+        raise ValueError('Only SQLite files can be copied; other replicas are kept up to date by the database')
+
+    copied = []
+    source = sqlite3.connect(primary.database)
+    try:
+        for replica in replicas:
+            target = sqlite3.connect(replica.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+            copied.append(replica.database)
+    finally:
+        source.close()
+    return copied
@@ -0,0 +1,164 @@
+from datetime import datetime, time, timedelta
+from blinker import Namespace
+from sqlalchemy import Date, event, func, select, union_all
+from sqlalchemy.orm import Session
+from .models import db, AccountingEntry, AccountingDay
+from .stats import loaded_value
+from .versions import upsert
+
+# Stored and recomputed day totals closer than this (half a cent) are considered equal
+ROLLUP_TOLERANCE = 0.005
+
+# Sent once per user after a commit that changed their accounting totals, with
+# the days whose totals changed: send(user_id, days={date, ...})
+accounting_committed = Namespace().signal('accounting-committed')
+
+def _day_start(day):
+    return datetime.combine(day, time.min)
+
+def _key(user_id, date, entry_type, category):
+    return (user_id, date.date(), entry_type, category)
+
+def _loaded_key(obj):
+    return _key(*(loaded_value(obj, name) for name in ('user_id', 'date', 'entry_type', 'category')))
+
+def rollup_deltas(session):
+    """{(user_id, day, entry_type, category): [total delta, count delta]} for the flush about to run"""
+    deltas = {}
+
+    def add(key, amount, count):
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += amount
+        delta[1] += count
+
+    for obj in session.new:
+        if not isinstance(obj, AccountingEntry) or obj.user_id is None:
+            continue
+        if obj.date is None:
+            # Settle the column default now so the entry and its day agree
+            obj.date = datetime.utcnow()
+        add(_key(obj.user_id, obj.date, obj.entry_type, obj.category), obj.amount, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, AccountingEntry):
+            add(_loaded_key(obj), -loaded_value(obj, 'amount'), -1)
+
+    for obj in session.dirty:
+        if isinstance(obj, AccountingEntry) and session.is_modified(obj, include_collections=False):
+            add(_loaded_key(obj), -loaded_value(obj, 'amount'), -1)
+            add(_key(obj.user_id, obj.date, obj.entry_type, obj.category), obj.amount, 1)
+
+    # Edits that don't touch the amount, day or grouping cancel out
+    return {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+
+def apply_rollups(connection, deltas):
+    """Add the deltas to the day rows, creating missing rows and dropping emptied ones"""
+    table = AccountingDay.__table__
+    for (user_id, day, entry_type, category), (amount, count) in sorted(deltas.items()):
+        key = {'user_id': user_id, 'day': day, 'entry_type': entry_type, 'category': category}
+        upsert(connection, table, key, {'total': amount, 'entry_count': count},
+               {'total': table.c.total + amount, 'entry_count': table.c.entry_count + count})
+        if count < 0:
+            connection.execute(table.delete().where(
+                *(table.c[name] == value for name, value in key.items()), table.c.entry_count <= 0
+            ))
+
+def accounting_rows(user_id, start_date=None, end_date=None):
+    """
+    A subquery of (entry_type, category, total) rows that add up to the user's
+    entries dated within [start_date, end_date]. Whole days come from the daily
+    rollup, one row per day and category; only the partial days at either end
+    are read from the entries themselves. Missing bounds leave that side open.
+    """
+    days = select(AccountingDay.entry_type, AccountingDay.category, AccountingDay.total).where(
+        AccountingDay.user_id == user_id
+    )
+    entries = select(AccountingEntry.entry_type, AccountingEntry.category, AccountingEntry.amount.label('total')).where(
+        AccountingEntry.user_id == user_id
+    )
+
+    first_day = last_day = None
+    if start_date is not None:
+        first_day = start_date.date() if start_date == _day_start(start_date.date()) else start_date.date() + timedelta(days=1)
+    if end_date is not None:
+        last_day = end_date.date() if end_date.time() == time.max else end_date.date() - timedelta(days=1)
+
+    if first_day is not None and last_day is not None and first_day > last_day:
+        # Not a single whole day in the range
+        parts = [entries.where(AccountingEntry.date >= start_date, AccountingEntry.date <= end_date)]
+    else:
+        if first_day is not None:
+            days = days.where(AccountingDay.day >= first_day)
+        if last_day is not None:
+            days = days.where(AccountingDay.day <= last_day)
+        parts = [days]
+        if start_date is not None and first_day != start_date.date():
+            parts.append(entries.where(AccountingEntry.date >= start_date, AccountingEntry.date < _day_start(first_day)))
+        if end_date is not None and last_day != end_date.date():
+            parts.append(entries.where(AccountingEntry.date >= _day_start(end_date.date()), AccountingEntry.date <= end_date))
+    return union_all(*parts).subquery()
+
+def _grouped_entries(user_id=None):
+    day = func.date(AccountingEntry.date, type_=Date)
+    statement = select(
+        AccountingEntry.user_id, day, AccountingEntry.entry_type, AccountingEntry.category,
+        func.sum(AccountingEntry.amount), func.count()
+    )
+    if user_id is not None:
+        statement = statement.where(AccountingEntry.user_id == user_id)
+    return statement.group_by(AccountingEntry.user_id, day, AccountingEntry.entry_type, AccountingEntry.category)
+
+def rollup_mismatches(user_id=None):
+    """(key, stored (total, count), expected (total, count)) for every day row that has drifted from the entries"""
+    expected = {tuple(row[:4]): (row[4], row[5]) for row in db.session.execute(_grouped_entries(user_id))}
+    stored_rows = select(AccountingDay.user_id, AccountingDay.day, AccountingDay.entry_type, AccountingDay.category,
+                         AccountingDay.total, AccountingDay.entry_count)
+    if user_id is not None:
+        stored_rows = stored_rows.where(AccountingDay.user_id == user_id)
+    stored = {tuple(row[:4]): (row[4], row[5]) for row in db.session.execute(stored_rows)}
+
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys()):
+        have, want = stored.get(key, (0, 0)), expected.get(key, (0, 0))
+        if have[1] != want[1] or abs(have[0] - want[0]) > ROLLUP_TOLERANCE:
+            mismatches.append((key, have, want))
+    return mismatches
+
+def rebuild_rollups(user_id=None):
+    """
+    Recompute the daily rollup from the entries with one GROUP BY. Returns the
+    number of day rows written. Writes that commit while this runs can be
+    missed, so run it when the app is quiet.
+    """
+    rows = [
+        {'user_id': uid, 'day': day, 'entry_type': entry_type, 'category': category, 'total': total, 'entry_count': count}
+        for uid, day, entry_type, category, total, count in db.session.execute(_grouped_entries(user_id))
+    ]
+    delete = AccountingDay.__table__.delete()
+    if user_id is not None:
+        delete = delete.where(AccountingDay.user_id == user_id)
+    db.session.execute(delete)
+    if rows:
+        db.session.execute(AccountingDay.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+@event.listens_for(Session, 'before_flush')
+def _track_rollups(session, flush_context, instances):
+    deltas = rollup_deltas(session)
+    if deltas:
+        apply_rollups(session.connection(), deltas)
+        # Held until the transaction commits, then announced
+        pending = session.info.setdefault('committed_days', {})
+        for user_id, day, entry_type, category in deltas:
+            pending.setdefault(user_id, set()).add(day)
+
+@event.listens_for(Session, 'after_commit')
+def _announce_days(session):
+    pending = session.info.pop('committed_days', None)
+    for user_id, days in (pending or {}).items():
+        accounting_committed.send(user_id, days=days)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_days(session):
+    session.info.pop('committed_days', None)
@@ -0,0 +1,121 @@
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from .models import db, User, UserStats, Contact, Lead, Order, Invoice, Receipt, AccountingEntry
+from .versions import upsert
+
+# Model -> the UserStats column counting its rows
+COUNTERS = {
+    Contact: 'contacts_count',
+    Lead: 'leads_count',
+    Order: 'orders_count',
+    Invoice: 'invoices_count',
+    Receipt: 'receipts_count',
+    AccountingEntry: 'accounting_entries_count',
+}
+
+# Leads in these statuses no longer count towards the open pipeline
+CLOSED_LEAD_STATUSES = ('Converted', 'Won', 'Lost')
+
+def _pipeline(status, value):
+    return (value or 0) if status not in CLOSED_LEAD_STATUSES else 0
+
+def loaded_value(obj, name):
+    """An attribute's value as last loaded from the database"""
+    history = inspect(obj).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, name)
+
+def stats_deltas(session):
+    """{user_id: {column: delta}} for the flush about to run"""
+    deltas = {}
+
+    def add(user_id, column, amount):
+        if amount:
+            user = deltas.setdefault(user_id, {})
+            user[column] = user.get(column, 0) + amount
+
+    for obj in session.new:
+        column = COUNTERS.get(type(obj))
+        if column is None or obj.user_id is None:
+            continue
+        add(obj.user_id, column, 1)
+        if isinstance(obj, Lead):
+            add(obj.user_id, 'pipeline_value', _pipeline(obj.status or 'New', obj.value))
+
+    for obj in session.deleted:
+        column = COUNTERS.get(type(obj))
+        if column is None:
+            continue
+        add(obj.user_id, column, -1)
+        if isinstance(obj, Lead):
+            add(obj.user_id, 'pipeline_value', -_pipeline(loaded_value(obj, 'status'), loaded_value(obj, 'value')))
+
+    for obj in session.dirty:
+        if isinstance(obj, Lead) and session.is_modified(obj, include_collections=False):
+            before = _pipeline(loaded_value(obj, 'status'), loaded_value(obj, 'value'))
+            add(obj.user_id, 'pipeline_value', _pipeline(obj.status, obj.value) - before)
+
+    return deltas
+
+def apply_deltas(connection, deltas):
+    """Add the deltas to each user's stats row, creating it if missing"""
+    table = UserStats.__table__
+    for user_id, changes in sorted(deltas.items()):
+        upsert(connection, table, {'user_id': user_id}, changes,
+               {column: table.c[column] + amount for column, amount in changes.items()})
+
+def get_stats(user_id):
+    """The user's stats row; an unsaved all-zero row for users who have never written anything"""
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        stats = UserStats(user_id=user_id, pipeline_value=0,
+                          **{column: 0 for column in COUNTERS.values()})
+    return stats
+
+def rebuild_stats(user_id=None):
+    """
+    Recompute the stats rows from the base tables with one GROUP BY per table.
+    Returns the number of users rebuilt. Writes that commit while this runs
+    can be missed, so run it when the app is quiet.
+    """
+    users = select(User.id)
+    if user_id is not None:
+        users = users.where(User.id == user_id)
+    totals = {
+        uid: dict({column: 0 for column in COUNTERS.values()}, pipeline_value=0)
+        for uid in db.session.scalars(users)
+    }
+
+    def grouped(*columns, criteria=()):
+        statement = select(*columns).where(*criteria)
+        if user_id is not None:
+            statement = statement.where(columns[0] == user_id)
+        return db.session.execute(statement.group_by(columns[0]))
+
+    for model, column in COUNTERS.items():
+        for uid, count in grouped(model.user_id, func.count()):
+            if uid in totals:
+                totals[uid][column] = count
+
+    open_leads = (Lead.status.notin_(CLOSED_LEAD_STATUSES),)
+    for uid, value in grouped(Lead.user_id, func.coalesce(func.sum(Lead.value), 0), criteria=open_leads):
+        if uid in totals:
+            totals[uid]['pipeline_value'] = value
+
+    delete = UserStats.__table__.delete()
+    if user_id is not None:
+        delete = delete.where(UserStats.user_id == user_id)
+    db.session.execute(delete)
+    if totals:
+        db.session.execute(UserStats.__table__.insert(), [dict(row, user_id=uid) for uid, row in totals.items()])
+    db.session.commit()
+    return len(totals)
+
+@event.listens_for(Session, 'before_flush')
+def _track_stats(session, flush_context, instances):
+    deltas = stats_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
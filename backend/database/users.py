@@ -0,0 +1,27 @@
+from blinker import Namespace
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .models import User
+
+# Sent once per user after a commit that updated or deleted their account row: send(user_id)
+user_committed = Namespace().signal('user-committed')
+
+@event.listens_for(Session, 'after_flush')
+def _track_users(session, flush_context):
+    changed = [obj.id for obj in session.deleted if isinstance(obj, User)]
+    changed += [
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and session.is_modified(obj, include_collections=False)
+    ]
+    if changed:
+        # Held until the transaction commits, then announced
+        session.info.setdefault('committed_users', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _announce_users(session):
+    for user_id in session.info.pop('committed_users', ()):
+        user_committed.send(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_users(session):
+    session.info.pop('committed_users', None)
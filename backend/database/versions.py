@@ -0,0 +1,189 @@
+from datetime import datetime
+from blinker import Namespace
+from sqlalchemy import event, false, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from .models import db, CollectionVersion, Change, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry
+
+# Model -> the per-user collection whose version a write to it bumps
+COLLECTIONS = {
+    Contact: 'contacts',
+    Lead: 'leads',
+    Order: 'orders',
+    OrderItem: 'order_items',
+    Invoice: 'invoices',
+    Receipt: 'receipts',
+    AccountingEntry: 'accounting_entries',
+}
+
+# Per-user counter, kept next to the collection versions, that numbers change feed rows
+CHANGE_SEQUENCE = 'changes'
+
+# Sent once per user after a commit that wrote tracked rows, with the user's
+# latest change number and the collections written: send(user_id, seq=..., collections=...)
+changes_committed = Namespace().signal('changes-committed')
+
+def _owner(session, obj):
+    if isinstance(obj, OrderItem):
+        # Items are usually created with just order_id, which pending objects don't lazy-load
+        order = obj.order if obj.order is not None else session.get(Order, obj.order_id)
+        return order.user_id if order is not None else None
+    return obj.user_id
+
+def changed_objects(session):
+    """
+    The tracked objects written by the flush in progress, as (obj, user_id, action)
+    with action one of 'created', 'updated' or 'deleted'.
+    Runs in after_flush, once new rows have their primary keys.
+    """
+    written = []
+    with session.no_autoflush:
+        for objects, action in ((session.new, 'created'), (session.dirty, 'updated'), (session.deleted, 'deleted')):
+            for obj in list(objects):
+                if type(obj) not in COLLECTIONS:
+                    continue
+                if action == 'updated' and not session.is_modified(obj, include_collections=False):
+                    continue
+                user_id = _owner(session, obj)
+                if user_id is not None:
+                    written.append((obj, user_id, action))
+    return written
+
+def changed_resources(written):
+    """
+    Map written objects to change feed keys, {(user_id, collection, resource_id): deleted}.
+    Order items are reported as a change to their order.
+    """
+    resources = {}
+    for obj, user_id, action in written:
+        if isinstance(obj, OrderItem):
+            resources.setdefault((user_id, 'orders', obj.order_id), False)
+        else:
+            key = (user_id, COLLECTIONS[type(obj)], obj.id)
+            resources[key] = resources.get(key, False) or action == 'deleted'
+    return resources
+
+def upsert(connection, table, key, values, on_conflict):
+    """INSERT key+values, or UPDATE the existing row with `on_conflict`"""
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = insert(table).values(**key, **values).on_conflict_do_update(
+            index_elements=[table.c[name] for name in key],
+            set_=on_conflict
+        )
+        connection.execute(statement)
+        return
+
+    result = connection.execute(
+        update(table).where(*(table.c[name] == value for name, value in key.items())).values(**on_conflict)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**key, **values))
+
+def for_update(query):
+    """
+    `query` with the rows it returns locked until the transaction ends, so values
+    read from them can't go stale before the commit. Uses SELECT ... FOR UPDATE
+    where the database has row locks. SQLite only locks the whole database for
+    writing, so there a write that matches no rows takes that lock before the read.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        table = query.column_descriptions[0]['entity'].__table__
+        key = table.primary_key.columns[0]
+        db.session.execute(update(table).where(false()).values({key.name: key}))
+    # Reload objects already in the session with the locked values
+    return query.with_for_update().populate_existing()
+
+def _increment(connection, user_id, collection, amount=1):
+    """Atomically add `amount` to a per-user counter, creating it if missing"""
+    table = CollectionVersion.__table__
+    upsert(connection, table, {'user_id': user_id, 'collection': collection},
+            {'version': amount}, {'version': table.c.version + amount})
+
+def bump_versions(connection, changed):
+    """Increment the version of each (user_id, collection)"""
+    for user_id, collection in sorted(changed):
+        _increment(connection, user_id, collection)
+
+def allocate_sequence(connection, user_id, count):
+    """
+    Reserve `count` consecutive change numbers for a user and return the first.
+    The counter row stays locked until commit, so a user's changes commit in
+    sequence order and readers never see a gap that is filled in later.
+    """
+    _increment(connection, user_id, CHANGE_SEQUENCE, count)
+    table = CollectionVersion.__table__
+    last = connection.execute(
+        select(table.c.version).where(table.c.user_id == user_id, table.c.collection == CHANGE_SEQUENCE)
+    ).scalar_one()
+    return last - count + 1
+
+def record_changes(connection, resources):
+    """
+    Point each resource's change feed row (its tombstone, if deleted) at a new
+    sequence number. Returns {user_id: last sequence number used}.
+    """
+    by_user = {}
+    for (user_id, collection, resource_id), deleted in sorted(resources.items()):
+        by_user.setdefault(user_id, []).append((collection, resource_id, deleted))
+
+    table = Change.__table__
+    now = datetime.utcnow()
+    latest = {}
+    for user_id, entries in by_user.items():
+        seq = allocate_sequence(connection, user_id, len(entries))
+        for offset, (collection, resource_id, deleted) in enumerate(entries):
+            values = {'seq': seq + offset, 'deleted': deleted, 'changed_at': now}
+            key = {'user_id': user_id, 'collection': collection, 'resource_id': resource_id}
+            upsert(connection, table, key, values, values)
+        latest[user_id] = seq + len(entries) - 1
+    return latest
+
+def current_sequence(user_id):
+    """The user's latest change number, 0 before the first write"""
+    return db.session.execute(
+        select(CollectionVersion.version).where(
+            CollectionVersion.user_id == user_id,
+            CollectionVersion.collection == CHANGE_SEQUENCE
+        )
+    ).scalar() or 0
+
+def get_versions(user_id, collections):
+    """Current versions of `collections` for a user, 0 for collections never written"""
+    rows = db.session.execute(
+        select(CollectionVersion.collection, CollectionVersion.version).where(
+            CollectionVersion.user_id == user_id,
+            CollectionVersion.collection.in_(collections)
+        )
+    ).all()
+    versions = dict(rows)
+    return [(collection, versions.get(collection, 0)) for collection in collections]
+
+@event.listens_for(Session, 'after_flush')
+def _track_writes(session, flush_context):
+    written = changed_objects(session)
+    if not written:
+        return
+    connection = session.connection()
+    changed = {(user_id, COLLECTIONS[type(obj)]) for obj, user_id, action in written}
+    bump_versions(connection, changed)
+    latest = record_changes(connection, changed_resources(written))
+
+    # Held until the transaction commits, then announced
+    pending = session.info.setdefault('committed_changes', {})
+    for user_id, seq in latest.items():
+        entry = pending.setdefault(user_id, {'seq': seq, 'collections': set()})
+        entry['seq'] = max(entry['seq'], seq)
+    for user_id, collection in changed:
+        pending[user_id]['collections'].add(collection)
+
+@event.listens_for(Session, 'after_commit')
+def _announce_changes(session):
+    pending = session.info.pop('committed_changes', None)
+    for user_id, entry in (pending or {}).items():
+        changes_committed.send(user_id, seq=entry['seq'], collections=sorted(entry['collections']))
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('committed_changes', None)
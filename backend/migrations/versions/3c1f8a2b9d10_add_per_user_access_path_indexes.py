@@ -0,0 +1,48 @@
+"""add per-user access path indexes
+
+Revision ID: 3c1f8a2b9d10
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f8a2b9d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) -- mirrors the Index/index=True declarations in models.py
+INDEXES = [
+    ('ix_contacts_user_id_created_at', 'contacts', ['user_id', 'created_at']),
+    ('ix_leads_user_id_created_at', 'leads', ['user_id', 'created_at']),
+    ('ix_leads_user_id_status', 'leads', ['user_id', 'status']),
+    ('ix_leads_contact_id', 'leads', ['contact_id']),
+    ('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at']),
+    ('ix_orders_user_id_status', 'orders', ['user_id', 'status']),
+    ('ix_orders_contact_id', 'orders', ['contact_id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_invoices_user_id_created_at', 'invoices', ['user_id', 'created_at']),
+    ('ix_invoices_user_id_status', 'invoices', ['user_id', 'status']),
+    ('ix_invoices_user_id_due_date', 'invoices', ['user_id', 'due_date']),
+    ('ix_invoices_contact_id', 'invoices', ['contact_id']),
+    ('ix_invoices_order_id', 'invoices', ['order_id']),
+    ('ix_receipts_user_id_created_at', 'receipts', ['user_id', 'created_at']),
+    ('ix_receipts_invoice_id', 'receipts', ['invoice_id']),
+    ('ix_accounting_entries_user_id_date', 'accounting_entries', ['user_id', 'date']),
+    ('ix_accounting_entries_user_id_entry_type_date', 'accounting_entries', ['user_id', 'entry_type', 'date']),
+]
+
+
+def upgrade():
+    # setup_db() runs db.create_all(), so fresh databases may already have these
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,29 @@
+"""index invoices on (user_id, status, due_date)
+
+Revision ID: 7e4b2c91a5f3
+Revises: 3c1f8a2b9d10
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4b2c91a5f3'
+down_revision = '3c1f8a2b9d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves status filters alone and "status + due date range" list filters;
+    # supersedes the (user_id, status) index
+    op.create_index('ix_invoices_user_id_status_due_date', 'invoices',
+                    ['user_id', 'status', 'due_date'], unique=False, if_not_exists=True)
+    op.drop_index('ix_invoices_user_id_status', table_name='invoices', if_exists=True)
+
+
+def downgrade():
+    op.create_index('ix_invoices_user_id_status', 'invoices',
+                    ['user_id', 'status'], unique=False, if_not_exists=True)
+    op.drop_index('ix_invoices_user_id_status_due_date', table_name='invoices', if_exists=True)
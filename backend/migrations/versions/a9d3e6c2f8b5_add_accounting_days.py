@@ -0,0 +1,42 @@
+"""add the incrementally maintained daily accounting rollup
+
+Revision ID: a9d3e6c2f8b5
+Revises: f2c5a8e1b7d3
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e6c2f8b5'
+down_revision = 'f2c5a8e1b7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('accounting_days',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('day', sa.Date(), nullable=False),
+                    sa.Column('entry_type', sa.String(length=20), nullable=False),
+                    sa.Column('category', sa.String(length=50), nullable=False),
+                    sa.Column('total', sa.Float(), nullable=False),
+                    sa.Column('entry_count', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                    sa.PrimaryKeyConstraint('user_id', 'day', 'entry_type', 'category'),
+                    if_not_exists=True)
+
+    # Backfill from the existing entries (same definition as `flask repair-rollups`)
+    op.execute('DELETE FROM accounting_days')
+    op.execute("""
+        INSERT INTO accounting_days (user_id, day, entry_type, category, total, entry_count)
+        SELECT user_id, DATE(date), entry_type, category, SUM(amount), COUNT(*)
+        FROM accounting_entries
+        GROUP BY user_id, DATE(date), entry_type, category
+    """)
+
+
+def downgrade():
+    op.drop_table('accounting_days', if_exists=True)
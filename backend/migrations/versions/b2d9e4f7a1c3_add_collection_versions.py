@@ -0,0 +1,30 @@
+"""add per-user collection versions for conditional GETs
+
+Revision ID: b2d9e4f7a1c3
+Revises: 7e4b2c91a5f3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d9e4f7a1c3'
+down_revision = '7e4b2c91a5f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('collection_versions',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('collection', sa.String(length=50), nullable=False),
+                    sa.Column('version', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                    sa.PrimaryKeyConstraint('user_id', 'collection'),
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_table('collection_versions', if_exists=True)
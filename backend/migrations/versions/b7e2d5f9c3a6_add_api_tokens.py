@@ -0,0 +1,36 @@
+"""add api tokens for bearer authentication
+
+Revision ID: b7e2d5f9c3a6
+Revises: a9d3e6c2f8b5
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d5f9c3a6'
+down_revision = 'a9d3e6c2f8b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('api_tokens',
+                    sa.Column('id', sa.String(length=32), nullable=False),
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('name', sa.String(length=100), nullable=False),
+                    sa.Column('scopes', sa.String(length=500), nullable=False),
+                    sa.Column('created_at', sa.DateTime(), nullable=False),
+                    sa.Column('expires_at', sa.DateTime(), nullable=False),
+                    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                    sa.PrimaryKeyConstraint('id'),
+                    if_not_exists=True)
+    op.create_index('ix_api_tokens_user_id', 'api_tokens', ['user_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_api_tokens_user_id', table_name='api_tokens', if_exists=True)
+    op.drop_table('api_tokens', if_exists=True)
@@ -0,0 +1,35 @@
+"""add the per-user change feed
+
+Revision ID: c8f1a3d6e2b4
+Revises: b2d9e4f7a1c3
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f1a3d6e2b4'
+down_revision = 'b2d9e4f7a1c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('changes',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('collection', sa.String(length=50), nullable=False),
+                    sa.Column('resource_id', sa.Integer(), autoincrement=False, nullable=False),
+                    sa.Column('seq', sa.Integer(), nullable=False),
+                    sa.Column('deleted', sa.Boolean(), nullable=False),
+                    sa.Column('changed_at', sa.DateTime(), nullable=True),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                    sa.PrimaryKeyConstraint('user_id', 'collection', 'resource_id'),
+                    if_not_exists=True)
+    op.create_index('ix_changes_user_id_seq', 'changes', ['user_id', 'seq'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_changes_user_id_seq', table_name='changes', if_exists=True)
+    op.drop_table('changes', if_exists=True)
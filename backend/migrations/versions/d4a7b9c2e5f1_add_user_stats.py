@@ -0,0 +1,52 @@
+"""add incrementally maintained per-user stats
+
+Revision ID: d4a7b9c2e5f1
+Revises: c8f1a3d6e2b4
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7b9c2e5f1'
+down_revision = 'c8f1a3d6e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('contacts_count', sa.Integer(), nullable=False),
+                    sa.Column('leads_count', sa.Integer(), nullable=False),
+                    sa.Column('orders_count', sa.Integer(), nullable=False),
+                    sa.Column('invoices_count', sa.Integer(), nullable=False),
+                    sa.Column('receipts_count', sa.Integer(), nullable=False),
+                    sa.Column('accounting_entries_count', sa.Integer(), nullable=False),
+                    sa.Column('pipeline_value', sa.Float(), nullable=False),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                    sa.PrimaryKeyConstraint('user_id'),
+                    if_not_exists=True)
+
+    # Backfill from the existing rows (same definitions as `flask repair-stats`)
+    op.execute('DELETE FROM user_stats')
+    op.execute("""
+        INSERT INTO user_stats (user_id, contacts_count, leads_count, orders_count, invoices_count,
+                                receipts_count, accounting_entries_count, pipeline_value)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM contacts WHERE user_id = u.id),
+               (SELECT COUNT(*) FROM leads WHERE user_id = u.id),
+               (SELECT COUNT(*) FROM orders WHERE user_id = u.id),
+               (SELECT COUNT(*) FROM invoices WHERE user_id = u.id),
+               (SELECT COUNT(*) FROM receipts WHERE user_id = u.id),
+               (SELECT COUNT(*) FROM accounting_entries WHERE user_id = u.id),
+               (SELECT COALESCE(SUM(value), 0) FROM leads
+                 WHERE user_id = u.id AND status NOT IN ('Converted', 'Won', 'Lost'))
+        FROM users u
+    """)
+
+
+def downgrade():
+    op.drop_table('user_stats', if_exists=True)
@@ -0,0 +1,37 @@
+"""add the append-only activity feed
+
+Revision ID: e6b3c8d1f4a2
+Revises: d4a7b9c2e5f1
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b3c8d1f4a2'
+down_revision = 'd4a7b9c2e5f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('activity',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('collection', sa.String(length=50), nullable=False),
+                    sa.Column('resource_id', sa.Integer(), nullable=False),
+                    sa.Column('action', sa.String(length=20), nullable=False),
+                    sa.Column('title', sa.String(length=200), nullable=True),
+                    sa.Column('created_at', sa.DateTime(), nullable=False),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+                    sa.PrimaryKeyConstraint('id'),
+                    if_not_exists=True)
+    op.create_index('ix_activity_user_id_created_at', 'activity', ['user_id', 'created_at'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_activity_user_id_created_at', table_name='activity', if_exists=True)
+    op.drop_table('activity', if_exists=True)
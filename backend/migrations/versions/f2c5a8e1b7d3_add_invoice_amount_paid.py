@@ -0,0 +1,35 @@
+"""add incrementally maintained amount_paid to invoices
+
+Revision ID: f2c5a8e1b7d3
+Revises: e6b3c8d1f4a2
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c5a8e1b7d3'
+down_revision = 'e6b3c8d1f4a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # setup_db() runs db.create_all(), so a fresh database may already have the column
+    columns = [column['name'] for column in sa.inspect(op.get_bind()).get_columns('invoices')]
+    if 'amount_paid' not in columns:
+        with op.batch_alter_table('invoices', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('amount_paid', sa.Float(), nullable=False, server_default='0'))
+
+    # Backfill from the existing receipts (same definition as `flask repair-payments`)
+    op.execute("""
+        UPDATE invoices
+        SET amount_paid = COALESCE((SELECT SUM(amount) FROM receipts WHERE receipts.invoice_id = invoices.id), 0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_column('amount_paid')
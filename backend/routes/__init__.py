@@ -5,6 +5,12 @@ from backend.routes.order_routes import order_bp
 from backend.routes.invoice_routes import invoice_bp
 from backend.routes.receipt_routes import receipt_bp
 from backend.routes.accounting_routes import accounting_bp
+from backend.routes.change_routes import change_bp
+from backend.routes.stream_routes import stream_bp
+from backend.routes.dashboard_routes import dashboard_bp
+from backend.routes.activity_routes import activity_bp
+from backend.routes.metrics_routes import metrics_bp
+from backend.routes.token_routes import token_bp
 
 __all__ = [
     'auth_bp', 
@@ -13,5 +19,11 @@ __all__ = [
     'order_bp', 
     'invoice_bp', 
     'receipt_bp', 
-    'accounting_bp'
+    'accounting_bp',
+    'change_bp',
+    'stream_bp',
+    'dashboard_bp',
+    'activity_bp',
+    'metrics_bp',
+    'token_bp'
 ]
@@ -1,11 +1,60 @@
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
+from ..utils import paginate, apply_order, stream_rows, ListFilters
+from ..utils.analytics import pivot
+from ..utils.conditional import conditional_list, conditional_resource
+from ..utils.periods import DEFAULT_PERIOD, period_range
+from ..utils.serializers import ENTRY_FIELDS
 from ..database.models import db, AccountingEntry, Invoice, Receipt
-from datetime import datetime, timedelta
-from sqlalchemy import func
+from ..database.rollups import accounting_rows
+from datetime import date, datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
 
 accounting_bp = Blueprint('accounting', __name__)
 
+# Filters and sort keys accepted by the /api list endpoint
+ENTRY_FILTERS = ListFilters(
+    AccountingEntry,
+    equal=['entry_type', 'category'],
+    ranges=['date', 'amount'],
+    sorts=['date', 'amount'],
+    default_sort='date'
+)
+
+def accounting_summary(user_id, start_date=None, end_date=None):
+    """
+    Income and expense totals, overall and per category, from a single
+    GROUP BY entry_type, category over the daily rollup, so the work depends on
+    the number of days and categories rather than entries. Without dates, covers
+    all of the user's entries.
+    """
+    rows = accounting_rows(user_id, start_date, end_date)
+    statement = select(rows.c.entry_type, rows.c.category, func.sum(rows.c.total)).group_by(
+        rows.c.entry_type, rows.c.category
+    ).order_by(rows.c.category)
+
+    by_category = {'Income': {}, 'Expense': {}}
+    for entry_type, category, amount in db.session.execute(statement):
+        if entry_type in by_category:
+            by_category[entry_type][category] = amount
+
+    total_income = sum(by_category['Income'].values())
+    total_expenses = sum(by_category['Expense'].values())
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'net_profit': total_income - total_expenses,
+        'income_by_category': by_category['Income'],
+        'expense_by_category': by_category['Expense'],
+    }
+
+def cached_summary(user_id, start_date=None, end_date=None):
+    """accounting_summary() through the report cache"""
+    return current_app.extensions['report_cache'].get_or_compute(
+        user_id, 'summary', start_date, end_date, lambda: accounting_summary(user_id, start_date, end_date)
+    )
+
 # Web routes (Jinja2 templates)
 @accounting_bp.route('/accounting')
 @login_required
@@ -14,25 +63,21 @@ def accounting():
     entries = AccountingEntry.query.filter_by(user_id=current_user.id).order_by(AccountingEntry.date.desc()).all()
     
     # Calculate total income and expenses
-    total_income = db.session.query(func.sum(AccountingEntry.amount)).filter_by(
-        user_id=current_user.id, entry_type='Income'
-    ).scalar() or 0
-    
-    total_expenses = db.session.query(func.sum(AccountingEntry.amount)).filter_by(
-        user_id=current_user.id, entry_type='Expense'
-    ).scalar() or 0
-    
-    net_profit = total_income - total_expenses
+    summary = cached_summary(current_user.id)
     
     # Get recent invoices and receipts
-    recent_invoices = Invoice.query.filter_by(user_id=current_user.id).order_by(Invoice.created_at.desc()).limit(5).all()
-    recent_receipts = Receipt.query.filter_by(user_id=current_user.id).order_by(Receipt.created_at.desc()).limit(5).all()
+    recent_invoices = Invoice.query.options(joinedload(Invoice.contact)).filter_by(
+        user_id=current_user.id
+    ).order_by(Invoice.created_at.desc()).limit(5).all()
+    recent_receipts = Receipt.query.options(joinedload(Receipt.invoice)).filter_by(
+        user_id=current_user.id
+    ).order_by(Receipt.created_at.desc()).limit(5).all()
     
     return render_template('accounting.html', 
                           entries=entries, 
-                          total_income=total_income, 
-                          total_expenses=total_expenses, 
-                          net_profit=net_profit,
+                          total_income=summary['total_income'], 
+                          total_expenses=summary['total_expenses'], 
+                          net_profit=summary['net_profit'],
                           recent_invoices=recent_invoices,
                           recent_receipts=recent_receipts)
 
@@ -125,87 +170,50 @@ def delete_entry(entry_id):
 @login_required
 def reports():
     # Get the time period from request args
-    period = request.args.get('period', 'month')
-    
-    # Calculate the date range based on the period
-    end_date = datetime.utcnow()
-    if period == 'week':
-        start_date = end_date - timedelta(days=7)
-    elif period == 'month':
-        start_date = end_date - timedelta(days=30)
-    elif period == 'quarter':
-        start_date = end_date - timedelta(days=90)
-    elif period == 'year':
-        start_date = end_date - timedelta(days=365)
-    else:  # Default to month
-        start_date = end_date - timedelta(days=30)
-    
-    # Get income and expense entries within the date range
-    income_entries = AccountingEntry.query.filter(
-        AccountingEntry.user_id == current_user.id,
-        AccountingEntry.entry_type == 'Income',
-        AccountingEntry.date >= start_date,
-        AccountingEntry.date <= end_date
-    ).all()
-    
-    expense_entries = AccountingEntry.query.filter(
-        AccountingEntry.user_id == current_user.id,
-        AccountingEntry.entry_type == 'Expense',
-        AccountingEntry.date >= start_date,
-        AccountingEntry.date <= end_date
-    ).all()
-    
-    # Calculate totals
-    total_income = sum(entry.amount for entry in income_entries)
-    total_expenses = sum(entry.amount for entry in expense_entries)
-    net_profit = total_income - total_expenses
-    
-    # Aggregate data by category for charts
-    income_by_category = {}
-    for entry in income_entries:
-        if entry.category in income_by_category:
-            income_by_category[entry.category] += entry.amount
-        else:
-            income_by_category[entry.category] = entry.amount
-    
-    expense_by_category = {}
-    for entry in expense_entries:
-        if entry.category in expense_by_category:
-            expense_by_category[entry.category] += entry.amount
-        else:
-            expense_by_category[entry.category] = entry.amount
+    period = request.args.get('period', DEFAULT_PERIOD)
+    start_date, end_date = period_range(period)
     
     return render_template('accounting_reports.html',
                           period=period,
                           start_date=start_date,
                           end_date=end_date,
-                          income_entries=income_entries,
-                          expense_entries=expense_entries,
-                          total_income=total_income,
-                          total_expenses=total_expenses,
-                          net_profit=net_profit,
-                          income_by_category=income_by_category,
-                          expense_by_category=expense_by_category)
+                          **cached_summary(current_user.id, start_date, end_date))
 
 # API routes (for React frontend)
 @accounting_bp.route('/api/accounting/entries', methods=['GET'])
 @login_required
+@conditional_list('accounting_entries')
 def api_get_entries():
-    entries = AccountingEntry.query.filter_by(user_id=current_user.id).order_by(AccountingEntry.date.desc()).all()
+    query = AccountingEntry.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = ENTRY_FIELDS.select(request.args, [])
+        query, sort = ENTRY_FILTERS.apply(query, request.args)
+        query = ENTRY_FIELDS.project(query, fields, includes, [sort.column])
+        entries, next_cursor, limit = paginate(query, sort.column, AccountingEntry.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'entries': [
-            {
-                'id': entry.id,
-                'entry_type': entry.entry_type,
-                'category': entry.category,
-                'amount': entry.amount,
-                'description': entry.description,
-                'date': entry.date.isoformat(),
-                'created_at': entry.created_at.isoformat()
-            } for entry in entries
-        ]
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'entries': ENTRY_FIELDS.dump_rows(entries, fields, includes, [sort.column])
     }), 200
 
+@accounting_bp.route('/api/accounting/entries/export', methods=['GET'])
+@login_required
+@conditional_list('accounting_entries')
+def api_export_entries():
+    query = AccountingEntry.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = ENTRY_FIELDS.select(request.args, [])
+        query, sort = ENTRY_FILTERS.apply(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = ENTRY_FIELDS.project(query, fields, includes, [sort.column])
+    query = apply_order(query, sort.column, AccountingEntry.id, sort.descending, sort.null_value)
+    return stream_rows('entries', query, lambda rows: ENTRY_FIELDS.dump_rows(rows, fields, includes, [sort.column]))
+
 @accounting_bp.route('/api/accounting/entries', methods=['POST'])
 @login_required
 def api_create_entry():
@@ -241,32 +249,24 @@ def api_create_entry():
     
     return jsonify({
         'message': 'Accounting entry created successfully',
-        'entry': {
-            'id': new_entry.id,
-            'entry_type': new_entry.entry_type,
-            'category': new_entry.category,
-            'amount': new_entry.amount,
-            'description': new_entry.description,
-            'date': new_entry.date.isoformat(),
-            'created_at': new_entry.created_at.isoformat()
-        }
+        'entry': ENTRY_FIELDS.serialize(new_entry)
     }), 201
 
 @accounting_bp.route('/api/accounting/entries/<int:entry_id>', methods=['GET'])
 @login_required
+@conditional_resource(AccountingEntry)
 def api_get_entry(entry_id):
-    entry = AccountingEntry.query.filter_by(id=entry_id, user_id=current_user.id).first_or_404()
+    try:
+        fields, includes = ENTRY_FIELDS.select(request.args, [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    entry = AccountingEntry.query.options(*ENTRY_FIELDS.load_options(fields, includes)).filter_by(
+        id=entry_id, user_id=current_user.id
+    ).first_or_404()
     
     return jsonify({
-        'entry': {
-            'id': entry.id,
-            'entry_type': entry.entry_type,
-            'category': entry.category,
-            'amount': entry.amount,
-            'description': entry.description,
-            'date': entry.date.isoformat(),
-            'created_at': entry.created_at.isoformat()
-        }
+        'entry': ENTRY_FIELDS.serialize(entry, fields, includes)
     }), 200
 
 @accounting_bp.route('/api/accounting/entries/<int:entry_id>', methods=['PUT'])
@@ -302,15 +302,7 @@ def api_update_entry(entry_id):
     
     return jsonify({
         'message': 'Accounting entry updated successfully',
-        'entry': {
-            'id': entry.id,
-            'entry_type': entry.entry_type,
-            'category': entry.category,
-            'amount': entry.amount,
-            'description': entry.description,
-            'date': entry.date.isoformat(),
-            'created_at': entry.created_at.isoformat()
-        }
+        'entry': ENTRY_FIELDS.serialize(entry)
     }), 200
 
 @accounting_bp.route('/api/accounting/entries/<int:entry_id>', methods=['DELETE'])
@@ -329,81 +321,59 @@ def api_delete_entry(entry_id):
 @login_required
 def api_get_summary():
     # Get time period from query parameters
-    period = request.args.get('period', 'month')
-    
-    # Calculate the date range based on the period
-    end_date = datetime.utcnow()
-    if period == 'week':
-        start_date = end_date - timedelta(days=7)
-    elif period == 'month':
-        start_date = end_date - timedelta(days=30)
-    elif period == 'quarter':
-        start_date = end_date - timedelta(days=90)
-    elif period == 'year':
-        start_date = end_date - timedelta(days=365)
-    else:  # Default to month
-        start_date = end_date - timedelta(days=30)
-    
-    # Get total income and expenses
-    total_income = db.session.query(func.sum(AccountingEntry.amount)).filter(
-        AccountingEntry.user_id == current_user.id,
-        AccountingEntry.entry_type == 'Income',
-        AccountingEntry.date >= start_date,
-        AccountingEntry.date <= end_date
-    ).scalar() or 0
-    
-    total_expenses = db.session.query(func.sum(AccountingEntry.amount)).filter(
-        AccountingEntry.user_id == current_user.id,
-        AccountingEntry.entry_type == 'Expense',
-        AccountingEntry.date >= start_date,
-        AccountingEntry.date <= end_date
-    ).scalar() or 0
-    
-    # Get income and expenses by category
-    income_entries = AccountingEntry.query.filter(
-        AccountingEntry.user_id == current_user.id,
-        AccountingEntry.entry_type == 'Income',
-        AccountingEntry.date >= start_date,
-        AccountingEntry.date <= end_date
-    ).all()
-    
-    expense_entries = AccountingEntry.query.filter(
-        AccountingEntry.user_id == current_user.id,
-        AccountingEntry.entry_type == 'Expense',
-        AccountingEntry.date >= start_date,
-        AccountingEntry.date <= end_date
-    ).all()
-    
-    # Aggregate data by category
-    income_by_category = {}
-    for entry in income_entries:
-        if entry.category in income_by_category:
-            income_by_category[entry.category] += entry.amount
-        else:
-            income_by_category[entry.category] = entry.amount
-    
-    expense_by_category = {}
-    for entry in expense_entries:
-        if entry.category in expense_by_category:
-            expense_by_category[entry.category] += entry.amount
-        else:
-            expense_by_category[entry.category] = entry.amount
+    period = request.args.get('period', DEFAULT_PERIOD)
+    start_date, end_date = period_range(period)
+    summary = cached_summary(current_user.id, start_date, end_date)
     
     return jsonify({
         'summary': {
             'period': period,
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net_profit': total_income - total_expenses,
+            'total_income': summary['total_income'],
+            'total_expenses': summary['total_expenses'],
+            'net_profit': summary['net_profit'],
             'income_by_category': [
                 {'category': category, 'amount': amount}
-                for category, amount in income_by_category.items()
+                for category, amount in summary['income_by_category'].items()
             ],
             'expense_by_category': [
                 {'category': category, 'amount': amount}
-                for category, amount in expense_by_category.items()
+                for category, amount in summary['expense_by_category'].items()
             ]
         }
     }), 200
+
+@accounting_bp.route('/api/accounting/pivot', methods=['GET'])
+@login_required
+@conditional_list('accounting_entries')
+def api_get_pivot():
+    cache = current_app.extensions.get('cube_cache')
+    if cache is None:
+        return jsonify({'error': 'Pivots need the optional NumPy package on the server (pip install numpy)'}), 501
+    
+    args = request.args
+    if not args.get('rows'):
+        return jsonify({'error': 'rows is required'}), 400
+    
+    try:
+        start_date = date.fromisoformat(args['date_from']) if args.get('date_from') else None
+        end_date = date.fromisoformat(args['date_to']) if args.get('date_to') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+    
+    try:
+        result = pivot(
+            cache.get(current_user.id),
+            rows=args['rows'],
+            columns=args.get('columns') or None,
+            measure=args.get('measure', 'sum'),
+            entry_type=args.get('entry_type'),
+            categories=args['category'].split(',') if args.get('category') else None,
+            start_date=start_date,
+            end_date=end_date
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'pivot': result}), 200
@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from ..utils import paginate, ListFilters
+from ..utils.serializers import ACTIVITY_FIELDS
+from ..database.models import Activity
+from ..database.activity import activity_query
+
+activity_bp = Blueprint('activity', __name__)
+
+# Filters and sort keys accepted by the /api list endpoint
+ACTIVITY_FILTERS = ListFilters(
+    Activity,
+    equal=['collection', 'action', 'resource_id'],
+    ranges=['created_at']
+)
+
+@activity_bp.route('/api/activity', methods=['GET'])
+@login_required
+def api_get_activity():
+    query = activity_query(current_user.id, current_app.config['ACTIVITY_RETENTION_DAYS'])
+    try:
+        fields, includes = ACTIVITY_FIELDS.select(request.args, [])
+        query, sort = ACTIVITY_FILTERS.apply(query, request.args)
+        query = ACTIVITY_FIELDS.project(query, fields, includes, [sort.column])
+        activity, next_cursor, limit = paginate(query, sort.column, Activity.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'activity': ACTIVITY_FIELDS.dump_rows(activity, fields, includes, [sort.column])
+    }), 200
@@ -1,10 +1,28 @@
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from backend.database.models import db, User
+from backend.utils.passwords import HashingBusy
 
 auth_bp = Blueprint('auth', __name__)
 
+def check_login(email, password):
+    """
+    The user if `password` is theirs, otherwise None. Failures count towards the
+    login throttle, and a hash made with an outdated method or cost is replaced.
+    Raises HashingBusy when too many passwords are waiting to be hashed.
+    """
+    passwords = current_app.extensions['passwords']
+    throttle = current_app.extensions['login_throttle']
+    user = User.query.filter_by(email=email).first()
+    if not user or not passwords.check(user.password, password):
+        throttle.failed(email, request.remote_addr)
+        return None
+    throttle.succeeded(email)
+    if passwords.needs_rehash(user.password):
+        user.password = passwords.hash(password)
+        db.session.commit()
+    return user
+
 @auth_bp.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
@@ -21,11 +39,17 @@ def register():
             flash('Email already exists. Please login.', 'danger')
             return redirect(url_for('auth.login'))
         
+        try:
+            password_hash = current_app.extensions['passwords'].hash(password)
+        except HashingBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return redirect(url_for('auth.register'))
+        
         # Create new user
         new_user = User(
             name=name,
             email=email,
-            password=generate_password_hash(password, method='pbkdf2:sha256')
+            password=password_hash
         )
         
         # Add to database
@@ -47,10 +71,18 @@ def login():
         password = request.form.get('password')
         remember = True if request.form.get('remember') else False
         
-        # Check if user exists
-        user = User.query.filter_by(email=email).first()
+        wait = current_app.extensions['login_throttle'].retry_after(email, request.remote_addr)
+        if wait:
+            flash(f'Too many failed logins. Please try again in {wait} seconds.', 'danger')
+            return redirect(url_for('auth.login'))
         
-        if not user or not check_password_hash(user.password, password):
+        try:
+            user = check_login(email, password)
+        except HashingBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return redirect(url_for('auth.login'))
+        
+        if not user:
             flash('Please check your login details and try again.', 'danger')
             return redirect(url_for('auth.login'))
         
@@ -90,7 +122,7 @@ def api_register():
         new_user = User(
             name=data['name'],
             email=data['email'],
-            password=generate_password_hash(data['password'], method='pbkdf2:sha256')
+            password=current_app.extensions['passwords'].hash(data['password'])
         )
         
         # Add to database
@@ -106,6 +138,8 @@ def api_register():
                 'email': new_user.email
             }
         }), 201
+    except HashingBusy:
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
@@ -118,11 +152,13 @@ def api_login():
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Missing required fields'}), 400
     
+    wait = current_app.extensions['login_throttle'].retry_after(data['email'], request.remote_addr)
+    if wait:
+        return jsonify({'error': 'Too many failed logins'}), 429, {'Retry-After': str(wait)}
+    
     try:
-        # Check if user exists
-        user = User.query.filter_by(email=data['email']).first()
-        
-        if not user or not check_password_hash(user.password, data['password']):
+        user = check_login(data['email'], data['password'])
+        if not user:
             return jsonify({'error': 'Invalid email or password'}), 401
         
         # Create a session for the user
@@ -137,6 +173,8 @@ def api_login():
                 'email': user.email
             }
         }), 200
+    except HashingBusy:
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
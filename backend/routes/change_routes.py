@@ -0,0 +1,72 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from ..utils.pagination import get_limit
+from ..utils.serializers import (
+    CONTACT_FIELDS, LEAD_FIELDS, ORDER_FIELDS, INVOICE_FIELDS, RECEIPT_FIELDS, ENTRY_FIELDS
+)
+from ..database.models import db, Change, Contact, Lead, Order, Invoice, Receipt, AccountingEntry
+from ..database.versions import current_sequence
+
+change_bp = Blueprint('changes', __name__)
+
+# Collection -> (model, fieldset, includes); resources are returned in their list endpoint shape
+FEED = {
+    'contacts': (Contact, CONTACT_FIELDS, []),
+    'leads': (Lead, LEAD_FIELDS, ['contact']),
+    'orders': (Order, ORDER_FIELDS, ['contact', 'items']),
+    'invoices': (Invoice, INVOICE_FIELDS, ['contact', 'order']),
+    'receipts': (Receipt, RECEIPT_FIELDS, ['invoice']),
+    'accounting_entries': (AccountingEntry, ENTRY_FIELDS, []),
+}
+
+@change_bp.route('/api/changes', methods=['GET'])
+@login_required
+def api_get_changes():
+    """
+    Delta sync. Without `since`, returns the current cursor; call it before
+    loading the lists. With `since=<cursor>`, returns the resources created or
+    updated since then in their current state, plus the ids of deleted ones.
+    """
+    if 'since' not in request.args:
+        return jsonify({'cursor': str(current_sequence(current_user.id))}), 200
+
+    try:
+        since = int(request.args['since'])
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    try:
+        limit = get_limit()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = db.session.execute(
+        db.select(Change.collection, Change.resource_id, Change.deleted, Change.seq)
+        .where(Change.user_id == current_user.id, Change.seq > since)
+        .order_by(Change.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    updated = {collection: [] for collection in FEED}
+    deleted = {collection: [] for collection in FEED}
+    for collection, resource_id, is_deleted, seq in rows:
+        (deleted if is_deleted else updated)[collection].append(resource_id)
+
+    changes = {}
+    for collection, ids in updated.items():
+        model, fieldset, includes = FEED[collection]
+        if not ids:
+            changes[collection] = []
+            continue
+        # Rows deleted after the change was read drop out here; their tombstone follows later
+        query = model.query.filter(model.user_id == current_user.id, model.id.in_(ids))
+        query = fieldset.project(query, fieldset.fields, includes)
+        changes[collection] = fieldset.dump_rows(query.all(), fieldset.fields, includes)
+
+    return jsonify({
+        'cursor': str(rows[-1].seq if rows else since),
+        'has_more': has_more,
+        'changes': changes,
+        'deleted': deleted
+    }), 200
@@ -1,9 +1,20 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
+from ..utils import paginate, apply_order, stream_rows, ListFilters
+from ..utils.conditional import conditional_list, conditional_resource
+from ..utils.serializers import CONTACT_FIELDS
 from ..database.models import db, Contact
 
 contact_bp = Blueprint('contacts', __name__)
 
+# Filters and sort keys accepted by the /api list endpoint
+CONTACT_FILTERS = ListFilters(
+    Contact,
+    equal=['company'],
+    ranges=['created_at'],
+    sorts=['created_at', 'name']
+)
+
 # Web routes (Jinja2 templates)
 @contact_bp.route('/contacts')
 @login_required
@@ -84,24 +95,38 @@ def delete_contact(contact_id):
 # API routes (for React frontend)
 @contact_bp.route('/api/contacts', methods=['GET'])
 @login_required
+@conditional_list('contacts')
 def api_get_contacts():
-    contacts = Contact.query.filter_by(user_id=current_user.id).all()
+    query = Contact.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = CONTACT_FIELDS.select(request.args, [])
+        query, sort = CONTACT_FILTERS.apply(query, request.args)
+        query = CONTACT_FIELDS.project(query, fields, includes, [sort.column])
+        contacts, next_cursor, limit = paginate(query, sort.column, Contact.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'contacts': [
-            {
-                'id': contact.id,
-                'name': contact.name,
-                'email': contact.email,
-                'phone': contact.phone,
-                'company': contact.company,
-                'address': contact.address,
-                'notes': contact.notes,
-                'created_at': contact.created_at.isoformat(),
-                'updated_at': contact.updated_at.isoformat()
-            } for contact in contacts
-        ]
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'contacts': CONTACT_FIELDS.dump_rows(contacts, fields, includes, [sort.column])
     }), 200
 
+@contact_bp.route('/api/contacts/export', methods=['GET'])
+@login_required
+@conditional_list('contacts')
+def api_export_contacts():
+    query = Contact.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = CONTACT_FIELDS.select(request.args, [])
+        query, sort = CONTACT_FILTERS.apply(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = CONTACT_FIELDS.project(query, fields, includes, [sort.column])
+    query = apply_order(query, sort.column, Contact.id, sort.descending, sort.null_value)
+    return stream_rows('contacts', query, lambda rows: CONTACT_FIELDS.dump_rows(rows, fields, includes, [sort.column]))
+
 @contact_bp.route('/api/contacts', methods=['POST'])
 @login_required
 def api_create_contact():
@@ -125,36 +150,24 @@ def api_create_contact():
     
     return jsonify({
         'message': 'Contact created successfully',
-        'contact': {
-            'id': new_contact.id,
-            'name': new_contact.name,
-            'email': new_contact.email,
-            'phone': new_contact.phone,
-            'company': new_contact.company,
-            'address': new_contact.address,
-            'notes': new_contact.notes,
-            'created_at': new_contact.created_at.isoformat(),
-            'updated_at': new_contact.updated_at.isoformat()
-        }
+        'contact': CONTACT_FIELDS.serialize(new_contact)
     }), 201
 
 @contact_bp.route('/api/contacts/<int:contact_id>', methods=['GET'])
 @login_required
+@conditional_resource(Contact)
 def api_get_contact(contact_id):
-    contact = Contact.query.filter_by(id=contact_id, user_id=current_user.id).first_or_404()
+    try:
+        fields, includes = CONTACT_FIELDS.select(request.args, [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    contact = Contact.query.options(*CONTACT_FIELDS.load_options(fields, includes)).filter_by(
+        id=contact_id, user_id=current_user.id
+    ).first_or_404()
     
     return jsonify({
-        'contact': {
-            'id': contact.id,
-            'name': contact.name,
-            'email': contact.email,
-            'phone': contact.phone,
-            'company': contact.company,
-            'address': contact.address,
-            'notes': contact.notes,
-            'created_at': contact.created_at.isoformat(),
-            'updated_at': contact.updated_at.isoformat()
-        }
+        'contact': CONTACT_FIELDS.serialize(contact, fields, includes)
     }), 200
 
 @contact_bp.route('/api/contacts/<int:contact_id>', methods=['PUT'])
@@ -183,17 +196,7 @@ def api_update_contact(contact_id):
     
     return jsonify({
         'message': 'Contact updated successfully',
-        'contact': {
-            'id': contact.id,
-            'name': contact.name,
-            'email': contact.email,
-            'phone': contact.phone,
-            'company': contact.company,
-            'address': contact.address,
-            'notes': contact.notes,
-            'created_at': contact.created_at.isoformat(),
-            'updated_at': contact.updated_at.isoformat()
-        }
+        'contact': CONTACT_FIELDS.serialize(contact)
     }), 200
 
 @contact_bp.route('/api/contacts/<int:contact_id>', methods=['DELETE'])
@@ -0,0 +1,100 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from sqlalchemy import func, select
+from ..utils.periods import DEFAULT_PERIOD, period_range
+from ..utils.serializers import CONTACT_FIELDS, LEAD_FIELDS, ORDER_FIELDS, INVOICE_FIELDS, ACTIVITY_FIELDS
+from ..database.models import db, Contact, Lead, Order, Invoice, Activity
+from ..database.stats import get_stats
+from ..database.activity import activity_query
+from ..database.rollups import accounting_rows
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+DEFAULT_LATEST = 5
+MAX_LATEST = 20
+RECENT_ACTIVITY = 10
+
+OPEN_INVOICE_STATUSES = ('Unpaid', 'Partial')
+
+# Entity -> (model, fieldset, columns shown in the "latest" lists)
+LATEST = {
+    'contacts': (Contact, CONTACT_FIELDS, ['id', 'name', 'email', 'company', 'created_at']),
+    'leads': (Lead, LEAD_FIELDS, ['id', 'title', 'status', 'value', 'created_at']),
+    'orders': (Order, ORDER_FIELDS, ['id', 'order_number', 'status', 'total_amount', 'created_at']),
+    'invoices': (Invoice, INVOICE_FIELDS, ['id', 'invoice_number', 'amount', 'status', 'due_date', 'created_at']),
+}
+
+# The latest lists read the collections above, and the activity feed records writes to all of these
+LIST_COLLECTIONS = ('contacts', 'leads', 'orders', 'invoices', 'receipts', 'accounting_entries')
+
+def _total(column, *criteria):
+    return select(func.coalesce(func.sum(column), 0)).where(*criteria).scalar_subquery()
+
+def dashboard_totals(user_id, start_date, end_date):
+    """Money totals that aren't kept in the user's stats row, in a single round trip"""
+    accounting = accounting_rows(user_id, start_date, end_date)
+    statement = select(
+        _total(Invoice.amount - Invoice.amount_paid,
+               Invoice.user_id == user_id,
+               Invoice.status.in_(OPEN_INVOICE_STATUSES)).label('receivables'),
+        _total(accounting.c.total, accounting.c.entry_type == 'Income').label('revenue'),
+    )
+    return db.session.execute(statement).one()._asdict()
+
+def dashboard_lists(user_id, latest, retention_days):
+    """The latest records of each type and the most recent activity, as plain rows"""
+    recent = {}
+    for name, (model, fieldset, fields) in LATEST.items():
+        query = model.query.filter_by(user_id=user_id)
+        query = fieldset.project(query, fields, []).order_by(model.created_at.desc(), model.id.desc())
+        recent[name] = fieldset.dump_rows(query.limit(latest).all(), fields, []) if latest else []
+
+    activity = activity_query(user_id, retention_days)
+    activity = ACTIVITY_FIELDS.project(activity, ACTIVITY_FIELDS.fields, [])
+    activity = activity.order_by(Activity.created_at.desc(), Activity.id.desc()).limit(RECENT_ACTIVITY).all()
+    return {'latest': recent, 'recent_activity': ACTIVITY_FIELDS.dump_rows(activity, ACTIVITY_FIELDS.fields, [])}
+
+@dashboard_bp.route('/api/dashboard', methods=['GET'])
+@login_required
+def api_get_dashboard():
+    period = request.args.get('period', DEFAULT_PERIOD)
+    try:
+        latest = int(request.args.get('latest', DEFAULT_LATEST))
+    except ValueError:
+        return jsonify({'error': 'latest must be an integer'}), 400
+    latest = max(0, min(latest, MAX_LATEST))
+
+    start_date, end_date = period_range(period)
+    stats = get_stats(current_user.id)
+    report_cache = current_app.extensions['report_cache']
+    totals = report_cache.get_or_compute(
+        current_user.id, 'dashboard', start_date, end_date,
+        lambda: dashboard_totals(current_user.id, start_date, end_date),
+        collections=('invoices', 'accounting_entries')
+    )
+    # Any write to the user's records drops these, so they're served from the cache between writes
+    retention_days = current_app.config['ACTIVITY_RETENTION_DAYS']
+    lists = report_cache.get_or_compute(
+        current_user.id, 'dashboard-lists', None, None,
+        lambda: dashboard_lists(current_user.id, latest, retention_days),
+        params=(latest, retention_days), collections=LIST_COLLECTIONS
+    )
+
+    return jsonify({
+        'counts': {
+            'contacts': stats.contacts_count,
+            'leads': stats.leads_count,
+            'orders': stats.orders_count,
+            'invoices': stats.invoices_count
+        },
+        'pipeline_value': stats.pipeline_value,
+        'receivables': totals['receivables'],
+        'revenue': {
+            'period': period,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'total': totals['revenue']
+        },
+        'latest': lists['latest'],
+        'recent_activity': lists['recent_activity']
+    }), 200
@@ -1,15 +1,30 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
+from ..utils import paginate, apply_order, stream_rows, ListFilters
+from ..utils.conditional import conditional_list, conditional_resource
+from ..utils.serializers import INVOICE_FIELDS
 from ..database.models import db, Invoice, Contact, Order
 from datetime import datetime, timedelta
 
 invoice_bp = Blueprint('invoices', __name__)
 
+# Filters and sort keys accepted by the /api list endpoint
+INVOICE_FILTERS = ListFilters(
+    Invoice,
+    equal=['status', 'contact_id', 'order_id'],
+    ranges=['created_at', 'due_date', 'amount'],
+    sorts=['created_at', 'due_date', 'amount']
+)
+
 # Web routes (Jinja2 templates)
 @invoice_bp.route('/invoices')
 @login_required
 def invoices():
-    user_invoices = Invoice.query.filter_by(user_id=current_user.id).all()
+    user_invoices = Invoice.query.options(
+        joinedload(Invoice.contact),
+        joinedload(Invoice.order)
+    ).filter_by(user_id=current_user.id).all()
     return render_template('invoices.html', invoices=user_invoices)
 
 @invoice_bp.route('/invoices/add', methods=['GET', 'POST'])
@@ -137,32 +152,38 @@ def delete_invoice(invoice_id):
 # API routes (for React frontend)
 @invoice_bp.route('/api/invoices', methods=['GET'])
 @login_required
+@conditional_list('invoices', 'contacts', 'orders', 'receipts')
 def api_get_invoices():
-    invoices = Invoice.query.filter_by(user_id=current_user.id).all()
+    query = Invoice.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = INVOICE_FIELDS.select(request.args, ['contact', 'order'])
+        query, sort = INVOICE_FILTERS.apply(query, request.args)
+        query = INVOICE_FIELDS.project(query, fields, includes, [sort.column])
+        invoices, next_cursor, limit = paginate(query, sort.column, Invoice.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'invoices': [
-            {
-                'id': invoice.id,
-                'invoice_number': invoice.invoice_number,
-                'amount': invoice.amount,
-                'status': invoice.status,
-                'due_date': invoice.due_date.isoformat(),
-                'notes': invoice.notes,
-                'created_at': invoice.created_at.isoformat(),
-                'updated_at': invoice.updated_at.isoformat(),
-                'contact': {
-                    'id': invoice.contact.id,
-                    'name': invoice.contact.name,
-                    'email': invoice.contact.email
-                },
-                'order': {
-                    'id': invoice.order.id,
-                    'order_number': invoice.order.order_number
-                } if invoice.order else None
-            } for invoice in invoices
-        ]
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'invoices': INVOICE_FIELDS.dump_rows(invoices, fields, includes, [sort.column])
     }), 200
 
+@invoice_bp.route('/api/invoices/export', methods=['GET'])
+@login_required
+@conditional_list('invoices', 'contacts', 'orders', 'receipts')
+def api_export_invoices():
+    query = Invoice.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = INVOICE_FIELDS.select(request.args, ['contact', 'order'])
+        query, sort = INVOICE_FILTERS.apply(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = INVOICE_FIELDS.project(query, fields, includes, [sort.column])
+    query = apply_order(query, sort.column, Invoice.id, sort.descending, sort.null_value)
+    return stream_rows('invoices', query, lambda rows: INVOICE_FIELDS.dump_rows(rows, fields, includes, [sort.column]))
+
 @invoice_bp.route('/api/invoices', methods=['POST'])
 @login_required
 def api_create_invoice():
@@ -204,61 +225,24 @@ def api_create_invoice():
     
     return jsonify({
         'message': 'Invoice created successfully',
-        'invoice': {
-            'id': new_invoice.id,
-            'invoice_number': new_invoice.invoice_number,
-            'amount': new_invoice.amount,
-            'status': new_invoice.status,
-            'due_date': new_invoice.due_date.isoformat(),
-            'notes': new_invoice.notes,
-            'created_at': new_invoice.created_at.isoformat(),
-            'updated_at': new_invoice.updated_at.isoformat(),
-            'contact': {
-                'id': contact.id,
-                'name': contact.name,
-                'email': contact.email
-            },
-            'order': {
-                'id': order.id,
-                'order_number': order.order_number
-            } if order else None
-        }
+        'invoice': INVOICE_FIELDS.serialize(new_invoice, includes=['contact', 'order'])
     }), 201
 
 @invoice_bp.route('/api/invoices/<int:invoice_id>', methods=['GET'])
 @login_required
+@conditional_resource(Invoice, 'contacts', 'orders', 'receipts')
 def api_get_invoice(invoice_id):
-    invoice = Invoice.query.filter_by(id=invoice_id, user_id=current_user.id).first_or_404()
+    try:
+        fields, includes = INVOICE_FIELDS.select(request.args, ['contact', 'order', 'receipts'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    invoice = Invoice.query.options(*INVOICE_FIELDS.load_options(fields, includes)).filter_by(
+        id=invoice_id, user_id=current_user.id
+    ).first_or_404()
     
     return jsonify({
-        'invoice': {
-            'id': invoice.id,
-            'invoice_number': invoice.invoice_number,
-            'amount': invoice.amount,
-            'status': invoice.status,
-            'due_date': invoice.due_date.isoformat(),
-            'notes': invoice.notes,
-            'created_at': invoice.created_at.isoformat(),
-            'updated_at': invoice.updated_at.isoformat(),
-            'contact': {
-                'id': invoice.contact.id,
-                'name': invoice.contact.name,
-                'email': invoice.contact.email
-            },
-            'order': {
-                'id': invoice.order.id,
-                'order_number': invoice.order.order_number
-            } if invoice.order else None,
-            'receipts': [
-                {
-                    'id': receipt.id,
-                    'receipt_number': receipt.receipt_number,
-                    'amount': receipt.amount,
-                    'payment_method': receipt.payment_method,
-                    'created_at': receipt.created_at.isoformat()
-                } for receipt in invoice.receipts
-            ]
-        }
+        'invoice': INVOICE_FIELDS.serialize(invoice, fields, includes)
     }), 200
 
 @invoice_bp.route('/api/invoices/<int:invoice_id>', methods=['PUT'])
@@ -306,25 +290,7 @@ def api_update_invoice(invoice_id):
     
     return jsonify({
         'message': 'Invoice updated successfully',
-        'invoice': {
-            'id': invoice.id,
-            'invoice_number': invoice.invoice_number,
-            'amount': invoice.amount,
-            'status': invoice.status,
-            'due_date': invoice.due_date.isoformat(),
-            'notes': invoice.notes,
-            'created_at': invoice.created_at.isoformat(),
-            'updated_at': invoice.updated_at.isoformat(),
-            'contact': {
-                'id': invoice.contact.id,
-                'name': invoice.contact.name,
-                'email': invoice.contact.email
-            },
-            'order': {
-                'id': invoice.order.id,
-                'order_number': invoice.order.order_number
-            } if invoice.order else None
-        }
+        'invoice': INVOICE_FIELDS.serialize(invoice, includes=['contact', 'order'])
     }), 200
 
 @invoice_bp.route('/api/invoices/<int:invoice_id>', methods=['DELETE'])
@@ -1,14 +1,27 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
+from ..utils import paginate, apply_order, stream_rows, ListFilters
+from ..utils.conditional import conditional_list, conditional_resource
+from ..utils.serializers import LEAD_FIELDS
 from ..database.models import db, Lead, Contact
 
 lead_bp = Blueprint('leads', __name__)
 
+# Filters and sort keys accepted by the /api list endpoint
+LEAD_FILTERS = ListFilters(
+    Lead,
+    equal=['status', 'contact_id'],
+    ranges=['created_at', 'value'],
+    sorts=['created_at', 'value', 'title'],
+    nullable_sorts={'value': 0}
+)
+
 # Web routes (Jinja2 templates)
 @lead_bp.route('/leads')
 @login_required
 def leads():
-    user_leads = Lead.query.filter_by(user_id=current_user.id).all()
+    user_leads = Lead.query.options(joinedload(Lead.contact)).filter_by(user_id=current_user.id).all()
     return render_template('leads.html', leads=user_leads)
 
 @lead_bp.route('/leads/add', methods=['GET', 'POST'])
@@ -103,27 +116,38 @@ def delete_lead(lead_id):
 # API routes (for React frontend)
 @lead_bp.route('/api/leads', methods=['GET'])
 @login_required
+@conditional_list('leads', 'contacts')
 def api_get_leads():
-    leads = Lead.query.filter_by(user_id=current_user.id).all()
+    query = Lead.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = LEAD_FIELDS.select(request.args, ['contact'])
+        query, sort = LEAD_FILTERS.apply(query, request.args)
+        query = LEAD_FIELDS.project(query, fields, includes, [sort.column])
+        leads, next_cursor, limit = paginate(query, sort.column, Lead.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'leads': [
-            {
-                'id': lead.id,
-                'title': lead.title,
-                'status': lead.status,
-                'value': lead.value,
-                'notes': lead.notes,
-                'created_at': lead.created_at.isoformat(),
-                'updated_at': lead.updated_at.isoformat(),
-                'contact': {
-                    'id': lead.contact.id,
-                    'name': lead.contact.name,
-                    'email': lead.contact.email
-                }
-            } for lead in leads
-        ]
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'leads': LEAD_FIELDS.dump_rows(leads, fields, includes, [sort.column])
     }), 200
 
+@lead_bp.route('/api/leads/export', methods=['GET'])
+@login_required
+@conditional_list('leads', 'contacts')
+def api_export_leads():
+    query = Lead.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = LEAD_FIELDS.select(request.args, ['contact'])
+        query, sort = LEAD_FILTERS.apply(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = LEAD_FIELDS.project(query, fields, includes, [sort.column])
+    query = apply_order(query, sort.column, Lead.id, sort.descending, sort.null_value)
+    return stream_rows('leads', query, lambda rows: LEAD_FIELDS.dump_rows(rows, fields, includes, [sort.column]))
+
 @lead_bp.route('/api/leads', methods=['POST'])
 @login_required
 def api_create_lead():
@@ -151,43 +175,24 @@ def api_create_lead():
     
     return jsonify({
         'message': 'Lead created successfully',
-        'lead': {
-            'id': new_lead.id,
-            'title': new_lead.title,
-            'status': new_lead.status,
-            'value': new_lead.value,
-            'notes': new_lead.notes,
-            'created_at': new_lead.created_at.isoformat(),
-            'updated_at': new_lead.updated_at.isoformat(),
-            'contact': {
-                'id': contact.id,
-                'name': contact.name,
-                'email': contact.email
-            }
-        }
+        'lead': LEAD_FIELDS.serialize(new_lead, includes=['contact'])
     }), 201
 
 @lead_bp.route('/api/leads/<int:lead_id>', methods=['GET'])
 @login_required
+@conditional_resource(Lead, 'contacts')
 def api_get_lead(lead_id):
-    lead = Lead.query.filter_by(id=lead_id, user_id=current_user.id).first_or_404()
-    contact = lead.contact
+    try:
+        fields, includes = LEAD_FIELDS.select(request.args, ['contact'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    lead = Lead.query.options(*LEAD_FIELDS.load_options(fields, includes)).filter_by(
+        id=lead_id, user_id=current_user.id
+    ).first_or_404()
     
     return jsonify({
-        'lead': {
-            'id': lead.id,
-            'title': lead.title,
-            'status': lead.status,
-            'value': lead.value,
-            'notes': lead.notes,
-            'created_at': lead.created_at.isoformat(),
-            'updated_at': lead.updated_at.isoformat(),
-            'contact': {
-                'id': contact.id,
-                'name': contact.name,
-                'email': contact.email
-            }
-        }
+        'lead': LEAD_FIELDS.serialize(lead, fields, includes)
     }), 200
 
 @lead_bp.route('/api/leads/<int:lead_id>', methods=['PUT'])
@@ -218,20 +223,7 @@ def api_update_lead(lead_id):
     
     return jsonify({
         'message': 'Lead updated successfully',
-        'lead': {
-            'id': lead.id,
-            'title': lead.title,
-            'status': lead.status,
-            'value': lead.value,
-            'notes': lead.notes,
-            'created_at': lead.created_at.isoformat(),
-            'updated_at': lead.updated_at.isoformat(),
-            'contact': {
-                'id': lead.contact.id,
-                'name': lead.contact.name,
-                'email': lead.contact.email
-            }
-        }
+        'lead': LEAD_FIELDS.serialize(lead, includes=['contact'])
     }), 200
 
 @lead_bp.route('/api/leads/<int:lead_id>', methods=['DELETE'])
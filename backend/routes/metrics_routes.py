@@ -0,0 +1,11 @@
+import os
+from flask import Blueprint, jsonify, current_app
+from flask_login import login_required
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics/cache', methods=['GET'])
+@login_required
+def api_get_cache_metrics():
+    # Counts are per worker process; the pid tells responses from different workers apart
+    return jsonify({'pid': os.getpid(), **current_app.extensions['cache'].stats()}), 200
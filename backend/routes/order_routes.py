@@ -1,14 +1,29 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload, selectinload
+from ..utils import paginate, apply_order, stream_rows, ListFilters
+from ..utils.conditional import conditional_list, conditional_resource
+from ..utils.serializers import ORDER_FIELDS
 from ..database.models import db, Order, OrderItem, Contact
 
 order_bp = Blueprint('orders', __name__)
 
+# Filters and sort keys accepted by the /api list endpoint
+ORDER_FILTERS = ListFilters(
+    Order,
+    equal=['status', 'contact_id'],
+    ranges=['created_at', 'total_amount'],
+    sorts=['created_at', 'total_amount']
+)
+
 # Web routes (Jinja2 templates)
 @order_bp.route('/orders')
 @login_required
 def orders():
-    user_orders = Order.query.filter_by(user_id=current_user.id).all()
+    user_orders = Order.query.options(
+        joinedload(Order.contact),
+        selectinload(Order.items)
+    ).filter_by(user_id=current_user.id).all()
     return render_template('orders.html', orders=user_orders)
 
 @order_bp.route('/orders/add', methods=['GET', 'POST'])
@@ -140,35 +155,38 @@ def delete_order(order_id):
 # API routes (for React frontend)
 @order_bp.route('/api/orders', methods=['GET'])
 @login_required
+@conditional_list('orders', 'order_items', 'contacts')
 def api_get_orders():
-    orders = Order.query.filter_by(user_id=current_user.id).all()
+    query = Order.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = ORDER_FIELDS.select(request.args, ['contact', 'items'])
+        query, sort = ORDER_FILTERS.apply(query, request.args)
+        query = ORDER_FIELDS.project(query, fields, includes, [sort.column])
+        orders, next_cursor, limit = paginate(query, sort.column, Order.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'orders': [
-            {
-                'id': order.id,
-                'order_number': order.order_number,
-                'status': order.status,
-                'total_amount': order.total_amount,
-                'notes': order.notes,
-                'created_at': order.created_at.isoformat(),
-                'updated_at': order.updated_at.isoformat(),
-                'contact': {
-                    'id': order.contact.id,
-                    'name': order.contact.name,
-                    'email': order.contact.email
-                },
-                'items': [
-                    {
-                        'id': item.id,
-                        'product_name': item.product_name,
-                        'quantity': item.quantity,
-                        'price': item.price
-                    } for item in order.items
-                ]
-            } for order in orders
-        ]
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'orders': ORDER_FIELDS.dump_rows(orders, fields, includes, [sort.column])
     }), 200
 
+@order_bp.route('/api/orders/export', methods=['GET'])
+@login_required
+@conditional_list('orders', 'order_items', 'contacts')
+def api_export_orders():
+    query = Order.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = ORDER_FIELDS.select(request.args, ['contact', 'items'])
+        query, sort = ORDER_FILTERS.apply(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = ORDER_FIELDS.project(query, fields, includes, [sort.column])
+    query = apply_order(query, sort.column, Order.id, sort.descending, sort.null_value)
+    return stream_rows('orders', query, lambda rows: ORDER_FIELDS.dump_rows(rows, fields, includes, [sort.column]))
+
 @order_bp.route('/api/orders', methods=['POST'])
 @login_required
 def api_create_order():
@@ -206,64 +224,26 @@ def api_create_order():
     
     db.session.commit()
     
-    # Get all items for the response
-    items = [
-        {
-            'id': item.id,
-            'product_name': item.product_name,
-            'quantity': item.quantity,
-            'price': item.price
-        } for item in new_order.items
-    ]
-    
     return jsonify({
         'message': 'Order created successfully',
-        'order': {
-            'id': new_order.id,
-            'order_number': new_order.order_number,
-            'status': new_order.status,
-            'total_amount': new_order.total_amount,
-            'notes': new_order.notes,
-            'created_at': new_order.created_at.isoformat(),
-            'updated_at': new_order.updated_at.isoformat(),
-            'contact': {
-                'id': contact.id,
-                'name': contact.name,
-                'email': contact.email
-            },
-            'items': items
-        }
+        'order': ORDER_FIELDS.serialize(new_order, includes=['contact', 'items'])
     }), 201
 
 @order_bp.route('/api/orders/<int:order_id>', methods=['GET'])
 @login_required
+@conditional_resource(Order, 'order_items', 'contacts')
 def api_get_order(order_id):
-    order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
-    contact = order.contact
+    try:
+        fields, includes = ORDER_FIELDS.select(request.args, ['contact', 'items'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    order = Order.query.options(*ORDER_FIELDS.load_options(fields, includes)).filter_by(
+        id=order_id, user_id=current_user.id
+    ).first_or_404()
     
     return jsonify({
-        'order': {
-            'id': order.id,
-            'order_number': order.order_number,
-            'status': order.status,
-            'total_amount': order.total_amount,
-            'notes': order.notes,
-            'created_at': order.created_at.isoformat(),
-            'updated_at': order.updated_at.isoformat(),
-            'contact': {
-                'id': contact.id,
-                'name': contact.name,
-                'email': contact.email
-            },
-            'items': [
-                {
-                    'id': item.id,
-                    'product_name': item.product_name,
-                    'quantity': item.quantity,
-                    'price': item.price
-                } for item in order.items
-            ]
-        }
+        'order': ORDER_FIELDS.serialize(order, fields, includes)
     }), 200
 
 @order_bp.route('/api/orders/<int:order_id>', methods=['PUT'])
@@ -311,28 +291,7 @@ def api_update_order(order_id):
     
     return jsonify({
         'message': 'Order updated successfully',
-        'order': {
-            'id': order.id,
-            'order_number': order.order_number,
-            'status': order.status,
-            'total_amount': order.total_amount,
-            'notes': order.notes,
-            'created_at': order.created_at.isoformat(),
-            'updated_at': order.updated_at.isoformat(),
-            'contact': {
-                'id': order.contact.id,
-                'name': order.contact.name,
-                'email': order.contact.email
-            },
-            'items': [
-                {
-                    'id': item.id,
-                    'product_name': item.product_name,
-                    'quantity': item.quantity,
-                    'price': item.price
-                } for item in order.items
-            ]
-        }
+        'order': ORDER_FIELDS.serialize(order, includes=['contact', 'items'])
     }), 200
 
 @order_bp.route('/api/orders/<int:order_id>', methods=['DELETE'])
@@ -1,14 +1,27 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
+from ..utils import paginate, apply_order, stream_rows, ListFilters
+from ..utils.conditional import conditional_list, conditional_resource
+from ..utils.serializers import RECEIPT_FIELDS
 from ..database.models import db, Receipt, Invoice
+from ..database.versions import for_update
 
 receipt_bp = Blueprint('receipts', __name__)
 
+# Filters and sort keys accepted by the /api list endpoint
+RECEIPT_FILTERS = ListFilters(
+    Receipt,
+    equal=['invoice_id', 'payment_method'],
+    ranges=['created_at', 'amount'],
+    sorts=['created_at', 'amount']
+)
+
 # Web routes (Jinja2 templates)
 @receipt_bp.route('/receipts')
 @login_required
 def receipts():
-    user_receipts = Receipt.query.filter_by(user_id=current_user.id).all()
+    user_receipts = Receipt.query.options(joinedload(Receipt.invoice)).filter_by(user_id=current_user.id).all()
     return render_template('receipts.html', receipts=user_receipts)
 
 @receipt_bp.route('/receipts/add', methods=['GET', 'POST'])
@@ -46,16 +59,10 @@ def add_receipt():
             payment_method=payment_method,
             notes=notes,
             user_id=current_user.id,
-            invoice_id=invoice_id
+            invoice_id=invoice.id
         )
         
-        # Update invoice status based on payment amount
-        total_paid = sum(r.amount for r in invoice.receipts) + float(amount)
-        if total_paid >= invoice.amount:
-            invoice.status = 'Paid'
-        elif total_paid > 0:
-            invoice.status = 'Partial'
-        
+        # The invoice's amount_paid and status are updated in the same flush
         db.session.add(new_receipt)
         db.session.commit()
         
@@ -73,52 +80,25 @@ def view_receipt(receipt_id):
 @receipt_bp.route('/receipts/<int:receipt_id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit_receipt(receipt_id):
-    receipt = Receipt.query.filter_by(id=receipt_id, user_id=current_user.id).first_or_404()
+    query = Receipt.query.filter_by(id=receipt_id, user_id=current_user.id)
+    # Saving locks the receipt, so the amount and invoice the payment hook
+    # takes back off the invoice can't be changed underneath it
+    receipt = (for_update(query) if request.method == 'POST' else query).first_or_404()
     invoices = Invoice.query.filter_by(user_id=current_user.id).all()
     
     if request.method == 'POST':
-        old_amount = receipt.amount
-        new_amount = float(request.form.get('amount'))
-        receipt.amount = new_amount
-        receipt.payment_method = request.form.get('payment_method')
-        receipt.notes = request.form.get('notes')
-        
         invoice_id = request.form.get('invoice_id')
         # Validate that invoice belongs to user
         invoice = Invoice.query.filter_by(id=invoice_id, user_id=current_user.id).first()
         if not invoice:
             flash('Invalid invoice!', 'danger')
             return redirect(url_for('receipts.edit_receipt', receipt_id=receipt.id))
-            
-        # If invoice changed, update status of old and new invoice
-        old_invoice = Invoice.query.get(receipt.invoice_id)
-        if old_invoice.id != int(invoice_id):
-            # Update old invoice status
-            old_invoice_total_paid = sum(r.amount for r in old_invoice.receipts if r.id != receipt.id)
-            if old_invoice_total_paid >= old_invoice.amount:
-                old_invoice.status = 'Paid'
-            elif old_invoice_total_paid > 0:
-                old_invoice.status = 'Partial'
-            else:
-                old_invoice.status = 'Unpaid'
-            
-            receipt.invoice_id = invoice_id
-            
-            # Update new invoice status
-            new_invoice_total_paid = sum(r.amount for r in invoice.receipts) + new_amount
-            if new_invoice_total_paid >= invoice.amount:
-                invoice.status = 'Paid'
-            elif new_invoice_total_paid > 0:
-                invoice.status = 'Partial'
-        else:
-            # Just update the same invoice status based on the new amount
-            total_paid = sum(r.amount for r in invoice.receipts if r.id != receipt.id) + new_amount
-            if total_paid >= invoice.amount:
-                invoice.status = 'Paid'
-            elif total_paid > 0:
-                invoice.status = 'Partial'
-            else:
-                invoice.status = 'Unpaid'
+        
+        receipt.amount = float(request.form.get('amount'))
+        receipt.payment_method = request.form.get('payment_method')
+        receipt.notes = request.form.get('notes')
+        # Moving the receipt re-totals both invoices in the same flush
+        receipt.invoice_id = invoice.id
         
         db.session.commit()
         
@@ -130,20 +110,10 @@ def edit_receipt(receipt_id):
 @receipt_bp.route('/receipts/<int:receipt_id>/delete', methods=['POST'])
 @login_required
 def delete_receipt(receipt_id):
-    receipt = Receipt.query.filter_by(id=receipt_id, user_id=current_user.id).first_or_404()
-    invoice = Invoice.query.get(receipt.invoice_id)
+    receipt = for_update(Receipt.query.filter_by(id=receipt_id, user_id=current_user.id)).first_or_404()
     
+    # The payment is taken off the invoice in the same flush
     db.session.delete(receipt)
-    
-    # Update invoice status
-    total_paid = sum(r.amount for r in invoice.receipts if r.id != receipt_id)
-    if total_paid >= invoice.amount:
-        invoice.status = 'Paid'
-    elif total_paid > 0:
-        invoice.status = 'Partial'
-    else:
-        invoice.status = 'Unpaid'
-    
     db.session.commit()
     
     flash('Receipt deleted successfully!', 'success')
@@ -152,25 +122,38 @@ def delete_receipt(receipt_id):
 # API routes (for React frontend)
 @receipt_bp.route('/api/receipts', methods=['GET'])
 @login_required
+@conditional_list('receipts', 'invoices')
 def api_get_receipts():
-    receipts = Receipt.query.filter_by(user_id=current_user.id).all()
+    query = Receipt.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = RECEIPT_FIELDS.select(request.args, ['invoice'])
+        query, sort = RECEIPT_FILTERS.apply(query, request.args)
+        query = RECEIPT_FIELDS.project(query, fields, includes, [sort.column])
+        receipts, next_cursor, limit = paginate(query, sort.column, Receipt.id, sort.descending, sort.null_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'receipts': [
-            {
-                'id': receipt.id,
-                'receipt_number': receipt.receipt_number,
-                'amount': receipt.amount,
-                'payment_method': receipt.payment_method,
-                'notes': receipt.notes,
-                'created_at': receipt.created_at.isoformat(),
-                'invoice': {
-                    'id': receipt.invoice.id,
-                    'invoice_number': receipt.invoice.invoice_number
-                }
-            } for receipt in receipts
-        ]
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'receipts': RECEIPT_FIELDS.dump_rows(receipts, fields, includes, [sort.column])
     }), 200
 
+@receipt_bp.route('/api/receipts/export', methods=['GET'])
+@login_required
+@conditional_list('receipts', 'invoices')
+def api_export_receipts():
+    query = Receipt.query.filter_by(user_id=current_user.id)
+    try:
+        fields, includes = RECEIPT_FIELDS.select(request.args, ['invoice'])
+        query, sort = RECEIPT_FILTERS.apply(query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = RECEIPT_FIELDS.project(query, fields, includes, [sort.column])
+    query = apply_order(query, sort.column, Receipt.id, sort.descending, sort.null_value)
+    return stream_rows('receipts', query, lambda rows: RECEIPT_FIELDS.dump_rows(rows, fields, includes, [sort.column]))
+
 @receipt_bp.route('/api/receipts', methods=['POST'])
 @login_required
 def api_create_receipt():
@@ -189,65 +172,44 @@ def api_create_receipt():
         payment_method=data['payment_method'],
         notes=data.get('notes'),
         user_id=current_user.id,
-        invoice_id=data['invoice_id']
+        invoice_id=invoice.id
     )
     
-    # Update invoice status based on payment amount
-    total_paid = sum(r.amount for r in invoice.receipts) + float(data['amount'])
-    if total_paid >= invoice.amount:
-        invoice.status = 'Paid'
-    elif total_paid > 0:
-        invoice.status = 'Partial'
-    
+    # The invoice's amount_paid and status are updated in the same flush
     db.session.add(new_receipt)
     db.session.commit()
     
     return jsonify({
         'message': 'Receipt created successfully',
-        'receipt': {
-            'id': new_receipt.id,
-            'receipt_number': new_receipt.receipt_number,
-            'amount': new_receipt.amount,
-            'payment_method': new_receipt.payment_method,
-            'notes': new_receipt.notes,
-            'created_at': new_receipt.created_at.isoformat(),
-            'invoice': {
-                'id': invoice.id,
-                'invoice_number': invoice.invoice_number
-            }
-        }
+        'receipt': RECEIPT_FIELDS.serialize(new_receipt, includes=['invoice'])
     }), 201
 
 @receipt_bp.route('/api/receipts/<int:receipt_id>', methods=['GET'])
 @login_required
+@conditional_resource(Receipt, 'invoices')
 def api_get_receipt(receipt_id):
-    receipt = Receipt.query.filter_by(id=receipt_id, user_id=current_user.id).first_or_404()
+    try:
+        fields, includes = RECEIPT_FIELDS.select(request.args, ['invoice'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    receipt = Receipt.query.options(*RECEIPT_FIELDS.load_options(fields, includes)).filter_by(
+        id=receipt_id, user_id=current_user.id
+    ).first_or_404()
     
     return jsonify({
-        'receipt': {
-            'id': receipt.id,
-            'receipt_number': receipt.receipt_number,
-            'amount': receipt.amount,
-            'payment_method': receipt.payment_method,
-            'notes': receipt.notes,
-            'created_at': receipt.created_at.isoformat(),
-            'invoice': {
-                'id': receipt.invoice.id,
-                'invoice_number': receipt.invoice.invoice_number
-            }
-        }
+        'receipt': RECEIPT_FIELDS.serialize(receipt, fields, includes)
     }), 200
 
 @receipt_bp.route('/api/receipts/<int:receipt_id>', methods=['PUT'])
 @login_required
 def api_update_receipt(receipt_id):
-    receipt = Receipt.query.filter_by(id=receipt_id, user_id=current_user.id).first_or_404()
+    receipt = for_update(Receipt.query.filter_by(id=receipt_id, user_id=current_user.id)).first_or_404()
     data = request.get_json()
     
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    old_amount = receipt.amount
     if 'amount' in data:
         receipt.amount = float(data['amount'])
     if 'payment_method' in data:
@@ -261,34 +223,8 @@ def api_update_receipt(receipt_id):
         if not new_invoice:
             return jsonify({'error': 'Invalid invoice'}), 400
         
-        # Update old invoice status
-        old_invoice = Invoice.query.get(receipt.invoice_id)
-        old_invoice_total_paid = sum(r.amount for r in old_invoice.receipts if r.id != receipt.id)
-        if old_invoice_total_paid >= old_invoice.amount:
-            old_invoice.status = 'Paid'
-        elif old_invoice_total_paid > 0:
-            old_invoice.status = 'Partial'
-        else:
-            old_invoice.status = 'Unpaid'
-        
-        receipt.invoice_id = data['invoice_id']
-        
-        # Update new invoice status
-        new_invoice_total_paid = sum(r.amount for r in new_invoice.receipts) + ('amount' in data and float(data['amount']) or old_amount)
-        if new_invoice_total_paid >= new_invoice.amount:
-            new_invoice.status = 'Paid'
-        elif new_invoice_total_paid > 0:
-            new_invoice.status = 'Partial'
-    else:
-        # Just update the same invoice status based on the new amount
-        invoice = Invoice.query.get(receipt.invoice_id)
-        total_paid = sum(r.amount for r in invoice.receipts if r.id != receipt.id) + receipt.amount
-        if total_paid >= invoice.amount:
-            invoice.status = 'Paid'
-        elif total_paid > 0:
-            invoice.status = 'Partial'
-        else:
-            invoice.status = 'Unpaid'
+        # Moving the receipt re-totals both invoices in the same flush
+        receipt.invoice_id = new_invoice.id
     
     db.session.commit()
     
@@ -297,37 +233,16 @@ def api_update_receipt(receipt_id):
     
     return jsonify({
         'message': 'Receipt updated successfully',
-        'receipt': {
-            'id': receipt.id,
-            'receipt_number': receipt.receipt_number,
-            'amount': receipt.amount,
-            'payment_method': receipt.payment_method,
-            'notes': receipt.notes,
-            'created_at': receipt.created_at.isoformat(),
-            'invoice': {
-                'id': receipt.invoice.id,
-                'invoice_number': receipt.invoice.invoice_number
-            }
-        }
+        'receipt': RECEIPT_FIELDS.serialize(receipt, includes=['invoice'])
     }), 200
 
 @receipt_bp.route('/api/receipts/<int:receipt_id>', methods=['DELETE'])
 @login_required
 def api_delete_receipt(receipt_id):
-    receipt = Receipt.query.filter_by(id=receipt_id, user_id=current_user.id).first_or_404()
-    invoice = Invoice.query.get(receipt.invoice_id)
+    receipt = for_update(Receipt.query.filter_by(id=receipt_id, user_id=current_user.id)).first_or_404()
     
+    # The payment is taken off the invoice in the same flush
     db.session.delete(receipt)
-    
-    # Update invoice status
-    total_paid = sum(r.amount for r in invoice.receipts if r.id != receipt_id)
-    if total_paid >= invoice.amount:
-        invoice.status = 'Paid'
-    elif total_paid > 0:
-        invoice.status = 'Partial'
-    else:
-        invoice.status = 'Unpaid'
-    
     db.session.commit()
     
     return jsonify({
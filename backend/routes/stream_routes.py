@@ -0,0 +1,66 @@
+import json
+import time
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import login_required, current_user
+from ..database.versions import current_sequence
+
+stream_bp = Blueprint('stream', __name__)
+
+def _event(message):
+    data = json.dumps({'cursor': str(message['seq']), 'collections': message['collections']})
+    return f"id: {message['seq']}\nevent: change\ndata: {data}\n\n"
+
+@stream_bp.route('/api/stream', methods=['GET'])
+@login_required
+def api_stream():
+    """
+    Server-Sent Events: a `change` event, carrying the new change feed cursor and
+    the collections written, after every commit that touches the user's records.
+    Clients fetch the details from /api/changes.
+
+    Every open stream holds a request thread, so past STREAM_MAX_PER_PROCESS
+    open streams new ones get 503 and the rest of the threads stay free for
+    regular requests.
+    """
+    broker = current_app.extensions['broker']
+    heartbeat = current_app.config['STREAM_HEARTBEAT']
+    lifetime = current_app.config['STREAM_LIFETIME']
+    user_id = current_user.id
+
+    # EventSource resends the last id it saw when it reconnects
+    latest = current_sequence(user_id)
+    try:
+        seq = int(request.headers.get('Last-Event-ID') or request.args.get('since', latest))
+    except ValueError:
+        seq = latest
+
+    if not broker.open_stream(current_app.config['STREAM_MAX_PER_PROCESS']):
+        return jsonify({'error': 'Too many open streams, please retry'}), 503, {'Retry-After': '5'}
+
+    def generate():
+        # No request context or DB connection is held while the stream idles
+        yield 'retry: 2000\n\n'
+        current = seq
+        if latest > current:
+            current = latest
+            yield _event({'seq': latest, 'collections': []})
+
+        deadline = time.monotonic() + lifetime
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = broker.wait(user_id, current, min(heartbeat, remaining))
+            if message is None:
+                yield ': keep-alive\n\n'
+                continue
+            current = message['seq']
+            yield _event(message)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, whether or not the stream ever started
+    response.call_on_close(broker.close_stream)
+    return response
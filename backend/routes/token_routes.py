@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from ..database.models import db, ApiToken
+
+token_bp = Blueprint('tokens', __name__)
+
+# Managed from a signed-in session only: a token can't reach these routes (see utils/tokens.py)
+
+def _token_json(record):
+    return {
+        'id': record.id,
+        'name': record.name,
+        'scopes': record.scopes.split(),
+        'created_at': record.created_at.isoformat(),
+        'expires_at': record.expires_at.isoformat(),
+        'revoked_at': record.revoked_at.isoformat() if record.revoked_at else None
+    }
+
+@token_bp.route('/api/tokens', methods=['GET'])
+@login_required
+def api_get_tokens():
+    records = ApiToken.query.filter(
+        ApiToken.user_id == current_user.id, ApiToken.expires_at > datetime.utcnow()
+    ).order_by(ApiToken.created_at.desc()).all()
+    return jsonify({'tokens': [_token_json(record) for record in records]}), 200
+
+@token_bp.route('/api/tokens', methods=['POST'])
+@login_required
+def api_create_token():
+    data = request.get_json()
+    if not data or not data.get('name') or not isinstance(data.get('scopes'), list):
+        return jsonify({'error': 'Missing required fields'}), 400
+
+    max_days = current_app.config['API_TOKEN_MAX_DAYS']
+    try:
+        days = int(data.get('expires_in_days', current_app.config['API_TOKEN_DEFAULT_DAYS']))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'expires_in_days must be an integer'}), 400
+    if not 1 <= days <= max_days:
+        return jsonify({'error': f'expires_in_days must be between 1 and {max_days}'}), 400
+
+    try:
+        record, token = current_app.extensions['tokens'].issue(
+            current_user.id, str(data['name'])[:100], data['scopes'], datetime.utcnow() + timedelta(days=days)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.commit()
+
+    # The token itself is only ever shown here
+    return jsonify({'token': token, **_token_json(record)}), 201
+
+@token_bp.route('/api/tokens/<token_id>', methods=['DELETE'])
+@login_required
+def api_revoke_token(token_id):
+    record = ApiToken.query.filter_by(id=token_id, user_id=current_user.id).first_or_404()
+    if record.revoked_at is None:
+        record.revoked_at = datetime.utcnow()
+        db.session.commit()
+    current_app.extensions['tokens'].revoked(record.id)
+    return jsonify({'success': True, 'message': 'Token revoked successfully'}), 200
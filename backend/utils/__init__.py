@@ -0,0 +1,7 @@
+# This file initializes the utils package
+from .pagination import paginate, apply_order
+from .filters import ListFilters
+from .serializers import FieldSet
+from .streaming import stream_rows
+
+__all__ = ['paginate', 'apply_order', 'ListFilters', 'FieldSet', 'stream_rows']
@@ -0,0 +1,180 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import func, select
+from ..database.models import db, AccountingEntry
+from ..database.versions import get_versions
+
+try:
+    import numpy as np
+except ImportError:  # optional: only /api/accounting/pivot needs it
+    np = None
+
+PIVOT_MEASURES = ('sum', 'count', 'avg')
+# Upper bound on rows x columns in one pivot
+MAX_PIVOT_CELLS = 10000
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+EPOCH = date(1970, 1, 1)
+
+class EntryCube:
+    """
+    One user's accounting entries as parallel NumPy columns: the entry date as
+    days since 1970-01-01, entry type and category as codes into sorted label
+    arrays, and the amount.
+    """
+
+    def __init__(self, days, types, categories, amounts, type_labels, category_labels):
+        self.days = days
+        self.types = types
+        self.categories = categories
+        self.amounts = amounts
+        self.type_labels = type_labels
+        self.category_labels = category_labels
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def load(cls, user_id):
+        # DATE() comes back as 'YYYY-MM-DD' text on SQLite, which NumPy parses far faster than datetimes
+        rows = db.session.execute(
+            select(func.date(AccountingEntry.date), AccountingEntry.entry_type, AccountingEntry.category, AccountingEntry.amount)
+            .where(AccountingEntry.user_id == user_id)
+        ).all()
+        dates, types, categories, amounts = zip(*rows) if rows else ((), (), (), ())
+        type_labels, type_codes = np.unique(np.array(types, dtype=str), return_inverse=True)
+        category_labels, category_codes = np.unique(np.array(categories, dtype=str), return_inverse=True)
+        return cls(
+            np.array(dates, dtype='datetime64[D]').astype(np.int64),
+            type_codes.astype(np.int32),
+            category_codes.astype(np.int32),
+            np.array(amounts, dtype=np.float64),
+            type_labels,
+            category_labels,
+        )
+
+    @property
+    def months(self):
+        """Months since 1970-01"""
+        return self.days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+# Pivot dimension -> (per-entry integer keys, labels for a sorted array of distinct keys)
+DIMENSIONS = {
+    'entry_type': (lambda cube: cube.types, lambda cube, keys: cube.type_labels[keys].tolist()),
+    'category': (lambda cube: cube.categories, lambda cube, keys: cube.category_labels[keys].tolist()),
+    'year': (lambda cube: cube.months // 12, lambda cube, keys: (keys + 1970).tolist()),
+    'quarter': (lambda cube: cube.months // 3,
+                lambda cube, keys: [f'{1970 + key // 4}-Q{key % 4 + 1}' for key in keys.tolist()]),
+    'month': (lambda cube: cube.months, lambda cube, keys: keys.astype('datetime64[M]').astype(str).tolist()),
+    # Weeks start on Monday; 1970-01-01 was a Thursday
+    'week': (lambda cube: (cube.days + 3) // 7,
+             lambda cube, keys: (keys * 7 - 3).astype('datetime64[D]').astype(str).tolist()),
+    'day': (lambda cube: cube.days, lambda cube, keys: keys.astype('datetime64[D]').astype(str).tolist()),
+    'month_of_year': (lambda cube: cube.months % 12, lambda cube, keys: (keys + 1).tolist()),
+    'weekday': (lambda cube: (cube.days + 3) % 7, lambda cube, keys: [WEEKDAYS[key] for key in keys.tolist()]),
+}
+
+def _group(cube, dimension, mask):
+    """(labels, per-entry group index) of the masked entries along a dimension"""
+    keys, label = DIMENSIONS[dimension]
+    distinct, index = np.unique(keys(cube)[mask], return_inverse=True)
+    return label(cube, distinct), index
+
+def _codes(labels, wanted):
+    return np.flatnonzero(np.isin(labels, wanted))
+
+def pivot(cube, rows, columns=None, measure='sum', entry_type=None, categories=None, start_date=None, end_date=None):
+    """
+    Aggregate the cube's amounts by `rows` and, optionally, `columns` (names from
+    DIMENSIONS) with `measure`, over the entries matching the filters. Dates are
+    inclusive. Raises ValueError for unknown names or oversized pivots.
+    """
+    for dimension in (rows, columns):
+        if dimension is not None and dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}. Use one of: {', '.join(DIMENSIONS)}")
+    if measure not in PIVOT_MEASURES:
+        raise ValueError(f"Unknown measure: {measure}. Use one of: {', '.join(PIVOT_MEASURES)}")
+
+    mask = np.ones(len(cube), dtype=bool)
+    if entry_type:
+        mask &= np.isin(cube.types, _codes(cube.type_labels, [entry_type]))
+    if categories:
+        mask &= np.isin(cube.categories, _codes(cube.category_labels, categories))
+    if start_date is not None:
+        mask &= cube.days >= (start_date - EPOCH).days
+    if end_date is not None:
+        mask &= cube.days <= (end_date - EPOCH).days
+
+    row_labels, row_index = _group(cube, rows, mask)
+    if columns is not None:
+        column_labels, column_index = _group(cube, columns, mask)
+    else:
+        column_labels, column_index = ['total'], np.zeros(len(row_index), dtype=np.int64)
+
+    shape = (len(row_labels), len(column_labels))
+    if shape[0] * shape[1] > MAX_PIVOT_CELLS:
+        raise ValueError(f'Pivot has {shape[0]} x {shape[1]} cells; narrow it to at most {MAX_PIVOT_CELLS}')
+
+    cell = row_index * shape[1] + column_index
+    size = shape[0] * shape[1]
+    counts = np.bincount(cell, minlength=size).reshape(shape)
+    sums = np.bincount(cell, weights=cube.amounts[mask], minlength=size).reshape(shape)
+
+    def measured(total, count):
+        if measure == 'sum':
+            return total
+        if measure == 'count':
+            return count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+    def listed(values):
+        values = np.asarray(values)
+        if values.dtype.kind != 'f':
+            return values.tolist()
+        # Empty averages are NaN, which JSON can't carry
+        return np.where(np.isnan(values), None, values).tolist()
+
+    return {
+        'rows': row_labels,
+        'columns': column_labels,
+        'measure': measure,
+        'values': listed(measured(sums, counts)),
+        'row_totals': listed(measured(sums.sum(axis=1), counts.sum(axis=1))),
+        'column_totals': listed(measured(sums.sum(axis=0), counts.sum(axis=0))),
+        'total': listed(measured(sums.sum(), counts.sum())),
+    }
+
+class CubeCache:
+    """
+    Per-process LRU of users' cubes. Each cube is tagged with the user's
+    accounting_entries collection version it was loaded at, and reloaded once a
+    write (from any process) has moved the version on.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._cubes = OrderedDict()
+
+    def get(self, user_id):
+        # Read the version before loading: a write landing in between only forces an extra reload
+        (_, version), = get_versions(user_id, ['accounting_entries'])
+        with self._lock:
+            cached = self._cubes.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._cubes.move_to_end(user_id)
+                return cached[1]
+
+        cube = EntryCube.load(user_id)
+        with self._lock:
+            self._cubes[user_id] = (version, cube)
+            self._cubes.move_to_end(user_id)
+            while len(self._cubes) > self.size:
+                self._cubes.popitem(last=False)
+        return cube
+
+def init_analytics(app):
+    """Create the cube cache, when NumPy is installed"""
+    if np is not None:
+        app.extensions['cube_cache'] = CubeCache(app.config['PIVOT_CACHE_USERS'])
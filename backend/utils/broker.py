@@ -0,0 +1,141 @@
+import glob
+import json
+import os
+import socket
+import threading
+from ..database.versions import changes_committed
+
+class Broker:
+    """
+    Fans change notifications out to the /api/stream connections of this process.
+
+    publish() delivers a message to every process sharing the broker; each process
+    keeps only the latest message per user, since a notification just says "the
+    change feed has moved to `seq`". Stream threads block in wait() on a per-user
+    condition, so an idle connection costs a sleeping thread and no DB connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conditions = {}
+        self._latest = {}
+        self._streams = 0
+
+    def publish(self, user_id, message):
+        raise NotImplementedError
+
+    def _condition(self, user_id):
+        if user_id not in self._conditions:
+            self._conditions[user_id] = threading.Condition(self._lock)
+        return self._conditions[user_id]
+
+    def _deliver(self, user_id, message):
+        with self._lock:
+            latest = self._latest.get(user_id)
+            if latest is None or message['seq'] > latest['seq']:
+                self._latest[user_id] = message
+                self._condition(user_id).notify_all()
+
+    def wait(self, user_id, seq, timeout):
+        """The user's latest message if it is newer than `seq`, waiting up to `timeout` seconds"""
+        with self._lock:
+            newer = lambda: self._latest.get(user_id, {'seq': 0})['seq'] > seq
+            if self._condition(user_id).wait_for(newer, timeout):
+                return self._latest[user_id]
+        return None
+
+    def open_stream(self, limit):
+        """Count a new stream in this process; False if `limit` are already open"""
+        with self._lock:
+            if self._streams >= limit:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        with self._lock:
+            self._streams -= 1
+
+    def on_changes_committed(self, user_id, seq, collections):
+        """Receiver for the changes_committed signal"""
+        self.publish(user_id, {'seq': seq, 'collections': collections})
+
+class LocalBroker(Broker):
+    """Delivers within the current process only (development server, single worker)"""
+
+    def publish(self, user_id, message):
+        self._deliver(user_id, message)
+
+class UnixSocketBroker(Broker):
+    """
+    Delivers to every worker on this host. Each process binds a datagram socket
+    in `path` on first use; publish() sends to all of them and removes sockets
+    left behind by workers that have exited.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._sender = None
+        self._sender_pid = None
+        self._pid = None
+
+    def _ensure_listening(self):
+        # Sockets don't survive a fork, so each worker binds its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.path, exist_ok=True)
+            address = os.path.join(self.path, f'{os.getpid()}.sock')
+            if os.path.exists(address):
+                os.unlink(address)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(address)
+            self._pid = os.getpid()
+            threading.Thread(target=self._listen, args=(sock,), daemon=True).start()
+
+    def _listen(self, sock):
+        while True:
+            data = sock.recv(65536)
+            try:
+                user_id, message = json.loads(data)
+            except ValueError:
+                continue
+            self._deliver(user_id, message)
+
+    def publish(self, user_id, message):
+        if self._sender_pid != os.getpid():
+            # Never block a committing request on a backed-up worker
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+            self._sender_pid = os.getpid()
+        data = json.dumps([user_id, message]).encode()
+        for address in glob.glob(os.path.join(self.path, '*.sock')):
+            try:
+                self._sender.sendto(data, address)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(address)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                # The receiving worker is backed up; it will catch up from the next notification
+                pass
+
+    def wait(self, user_id, seq, timeout):
+        self._ensure_listening()
+        return super().wait(user_id, seq, timeout)
+
+BROKERS = {
+    'local': lambda app: LocalBroker(),
+    'unix': lambda app: UnixSocketBroker(app.config['EVENT_BROKER_PATH']),
+}
+
+def init_broker(app):
+    """Create the broker named by EVENT_BROKER and subscribe it to committed changes"""
+    broker = BROKERS[app.config['EVENT_BROKER']](app)
+    changes_committed.connect(broker.on_changes_committed)
+    app.extensions['broker'] = broker
+    return broker
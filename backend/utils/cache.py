@@ -0,0 +1,218 @@
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # optional: only CACHE_BACKEND=redis needs it
+    redis = None
+
+class Cache:
+    """
+    Key/value store behind the app's caches. Values expire after a TTL in
+    seconds; counters never expire. Hit and miss counts are kept per cache name,
+    for this process, by the caches built on top of it.
+    """
+
+    name = None
+
+    def __init__(self):
+        self._metrics_lock = threading.Lock()
+        self._metrics = {}
+
+    def get_many(self, keys):
+        """The values stored under `keys`, None where missing or expired"""
+        raise NotImplementedError
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def incr(self, key, amount=1):
+        """Atomically add `amount` to a counter, starting from 0, and return the new value"""
+        raise NotImplementedError
+
+    def counter(self, key):
+        """A counter's current value, 0 if it was never incremented"""
+        raise NotImplementedError
+
+    def count(self, name, hit):
+        with self._metrics_lock:
+            self._metrics.setdefault(name, [0, 0])[0 if hit else 1] += 1
+
+    def stats(self):
+        """{'backend': ..., 'caches': {name: {'hits', 'misses', 'hit_ratio'}}} for this process"""
+        with self._metrics_lock:
+            metrics = {name: list(counts) for name, counts in self._metrics.items()}
+        caches = {}
+        for name, (hits, misses) in sorted(metrics.items()):
+            caches[name] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses) if hits + misses else None}
+        return {'backend': self.name, 'caches': caches}
+
+class MemoryCache(Cache):
+    """An LRU of up to `size` values in this process only (development server, single worker)"""
+
+    name = 'memory'
+
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+        # Kept apart from the LRU: a counter that was evicted and restarted would repeat numbers
+        self._counters = {}
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._values.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self._values[key]
+                    entry = None
+                if entry is not None:
+                    self._values.move_to_end(key)
+                values.append(entry[0] if entry is not None else None)
+        return values
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl)
+            self._values.move_to_end(key)
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            return self._counters[key]
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+class SQLiteCache(Cache):
+    """
+    Shared by every worker on this host through a SQLite file at `path`. Each
+    thread opens its own connection; expired rows are swept now and then on write.
+    """
+
+    name = 'sqlite'
+    # Chance that a set() also deletes expired rows
+    SWEEP_RATE = 0.01
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)'
+        )
+
+    def _connection(self):
+        # Connections don't survive a fork, so each worker opens its own
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def get_many(self, keys):
+        rows = {}
+        if keys:
+            placeholders = ', '.join('?' * len(keys))
+            for key, value, expires_at in self._connection().execute(
+                f'SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})', list(keys)
+            ):
+                if expires_at is not None and expires_at > time.time():
+                    rows[key] = pickle.loads(value)
+        return [rows.get(key) for key in keys]
+
+    def set(self, key, value, ttl):
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time() + ttl)
+        )
+        if random.random() < self.SWEEP_RATE:
+            connection.execute('DELETE FROM cache WHERE expires_at < ?', (time.time(),))
+
+    def delete(self, *keys):
+        if keys:
+            placeholders = ', '.join('?' * len(keys))
+            self._connection().execute(f'DELETE FROM cache WHERE key IN ({placeholders})', list(keys))
+
+    def incr(self, key, amount=1):
+        return self._connection().execute(
+            'INSERT INTO cache (key, value, expires_at) VALUES (?, ?, NULL) '
+            'ON CONFLICT (key) DO UPDATE SET value = value + excluded.value RETURNING value',
+            (key, amount)
+        ).fetchone()[0]
+
+    def counter(self, key):
+        row = self._connection().execute('SELECT value FROM cache WHERE key = ? AND expires_at IS NULL', (key,)).fetchone()
+        return row[0] if row is not None else 0
+
+class RedisCache(Cache):
+    """
+    Shared by every worker on every host through a Redis server, or anything
+    speaking its protocol, at `url`. Keys are prefixed so the server can be shared.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url, prefix):
+        super().__init__()
+        if redis is None:
+            raise RuntimeError('CACHE_BACKEND=redis needs the redis package: pip install redis')
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        values = self._client.mget([self.prefix + key for key in keys])
+        return [pickle.loads(value) if value is not None else None for value in values]
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=max(1, int(ttl * 1000)))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self.prefix + key for key in keys))
+
+    def incr(self, key, amount=1):
+        return self._client.incrby(self.prefix + key, amount)
+
+    def counter(self, key):
+        value = self._client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+CACHES = {
+    'memory': lambda app: MemoryCache(app.config['CACHE_SIZE']),
+    'sqlite': lambda app: SQLiteCache(app.config['CACHE_PATH']),
+    'redis': lambda app: RedisCache(app.config['CACHE_URL'], app.config['CACHE_KEY_PREFIX']),
+}
+
+def init_cache(app):
+    """Create the cache backend named by CACHE_BACKEND"""
+    cache = CACHES[app.config['CACHE_BACKEND']](app)
+    app.extensions['cache'] = cache
+    return cache
@@ -0,0 +1,65 @@
+import hashlib
+from functools import wraps
+from flask import current_app, request
+from flask_login import current_user
+from sqlalchemy import select
+from ..database.models import db
+from ..database.versions import COLLECTIONS, get_versions
+
+def _etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def _respond(etag, view, args, kwargs):
+    """304 when the client already holds `etag`, otherwise run the view and tag its response"""
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate it on every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def conditional_list(*collections):
+    """
+    ETag a collection endpoint on the user's versions of `collections` (its own
+    and those of any embedded resources) and the query string. A matching
+    If-None-Match is answered with 304 before the view runs.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_versions(current_user.id, collections)
+            etag = _etag(current_user.id, request.path, sorted(request.args.items(multi=True)), versions)
+            return _respond(etag, view, args, kwargs)
+        return wrapper
+    return decorator
+
+def conditional_resource(model, *collections):
+    """
+    ETag a single-resource endpoint on the row's updated_at, plus the versions of
+    the collections it embeds. Models without updated_at fall back to the version
+    of their own collection. Missing rows go straight to the view (and its 404).
+    """
+    stamp = model.updated_at if hasattr(model, 'updated_at') else None
+    if stamp is None:
+        collections = (COLLECTIONS[model],) + collections
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            resource_id = next(iter(kwargs.values()))
+            row = db.session.execute(
+                select(stamp if stamp is not None else model.id)
+                .where(model.id == resource_id, model.user_id == current_user.id)
+            ).first()
+            if row is None:
+                return view(*args, **kwargs)
+            versions = get_versions(current_user.id, collections) if collections else []
+            etag = _etag(current_user.id, request.path, sorted(request.args.items(multi=True)), row[0], versions)
+            return _respond(etag, view, args, kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,98 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, Float, Integer
+
+# Query parameters owned by pagination and field selection rather than by a model's filter allowlist
+RESERVED_PARAMS = {'limit', 'cursor', 'sort', 'order', 'fields', 'include'}
+
+SortOrder = namedtuple('SortOrder', ['column', 'descending', 'null_value'])
+
+def _parse_datetime(value, upper=False):
+    """Parse YYYY-MM-DD or an ISO timestamp; a bare upper-bound date covers that whole day"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}. Use ISO format.')
+    if upper and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def _parse_scalar(column, value):
+    if isinstance(column.type, Integer):
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f'{column.key} must be an integer')
+    if isinstance(column.type, Float):
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f'{column.key} must be a number')
+    return value
+
+class ListFilters:
+    """
+    Per-model allowlist of query-string filters and sort keys for a list endpoint.
+
+    - equal: columns filtered with `?name=value` (comma separated values become IN)
+    - ranges: DateTime columns take `?name_from=&name_to=`, numeric ones `?name_min=&name_max=`
+    - sorts: columns accepted by `?sort=name&order=asc|desc`
+    - nullable_sorts: sort keys whose NULLs are ordered as the given value
+    """
+
+    def __init__(self, model, equal=(), ranges=(), sorts=(), default_sort='created_at', nullable_sorts=None):
+        self.model = model
+        self.equal = {name: getattr(model, name) for name in equal}
+        self.ranges = {name: getattr(model, name) for name in ranges}
+        self.sorts = {name: getattr(model, name) for name in set(sorts) | {default_sort}}
+        self.default_sort = default_sort
+        self.nullable_sorts = nullable_sorts or {}
+
+        self.params = set(RESERVED_PARAMS) | set(self.equal)
+        for name, column in self.ranges.items():
+            if isinstance(column.type, DateTime):
+                self.params |= {f'{name}_from', f'{name}_to'}
+            else:
+                self.params |= {f'{name}_min', f'{name}_max'}
+
+    def apply(self, query, args):
+        """
+        Push the filters in `args` down into `query`.
+        Returns (query, SortOrder); raises ValueError for anything outside the allowlist.
+        """
+        unknown = set(args) - self.params
+        if unknown:
+            raise ValueError(f"Unsupported filter: {', '.join(sorted(unknown))}")
+
+        for name, column in self.equal.items():
+            if name not in args:
+                continue
+            values = [_parse_scalar(column, v) for v in args[name].split(',') if v != '']
+            if len(values) == 1:
+                query = query.filter(column == values[0])
+            elif values:
+                query = query.filter(column.in_(values))
+
+        for name, column in self.ranges.items():
+            if isinstance(column.type, DateTime):
+                if args.get(f'{name}_from'):
+                    query = query.filter(column >= _parse_datetime(args[f'{name}_from']))
+                if args.get(f'{name}_to'):
+                    upper = args[f'{name}_to']
+                    bound = _parse_datetime(upper, upper=True)
+                    query = query.filter(column < bound if len(upper) == 10 else column <= bound)
+            else:
+                if args.get(f'{name}_min'):
+                    query = query.filter(column >= _parse_scalar(column, args[f'{name}_min']))
+                if args.get(f'{name}_max'):
+                    query = query.filter(column <= _parse_scalar(column, args[f'{name}_max']))
+
+        sort = args.get('sort', self.default_sort)
+        if sort not in self.sorts:
+            raise ValueError(f"Unsupported sort: {sort}. Use one of {', '.join(sorted(self.sorts))}")
+
+        order = args.get('order', 'desc')
+        if order not in ('asc', 'desc'):
+            raise ValueError('order must be asc or desc')
+
+        return query, SortOrder(self.sorts[sort], order == 'desc', self.nullable_sorts.get(sort))
@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_, func
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(sort_key, sort_value, row_id):
+    """Encode the (sort key, id) of the last row on a page as an opaque token"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_key, sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor, sort_column):
+    """Decode a token produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_key, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if sort_key != sort_column.key:
+            raise ValueError
+        if sort_value is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, NotImplementedError):
+        raise ValueError('Invalid cursor')
+
+def get_limit():
+    """Read and clamp the `limit` query parameter"""
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+def sort_expression(sort_column, null_value=None):
+    return sort_column if null_value is None else func.coalesce(sort_column, null_value)
+
+def apply_order(query, sort_column, id_column, descending=True, null_value=None):
+    """Order a query on (sort_column, id_column), the same ordering paginate() uses"""
+    sort_expr = sort_expression(sort_column, null_value)
+    if descending:
+        return query.order_by(sort_expr.desc(), id_column.desc())
+    return query.order_by(sort_expr.asc(), id_column.asc())
+
+def paginate(query, sort_column, id_column, descending=True, null_value=None):
+    """
+    Keyset-paginate a query on (sort_column, id_column).
+
+    Reads `limit` and `cursor` from the query string and returns
+    (rows, next_cursor, limit); next_cursor is None on the last page.
+    The seek predicate keeps a plain range on sort_column so a
+    (user_id, sort_column) index serves every page at the same cost.
+    Nullable sort columns are ordered as if NULL were `null_value`.
+    """
+    limit = get_limit()
+    cursor = request.args.get('cursor')
+
+    sort_expr = sort_expression(sort_column, null_value)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        if descending:
+            query = query.filter(
+                sort_expr <= sort_value,
+                or_(sort_expr < sort_value, and_(sort_expr == sort_value, id_column < row_id))
+            )
+        else:
+            query = query.filter(
+                sort_expr >= sort_value,
+                or_(sort_expr > sort_value, and_(sort_expr == sort_value, id_column > row_id))
+            )
+
+    query = apply_order(query, sort_column, id_column, descending, null_value)
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        sort_value = getattr(last, sort_column.key)
+        if sort_value is None:
+            sort_value = null_value
+        next_cursor = encode_cursor(sort_column.key, sort_value, getattr(last, id_column.key))
+
+    return rows, next_cursor, limit
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HashingBusy(Exception):
+    """Raised when more passwords are waiting to be hashed than the queue allows"""
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords on a small per-process thread pool, so a burst
+    of logins can use at most `workers` cores (hashlib releases the GIL while
+    it hashes) and the worker's other threads keep serving requests. Callers
+    still wait for their result; once `queue_limit` hashes are waiting, new ones
+    are refused with HashingBusy instead of queueing without bound.
+    """
+
+    def __init__(self, method, workers, queue_limit):
+        self.method = method
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._prefix = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = None
+        self._pid = None
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            # Threads don't survive a fork, so each worker starts its own pool
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                self._pid = os.getpid()
+                self._pending = 0
+            if self._pending >= self.workers + self.queue_limit:
+                raise HashingBusy()
+            self._pending += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method)
+
+    def check(self, stored, password):
+        return self._submit(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored):
+        """Whether a stored hash was made with a different method or cost than the configured one"""
+        if self._prefix is None:
+            # Stored hashes start with e.g. 'pbkdf2:sha256:1000000'; werkzeug fills in
+            # the costs the configured method leaves out, so ask it once
+            self._prefix = self.hash('').split('$', 1)[0]
+        return stored.split('$', 1)[0] != self._prefix
+
+class LoginThrottle:
+    """
+    Per-process count of failed logins per account (email address) and per
+    client address over a fixed window. Past its limit an account isn't locked:
+    each login must wait `delay` seconds after the last failure, doubling with
+    every further failure (up to the window), so its owner is only slowed down
+    while guessing gets exponentially slower. Past its limit an address is
+    refused until the window ends. Refused logins cost a dictionary lookup, with
+    no password hashed. Keeps at most `size` keys.
+    """
+
+    def __init__(self, account_limit, address_limit, window, delay=1, size=10000):
+        self.limits = {'account': account_limit, 'address': address_limit}
+        self.window = window
+        self.delay = delay
+        self.size = size
+        self._lock = threading.Lock()
+        # key -> (failures, window start, last failure)
+        self._failures = OrderedDict()
+
+    def _keys(self, email, address):
+        return [('account', (email or '').strip().lower()), ('address', address)]
+
+    def _until(self, kind, count, started, last):
+        """When a key with `count` failures may be tried again"""
+        if kind == 'account':
+            # The exponent is capped only to keep the number small; the window caps the delay
+            return last + min(self.delay * 2 ** min(count - self.limits[kind], 32), self.window)
+        return started + self.window
+
+    def retry_after(self, email, address):
+        """Seconds until this account may be tried from this address again, 0 if it may now"""
+        now = time.monotonic()
+        wait = 0
+        with self._lock:
+            for key in self._keys(email, address):
+                entry = self._failures.get(key)
+                if entry is None or entry[0] < self.limits[key[0]] or entry[1] + self.window <= now:
+                    continue
+                wait = max(wait, self._until(key[0], *entry) - now)
+        return int(wait) + 1 if wait > 0 else 0
+
+    def failed(self, email, address):
+        now = time.monotonic()
+        with self._lock:
+            for key in self._keys(email, address):
+                count, started, _ = self._failures.get(key, (0, now, now))
+                if started + self.window <= now:
+                    count, started = 0, now
+                self._failures[key] = (count + 1, started, now)
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.size:
+                self._failures.popitem(last=False)
+
+    def succeeded(self, email):
+        with self._lock:
+            self._failures.pop(self._keys(email, None)[0], None)
+
+def init_passwords(app):
+    """Create the password hasher and the failed-login throttle"""
+    app.extensions['passwords'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_QUEUE']
+    )
+    app.extensions['login_throttle'] = LoginThrottle(
+        app.config['LOGIN_MAX_FAILURES'], app.config['LOGIN_MAX_FAILURES_PER_ADDRESS'], app.config['LOGIN_FAILURE_WINDOW'],
+        app.config['LOGIN_FAILURE_DELAY']
+    )
@@ -0,0 +1,21 @@
+from datetime import datetime, time, timedelta
+
+# Reporting periods accepted by `?period=`, as that many calendar days up to and including today
+PERIOD_DAYS = {
+    'week': 7,
+    'month': 30,
+    'quarter': 90,
+    'year': 365,
+}
+
+DEFAULT_PERIOD = 'month'
+
+def period_range(period):
+    """
+    (start_date, end_date) of a period, from the first day's midnight to the end
+    of today (UTC). Whole days keep the window fixed for the day, so results can
+    be cached and read straight from the daily rollup. Unknown periods fall back to a month.
+    """
+    today = datetime.utcnow().date()
+    days = PERIOD_DAYS.get(period, PERIOD_DAYS[DEFAULT_PERIOD])
+    return datetime.combine(today - timedelta(days=days - 1), time.min), datetime.combine(today, time.max)
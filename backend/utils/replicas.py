@@ -0,0 +1,82 @@
+import random
+from flask import g, request, session
+from flask_login import user_logged_in
+from ..database.engine import replica_binds
+from ..database.replicas import primary_written
+from .tokens import READ_METHODS
+
+class ReplicaRouter:
+    """
+    Picks the engine for each statement db.session runs in a request.
+
+    A read-only request (GET) reads from one replica, picked at random once per
+    request. It switches to the primary for the rest of its transaction once the
+    session writes, or runs an INSERT/UPDATE/DELETE or a SELECT ... FOR UPDATE.
+    Every other request uses the primary. So do all requests from a user for
+    `sticky_seconds` after they commit a write or log in, so they read their own
+    writes whatever the replicas' lag. That mark is kept in the app's cache
+    backend, so with a shared backend it holds across workers.
+    """
+
+    def __init__(self, engines, cache, sticky_seconds):
+        self.engines = engines
+        self.cache = cache
+        self.sticky_seconds = sticky_seconds
+
+    def _user_id(self):
+        token_user = g.get('token_user')
+        if token_user is not None:
+            return token_user.id
+        user_id = session.get('_user_id')
+        return int(user_id) if user_id is not None else None
+
+    def _sticky_key(self, user_id):
+        return f'replicas:{user_id}:primary'
+
+    def _pick(self, user_id):
+        if user_id is not None and self.cache.get(self._sticky_key(user_id)):
+            return None
+        return random.choice(self.engines)
+
+    def engine_for(self, db_session, clause):
+        """The replica engine for this statement, or None for the primary"""
+        if request.method not in READ_METHODS:
+            return None
+        if db_session.info.get('wrote') or db_session.new or db_session.dirty or db_session.deleted:
+            return None
+        if clause is not None and (getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None):
+            db_session.info['wrote'] = True
+            return None
+        # Picked once per request, and again if the user turns out to be a token's (known only once it's loaded)
+        user_id = self._user_id()
+        picked = g.get('db_replica')
+        if picked is None or picked[0] != user_id:
+            picked = g.db_replica = (user_id, self._pick(user_id))
+        return picked[1]
+
+    def stick(self, user_id):
+        """Send the user's requests to the primary for the next `sticky_seconds`"""
+        self.cache.set(self._sticky_key(user_id), True, self.sticky_seconds)
+
+    def on_primary_written(self, sender=None):
+        """Receiver for the primary_written signal"""
+        user_id = self._user_id()
+        if user_id is not None:
+            self.stick(user_id)
+
+    def on_user_logged_in(self, app, user, **extra):
+        """Receiver for Flask-Login's user_logged_in signal: the account may be newer than the replicas"""
+        self.stick(user.id)
+
+def init_replicas(app, db):
+    """Route read-only requests to the REPLICA_DATABASE_URLS engines, if there are any"""
+    binds = replica_binds(app.config)
+    if not binds:
+        return None
+    with app.app_context():
+        engines = [db.engines[key] for key in binds]
+    router = ReplicaRouter(engines, app.extensions['cache'], app.config['REPLICA_STICKY_SECONDS'])
+    primary_written.connect(router.on_primary_written)
+    user_logged_in.connect(router.on_user_logged_in)
+    app.extensions['replicas'] = router
+    return router
@@ -0,0 +1,93 @@
+from ..database.rollups import accounting_committed
+from ..database.versions import changes_committed
+
+# Writes a cached report may be validated against before it's simply recomputed
+MAX_LOG_CHECK = 100
+
+class ReportCache:
+    """
+    Report results, keyed by (user_id, report, window, params), stored in the
+    app's cache backend for `ttl` seconds.
+
+    Every commit that writes a user's data is logged in the backend under the
+    user's next write number: the collections written, and for accounting
+    entries the days whose totals changed. A result remembers the write number
+    it was computed at and the collections and days it depends on. It's only
+    served if none of the writes logged since touch them, so a write outside a
+    report's window, or an edit that leaves the totals alone, keeps it. The log
+    is shared through the backend, so this holds across workers.
+    """
+
+    def __init__(self, cache, ttl):
+        self.cache = cache
+        self.ttl = ttl
+
+    def _sequence_key(self, user_id):
+        return f'reports:{user_id}:seq'
+
+    def _log_key(self, user_id, seq):
+        return f'reports:{user_id}:log:{seq}'
+
+    def _is_current(self, user_id, entry, seq):
+        computed_at, collections, first_day, last_day, value = entry
+        if computed_at == seq:
+            return True
+        if computed_at > seq or seq - computed_at > MAX_LOG_CHECK:
+            return False
+        for logged in self.cache.get_many([self._log_key(user_id, n) for n in range(computed_at + 1, seq + 1)]):
+            if logged is None:
+                # Expired or not written yet
+                return False
+            written, days = logged
+            if set(written) & set(collections) - {'accounting_entries'}:
+                return False
+            if 'accounting_entries' in collections and any(
+                (first_day is None or day >= first_day) and (last_day is None or day <= last_day) for day in days
+            ):
+                return False
+        return True
+
+    def get_or_compute(self, user_id, report, start_date, end_date, compute, params=(),
+                       collections=('accounting_entries',)):
+        """
+        The cached result of `compute()` for the report over [start_date, end_date]
+        (datetimes, or None for an open side), computing and storing it on a miss.
+        `collections` are the ones the result is read from; of accounting entries,
+        only those dated inside the window count.
+        """
+        key = f'reports:{user_id}:{report}:{start_date}:{end_date}:{params}'
+        # Read the write number first: a write landing while computing is then checked on the next read
+        seq = self.cache.counter(self._sequence_key(user_id))
+        entry = self.cache.get(key)
+        hit = entry is not None and tuple(entry[1]) == tuple(collections) and self._is_current(user_id, entry, seq)
+        self.cache.count(f'reports.{report}', hit)
+        if hit:
+            return entry[4]
+
+        value = compute()
+        first_day = start_date.date() if start_date is not None else None
+        last_day = end_date.date() if end_date is not None else None
+        self.cache.set(key, (seq, tuple(collections), first_day, last_day, value), self.ttl)
+        return value
+
+    def log_write(self, user_id, collections, days=()):
+        seq = self.cache.incr(self._sequence_key(user_id))
+        self.cache.set(self._log_key(user_id, seq), (sorted(collections), sorted(days)), self.ttl)
+
+    def on_accounting_committed(self, user_id, days):
+        """Receiver for the accounting_committed signal"""
+        self.log_write(user_id, ['accounting_entries'], days)
+
+    def on_changes_committed(self, user_id, seq, collections):
+        """Receiver for the changes_committed signal; accounting entries are logged by day instead"""
+        others = [collection for collection in collections if collection != 'accounting_entries']
+        if others:
+            self.log_write(user_id, others)
+
+def init_report_cache(app):
+    """Create the report cache on the app's cache backend and subscribe it to committed writes"""
+    cache = ReportCache(app.extensions['cache'], app.config['REPORT_CACHE_TTL'])
+    accounting_committed.connect(cache.on_accounting_committed)
+    changes_committed.connect(cache.on_changes_committed)
+    app.extensions['report_cache'] = cache
+    return cache
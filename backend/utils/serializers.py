@@ -0,0 +1,245 @@
+from collections import defaultdict
+from sqlalchemy import DateTime, select
+from sqlalchemy.orm import aliased, load_only, joinedload, selectinload
+from ..database.models import db, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry, Activity
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+def _split(value):
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+def _compile(name, lines, helpers=None):
+    """Build `def name(r): return {...}` from dict-entry source lines"""
+    source = f"def {name}(r):\n    return {{\n" + ''.join(f'        {line},\n' for line in lines) + '    }\n'
+    namespace = {'_iso': _iso}
+    namespace.update(helpers or {})
+    exec(source, namespace)
+    return namespace[name]
+
+class FieldSet:
+    """
+    The columns and relationships a GET endpoint may return, and the
+    serializers that turn rows into response dicts.
+
+    `?fields=` narrows the columns and `?include=` names the relationships to
+    embed; both are validated against this allowlist and translated into
+    load_only/eager-load options (ORM path) or a column projection (Core path),
+    so unrequested columns and relationships are never fetched. Without either
+    parameter the endpoint keeps its full shape.
+
+    One row-to-dict function is generated per (fields, includes) combination
+    and cached, for ORM objects and for Core row tuples alike.
+    """
+
+    def __init__(self, model, fields, includes=None):
+        self.model = model
+        self.fields = list(fields)
+        # name -> (FieldSet of the related model, is a collection)
+        self.includes = includes or {}
+        self._object_serializers = {}
+        self._row_serializers = {}
+
+    def select(self, args, default_includes=()):
+        """Parse `fields` and `include` from the query string into (fields, includes)"""
+        if 'fields' not in args and 'include' not in args:
+            return self.fields, list(default_includes)
+
+        fields = self.fields
+        if args.get('fields'):
+            requested = _split(args['fields'])
+            unknown = requested - set(self.fields)
+            if unknown:
+                raise ValueError(f"Unsupported field: {', '.join(sorted(unknown))}")
+            fields = [name for name in self.fields if name in requested]
+
+        includes = []
+        if args.get('include'):
+            requested = _split(args['include'])
+            unknown = requested - set(self.includes)
+            if unknown:
+                raise ValueError(f"Unsupported include: {', '.join(sorted(unknown))}")
+            includes = [name for name in self.includes if name in requested]
+
+        return fields, includes
+
+    def columns(self, fields, entity=None):
+        entity = entity if entity is not None else self.model
+        return [getattr(entity, name) for name in fields]
+
+    def _is_datetime(self, name):
+        return isinstance(getattr(self.model, name).type, DateTime)
+
+    # ORM path: full objects, used by single-resource endpoints and write responses
+
+    def load_options(self, fields, includes, extra_columns=()):
+        """
+        Loader options that fetch only the selected columns and relationships.
+        `extra_columns` are loaded but not serialized (e.g. the pagination sort key).
+        """
+        columns = self.columns(fields) + [c for c in extra_columns if c.key not in fields]
+        options = [load_only(*columns)]
+        for name in includes:
+            fieldset, many = self.includes[name]
+            relationship = getattr(self.model, name)
+            loader = selectinload(relationship) if many else joinedload(relationship)
+            options.append(loader.load_only(*fieldset.columns(fieldset.fields)))
+        return options
+
+    def object_serializer(self, fields=None, includes=()):
+        """The cached row-to-dict function for ORM objects"""
+        fields = tuple(fields or self.fields)
+        includes = tuple(includes)
+        key = (fields, includes)
+        if key not in self._object_serializers:
+            lines = []
+            for name in fields:
+                value = f'_iso(r.{name})' if self._is_datetime(name) else f'r.{name}'
+                lines.append(f'{name!r}: {value}')
+            helpers = {}
+            for name in includes:
+                fieldset, many = self.includes[name]
+                helpers[f'_{name}'] = fieldset.object_serializer()
+                if many:
+                    lines.append(f'{name!r}: [_{name}(item) for item in r.{name}]')
+                else:
+                    lines.append(f'{name!r}: _{name}(r.{name}) if r.{name} is not None else None')
+            self._object_serializers[key] = _compile(f'serialize_{self.model.__tablename__}', lines, helpers)
+        return self._object_serializers[key]
+
+    def serialize(self, obj, fields=None, includes=()):
+        """Build the response dict for one ORM object"""
+        return self.object_serializer(fields, includes)(obj)
+
+    # Core path: plain row tuples, no ORM identity map or object construction
+
+    def project(self, query, fields, includes, extra_columns=()):
+        """
+        Turn an ORM query over the model into a column projection that returns
+        row tuples. To-one includes are outer-joined; collections are loaded
+        afterwards by dump_rows(). Every projected column is labelled, so rows
+        expose the model's own columns (and `extra_columns`) by name.
+        """
+        columns = [column.label(column.key) for column in self.columns(fields)]
+        selected = set(fields)
+        for column in [self.model.id] + list(extra_columns):
+            if column.key not in selected:
+                columns.append(column.label(column.key))
+                selected.add(column.key)
+
+        for name in includes:
+            fieldset, many = self.includes[name]
+            if many:
+                continue
+            target = aliased(fieldset.model)
+            query = query.outerjoin(target, getattr(self.model, name))
+            columns += [
+                column.label(f'{name}__{column.key}')
+                for column in fieldset.columns(fieldset.fields, target)
+            ]
+
+        return query.with_entities(*columns)
+
+    def row_serializer(self, fields, includes, extra_columns=()):
+        """The cached tuple-to-dict function for rows produced by project()"""
+        key = (tuple(fields), tuple(includes), tuple(c.key for c in extra_columns))
+        if key not in self._row_serializers:
+            positions = list(fields)
+            for column_key in ['id'] + [c.key for c in extra_columns]:
+                if column_key not in positions:
+                    positions.append(column_key)
+
+            lines = []
+            for name in fields:
+                index = positions.index(name)
+                value = f'_iso(r[{index}])' if self._is_datetime(name) else f'r[{index}]'
+                lines.append(f'{name!r}: {value}')
+
+            offset = len(positions)
+            for name in includes:
+                fieldset, many = self.includes[name]
+                if many:
+                    continue
+                nested = []
+                for i, field in enumerate(fieldset.fields):
+                    value = f'_iso(r[{offset + i}])' if fieldset._is_datetime(field) else f'r[{offset + i}]'
+                    nested.append(f'{field!r}: {value}')
+                # The related row is missing when its primary key comes back NULL
+                pk = offset + fieldset.fields.index('id')
+                lines.append(f"{name!r}: {{{', '.join(nested)}}} if r[{pk}] is not None else None")
+                offset += len(fieldset.fields)
+
+            self._row_serializers[key] = _compile(f'dump_{self.model.__tablename__}', lines)
+        return self._row_serializers[key]
+
+    def dump_rows(self, rows, fields, includes, extra_columns=()):
+        """Serialize rows from project(), batch-loading included collections in one query each"""
+        dump = self.row_serializer(fields, includes, extra_columns)
+        data = [dump(row) for row in rows]
+
+        for name in includes:
+            fieldset, many = self.includes[name]
+            if not many:
+                continue
+            local, remote = getattr(self.model, name).property.local_remote_pairs[0]
+            parent_ids = [row.id for row in rows]
+            children = defaultdict(list)
+            if parent_ids:
+                child_dump = fieldset.row_serializer(fieldset.fields, [])
+                statement = select(*fieldset.columns(fieldset.fields), remote).where(remote.in_(parent_ids))
+                for child in db.session.execute(statement):
+                    children[child[-1]].append(child_dump(child))
+            for item, row in zip(data, rows):
+                item[name] = children.get(row.id, [])
+
+        return data
+
+# Nested shapes embedded in other resources
+CONTACT_SUMMARY = FieldSet(Contact, ['id', 'name', 'email'])
+ORDER_SUMMARY = FieldSet(Order, ['id', 'order_number'])
+INVOICE_SUMMARY = FieldSet(Invoice, ['id', 'invoice_number'])
+ORDER_ITEM_FIELDS = FieldSet(OrderItem, ['id', 'product_name', 'quantity', 'price'])
+RECEIPT_SUMMARY = FieldSet(Receipt, ['id', 'receipt_number', 'amount', 'payment_method', 'created_at'])
+
+CONTACT_FIELDS = FieldSet(
+    Contact,
+    ['id', 'name', 'email', 'phone', 'company', 'address', 'notes', 'created_at', 'updated_at']
+)
+
+LEAD_FIELDS = FieldSet(
+    Lead,
+    ['id', 'title', 'status', 'value', 'notes', 'created_at', 'updated_at'],
+    includes={'contact': (CONTACT_SUMMARY, False)}
+)
+
+ORDER_FIELDS = FieldSet(
+    Order,
+    ['id', 'order_number', 'status', 'total_amount', 'notes', 'created_at', 'updated_at'],
+    includes={'contact': (CONTACT_SUMMARY, False), 'items': (ORDER_ITEM_FIELDS, True)}
+)
+
+INVOICE_FIELDS = FieldSet(
+    Invoice,
+    ['id', 'invoice_number', 'amount', 'amount_paid', 'status', 'due_date', 'notes', 'created_at', 'updated_at'],
+    includes={
+        'contact': (CONTACT_SUMMARY, False),
+        'order': (ORDER_SUMMARY, False),
+        'receipts': (RECEIPT_SUMMARY, True)
+    }
+)
+
+RECEIPT_FIELDS = FieldSet(
+    Receipt,
+    ['id', 'receipt_number', 'amount', 'payment_method', 'notes', 'created_at'],
+    includes={'invoice': (INVOICE_SUMMARY, False)}
+)
+
+ENTRY_FIELDS = FieldSet(
+    AccountingEntry,
+    ['id', 'entry_type', 'category', 'amount', 'description', 'date', 'created_at']
+)
+
+ACTIVITY_FIELDS = FieldSet(
+    Activity,
+    ['id', 'collection', 'resource_id', 'action', 'title', 'created_at']
+)
@@ -0,0 +1,32 @@
+from flask import Response, current_app, stream_with_context
+
+STREAM_CHUNK_SIZE = 1000
+
+def stream_rows(key, query, dump_chunk, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream `{"<key>": [...]}` as a JSON response, `chunk_size` rows at a time.
+
+    Rows come from a server-side cursor (yield_per turns on stream_results), and
+    each chunk is serialized with `dump_chunk(rows)`, encoded and sent before the
+    next one is fetched, so peak memory follows chunk_size, not the row count.
+    """
+    def generate():
+        yield '{"%s":[' % key
+        first = True
+        chunk = []
+        for row in query.yield_per(chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield _encode(dump_chunk(chunk), first)
+                first = False
+                chunk = []
+        if chunk:
+            yield _encode(dump_chunk(chunk), first)
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def _encode(items, first):
+    # Encode the chunk as a JSON array and splice its elements into the open one
+    body = current_app.json.dumps(items, separators=(',', ':'))[1:-1]
+    return body if first else ',' + body
@@ -0,0 +1,139 @@
+import calendar
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime
+from flask import g, jsonify, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import select
+from ..database.models import db, ApiToken
+from .user_cache import CachedUser
+
+# Blueprint -> the resource its /api routes are scoped under
+TOKEN_RESOURCES = {
+    'contacts': 'contacts',
+    'leads': 'leads',
+    'orders': 'orders',
+    'invoices': 'invoices',
+    'receipts': 'receipts',
+    'accounting': 'accounting',
+    'dashboard': 'dashboard',
+    'activity': 'activity',
+    'changes': 'changes',
+    'stream': 'changes',
+}
+
+# '<resource>:read' allows GET; '<resource>:write' allows every method
+SCOPES = tuple(sorted(f'{resource}:{access}' for resource in set(TOKEN_RESOURCES.values()) for access in ('read', 'write')))
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+class TokenUser(CachedUser):
+    """current_user for a request authenticated with an API token"""
+
+    def __init__(self, user, token_id, scopes):
+        super().__init__(user.id, user.email, user.name, user.created_at)
+        self.token_id = token_id
+        self.scopes = scopes
+
+class TokenAuth:
+    """
+    Issues and verifies bearer tokens for machine clients.
+
+    A token is its claims (token id, user id, scopes, expiry) signed with the
+    app's SECRET_KEY, so verifying one is an HMAC check and no query. The only
+    table read on the request path is for revoked tokens: each process keeps
+    the ids of revoked, unexpired tokens in memory and reloads them every
+    `refresh` seconds. The user comes from the user cache.
+    """
+
+    def __init__(self, secret_key, user_cache, refresh):
+        self._serializer = URLSafeSerializer(secret_key, salt='api-token', signer_kwargs={'digest_method': hashlib.sha256})
+        self.user_cache = user_cache
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._revoked = frozenset()
+        self._loaded_at = None
+
+    def issue(self, user_id, name, scopes, expires_at):
+        """Add an ApiToken row for the caller to commit, and return it with the token string"""
+        unknown = sorted(set(scopes) - set(SCOPES))
+        if unknown:
+            raise ValueError(f"Unknown scopes: {', '.join(unknown)}. Use any of: {', '.join(SCOPES)}")
+        if not scopes:
+            raise ValueError('At least one scope is required')
+        record = ApiToken(id=secrets.token_hex(16), user_id=user_id, name=name,
+                          scopes=' '.join(sorted(set(scopes))), expires_at=expires_at)
+        db.session.add(record)
+        token = self._serializer.dumps({
+            'jti': record.id,
+            'sub': user_id,
+            'scp': record.scopes,
+            # expires_at is naive UTC; timestamp() would read it as local time
+            'exp': calendar.timegm(expires_at.utctimetuple()),
+        })
+        return record, token
+
+    def verify(self, token):
+        """The token's claims; raises ValueError if it is forged, expired or revoked"""
+        try:
+            claims = self._serializer.loads(token)
+        except BadSignature:
+            raise ValueError('Invalid token')
+        if claims['exp'] <= time.time():
+            raise ValueError('Token has expired')
+        if claims['jti'] in self._revoked_ids():
+            raise ValueError('Token has been revoked')
+        return claims
+
+    def _revoked_ids(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.refresh:
+            with self._lock:
+                if self._loaded_at is None or now - self._loaded_at >= self.refresh:
+                    self._revoked = frozenset(db.session.scalars(
+                        select(ApiToken.id).where(ApiToken.revoked_at.isnot(None), ApiToken.expires_at > datetime.utcnow())
+                    ))
+                    self._loaded_at = now
+        return self._revoked
+
+    def revoked(self, token_id):
+        """Stop accepting a token in this process now; other processes pick it up on their next reload"""
+        with self._lock:
+            self._revoked = self._revoked | {token_id}
+
+    def authenticate(self):
+        """before_request hook: check an `Authorization: Bearer` token and its scope for the route"""
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return None
+        try:
+            claims = self.verify(header[len('Bearer '):].strip())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 401
+
+        user = self.user_cache.get(claims['sub'])
+        if user is None:
+            return jsonify({'error': 'Invalid token'}), 401
+        resource = TOKEN_RESOURCES.get(request.blueprint)
+        if resource is None or not request.path.startswith('/api/'):
+            return jsonify({'error': 'API tokens are not accepted here'}), 403
+        scopes = claims['scp'].split()
+        access = 'read' if request.method in READ_METHODS else 'write'
+        if f'{resource}:{access}' not in scopes and f'{resource}:write' not in scopes:
+            return jsonify({'error': f'Token lacks the {resource}:{access} scope'}), 403
+        g.token_user = TokenUser(user, claims['jti'], scopes)
+        return None
+
+def init_tokens(app, login_manager):
+    """Accept API tokens in place of a session on the /api routes"""
+    tokens = TokenAuth(app.config['SECRET_KEY'], app.extensions['user_cache'], app.config['API_TOKEN_REVOCATION_REFRESH'])
+    app.before_request(tokens.authenticate)
+
+    @login_manager.request_loader
+    def load_user_from_token(request):
+        return g.get('token_user')
+
+    app.extensions['tokens'] = tokens
+    return tokens
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+from sqlalchemy import select
+from ..database.models import db, User
+from ..database.users import user_committed
+
+class CachedUser(UserMixin):
+    """
+    A detached, read-only copy of a user's profile columns that stands in for
+    User as current_user. It holds no session and no password hash, and has no
+    relationships to lazy-load.
+    """
+
+    def __init__(self, id, email, name, created_at):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f'<CachedUser {self.email}>'
+
+class UserCache:
+    """
+    Per-process LRU of CachedUsers for the Flask-Login user loader, so an
+    authenticated request doesn't need a query to rebuild current_user. Entries
+    expire after `ttl` seconds, and are dropped when a commit in this process
+    updates or deletes the user; changes made through other processes show up
+    once the TTL runs out.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+        # Bumped by every invalidation, so a row read across one isn't stored
+        self._generations = {}
+
+    def get(self, user_id):
+        """The user as a CachedUser, or None if there is no such user"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and cached[1] > now:
+                self._users.move_to_end(user_id)
+                return cached[0]
+            generation = self._generations.get(user_id, 0)
+
+        row = db.session.execute(
+            select(User.id, User.email, User.name, User.created_at).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        user = CachedUser(*row)
+        with self._lock:
+            if self._generations.get(user_id, 0) == generation:
+                self._users[user_id] = (user, now + self.ttl)
+                self._users.move_to_end(user_id)
+                while len(self._users) > self.size:
+                    self._users.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._users.pop(user_id, None)
+
+    def on_user_committed(self, user_id):
+        """Receiver for the user_committed signal"""
+        self.invalidate(user_id)
+
+def init_user_cache(app):
+    """Create the user cache and subscribe it to committed account changes"""
+    cache = UserCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+    user_committed.connect(cache.on_user_committed)
+    app.extensions['user_cache'] = cache
+    return cache
@@ -0,0 +1,56 @@
+"""
+Requests per second on GET /api/check-auth with current_user served from the
+per-process user cache, and with the query per request the user loader ran
+before it (User loaded through the ORM).
+
+    python -m benchmarks.check_auth --threads 1 8 --seconds 3
+"""
+import argparse
+import tempfile
+import threading
+import time
+from backend.database.models import db, User
+from .common import scratch_app, create_user, signed_in
+
+def requests_per_second(app, threads, seconds):
+    """`threads` signed-in clients calling /api/check-auth in a loop for `seconds`"""
+    clients = [signed_in(app) for _ in range(threads)]
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def work(n):
+        client = clients[n]
+        while time.perf_counter() < deadline:
+            response = client.get('/api/check-auth')
+            if response.status_code != 200 or not response.get_json()['authenticated']:
+                raise RuntimeError(f'check-auth failed: {response.status_code}')
+            counts[n] += 1
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory)
+        create_user(app)
+        user_cache = app.extensions['user_cache']
+        loaders = [
+            ('query per request', lambda user_id: db.session.get(User, int(user_id))),
+            ('user cache', lambda user_id: user_cache.get(int(user_id))),
+        ]
+        for threads in args.threads:
+            for name, loader in loaders:
+                app.login_manager.user_loader(loader)
+                print(f'{threads} thread(s), {name:17s} {requests_per_second(app, threads, args.seconds):7.0f} req/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import os
+import time
+from backend.app import create_app
+from backend.config import config, Config
+from backend.database.models import db, User
+
+EMAIL = 'bench@example.com'
+PASSWORD = 'bench'
+
+def scratch_app(directory, **settings):
+    """
+    The app on a new SQLite file in `directory`, with `settings` over the base
+    config. Password hashes are cheap unless PASSWORD_HASH_METHOD says otherwise.
+    """
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directory, 'benchmark.db'),
+        'REPLICA_DATABASE_URLS': [],
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+        **settings,
+    }
+    config['benchmark'] = type('BenchmarkConfig', (Config,), settings)
+    try:
+        return create_app('benchmark')
+    finally:
+        del config['benchmark']
+
+def create_user(app, email=EMAIL, password=PASSWORD):
+    """A user to run the benchmark as; returns its id"""
+    with app.app_context():
+        user = User(email=email, name='Benchmark', password=app.extensions['passwords'].hash(password))
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+def insert_rows(app, model, rows, batch=10000):
+    """Bulk-insert `rows` (dicts) into `model`'s table, bypassing the ORM and its flush hooks"""
+    with app.app_context():
+        for start in range(0, len(rows), batch):
+            db.session.execute(model.__table__.insert(), rows[start:start + batch])
+        db.session.commit()
+
+def signed_in(app, email=EMAIL, password=PASSWORD):
+    """A test client signed in as `email`"""
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': email, 'password': password})
+    if response.status_code != 200:
+        raise RuntimeError(f'login failed: {response.status_code} {response.get_data(as_text=True)}')
+    return client
+
+def median_ms(run, repeat=5):
+    """Median wall time of `repeat` calls to `run`, after one warm-up call, in ms"""
+    run()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[repeat // 2]
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
@@ -0,0 +1,88 @@
+"""
+Milliseconds to answer GET /api/dashboard, median and p99: cold, right after
+a write has dropped its cached totals and lists, and warm, between writes.
+
+    python -m benchmarks.dashboard --rows 20000
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from backend.database.models import Contact, Lead, Order, Invoice, AccountingEntry, Activity
+from backend.database.stats import rebuild_stats
+from backend.database.rollups import rebuild_rollups
+from backend.routes.dashboard_routes import LIST_COLLECTIONS
+from .common import scratch_app, create_user, insert_rows, signed_in, percentile
+
+URL = '/api/dashboard?period=month'
+
+def seed(app, user_id, rows):
+    now = datetime.utcnow()
+    ago = lambda n: now - timedelta(minutes=n)
+    insert_rows(app, Contact, [
+        {'id': n, 'name': f'Contact {n}', 'email': f'contact{n}@example.com', 'created_at': ago(n), 'user_id': user_id}
+        for n in range(1, rows + 1)
+    ])
+    insert_rows(app, Lead, [
+        {'title': f'Lead {n}', 'status': 'New', 'value': n % 1000, 'created_at': ago(n), 'user_id': user_id, 'contact_id': n}
+        for n in range(1, rows + 1)
+    ])
+    insert_rows(app, Order, [
+        {'order_number': f'ORD-{n:08X}', 'status': 'Pending', 'total_amount': n % 1000, 'created_at': ago(n),
+         'user_id': user_id, 'contact_id': n}
+        for n in range(1, rows + 1)
+    ])
+    insert_rows(app, Invoice, [
+        {'invoice_number': f'INV-{n:08X}', 'amount': n % 1000, 'status': 'Unpaid' if n % 2 else 'Paid',
+         'due_date': ago(-n), 'created_at': ago(n), 'user_id': user_id, 'contact_id': n}
+        for n in range(1, rows + 1)
+    ])
+    insert_rows(app, AccountingEntry, [
+        {'entry_type': 'Income' if n % 3 else 'Expense', 'category': f'Category {n % 12}', 'amount': n % 500,
+         'date': ago(n * 7), 'created_at': ago(n * 7), 'user_id': user_id}
+        for n in range(1, rows + 1)
+    ])
+    insert_rows(app, Activity, [
+        {'collection': 'contacts', 'resource_id': n % rows + 1, 'action': 'updated', 'title': f'Contact {n}',
+         'created_at': ago(n), 'user_id': user_id}
+        for n in range(1, 5 * rows + 1)
+    ])
+    with app.app_context():
+        rebuild_stats(user_id)
+        rebuild_rollups(user_id)
+
+def latencies(client, requests, before=None):
+    """Milliseconds for each of `requests` GETs of the dashboard, calling `before()` ahead of each"""
+    timings = []
+    for _ in range(requests):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        response = client.get(URL)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {URL}: {response.status_code}')
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory)
+        user_id = create_user(app)
+        seed(app, user_id, args.rows)
+        client = signed_in(app)
+        report_cache = app.extensions['report_cache']
+        # What committing a contact and an accounting entry dated today logs
+        write = lambda: report_cache.log_write(user_id, LIST_COLLECTIONS, [datetime.utcnow().date()])
+
+        print(f'{args.rows} of each record type, {5 * args.rows} activity rows, {args.requests} requests')
+        for name, before in (('cold', write), ('warm', None)):
+            timings = latencies(client, args.requests, before)
+            print(f'  {name}: median {percentile(timings, 0.5):6.1f} ms   p99 {percentile(timings, 0.99):6.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Concurrent report-style reads and payment-style writes against the database,
+under the driver's defaults and under this environment's engine profile
+(SQLITE_PRAGMAS on SQLite, POSTGRES_POOL on PostgreSQL).
+
+    python -m benchmarks.engine --readers 8 --writers 4 --seconds 10
+    python -m benchmarks.engine --config production --url postgresql://...
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeout
+from backend.config import config as configs
+from backend.database.engine import set_sqlite_pragmas
+from .common import percentile
+
+TABLE = 'engine_benchmark'
+
+def profiles(config, url):
+    """
+    (name, engine options, SQLite pragmas) to compare on the database at `url`:
+    the driver's defaults against this environment's profile
+    """
+    if make_url(url).get_backend_name() == 'postgresql':
+        return [('default pool', {}, {}),
+                ('POSTGRES_POOL', dict(config['POSTGRES_POOL']), {})]
+    # WAL sticks to the file, so the baseline has to switch it back explicitly
+    return [('rollback journal', {}, {'journal_mode': 'DELETE'}),
+            ('SQLITE_PRAGMAS', {}, dict(config['SQLITE_PRAGMAS']))]
+
+def run_profile(url, options, pragmas, readers, writers, seconds, rows=20000, users=20):
+    """
+    Run `readers` threads summing one user's rows (like a report) against
+    `writers` threads each moving an amount between two rows in a read-then-write
+    transaction (like a payment), on a scratch table, for `seconds`. Returns the
+    throughput and latency of each, and the errors (lock or pool timeouts) seen.
+    """
+    if make_url(url).get_backend_name() == 'sqlite':
+        # Connections are cheap here: give every thread one, so they contend for the database lock and not the pool
+        options = {'pool_size': readers + writers, **options}
+    engine = create_engine(url, **options)
+    set_sqlite_pragmas(engine, pragmas)
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        connection.execute(text(f'CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, amount FLOAT NOT NULL)'))
+        connection.execute(text(f'CREATE INDEX ix_{TABLE}_user_id ON {TABLE} (user_id)'))
+        connection.execute(text(f'INSERT INTO {TABLE} (id, user_id, amount) VALUES (:id, :user_id, 100)'),
+                           [{'id': n, 'user_id': n % users} for n in range(1, rows + 1)])
+
+    results = {'read': [], 'write': []}
+    errors = {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def read(connection):
+        connection.execute(text(f'SELECT count(*), sum(amount) FROM {TABLE} WHERE user_id = :user_id'),
+                           {'user_id': random.randrange(users)}).one()
+
+    def write(connection):
+        source, target = random.randrange(1, rows + 1), random.randrange(1, rows + 1)
+        with connection.begin():
+            amount = connection.execute(text(f'SELECT amount FROM {TABLE} WHERE id = :id'), {'id': source}).scalar_one()
+            connection.execute(text(f'UPDATE {TABLE} SET amount = :amount WHERE id = :id'), {'id': source, 'amount': amount - 1})
+            connection.execute(text(f'UPDATE {TABLE} SET amount = amount + 1 WHERE id = :id'), {'id': target})
+
+    def worker(kind, operation):
+        latencies = []
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    operation(connection)
+                    connection.commit()
+            except (OperationalError, PoolTimeout) as e:
+                name = str(getattr(e, 'orig', None) or e).split('\n')[0][:80]
+                with lock:
+                    errors[name] = errors.get(name, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+        with lock:
+            results[kind].extend(latencies)
+
+    threads = [threading.Thread(target=worker, args=('read', read)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=('write', write)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE {TABLE}'))
+    engine.dispose()
+
+    report = {'errors': errors}
+    for kind, latencies in results.items():
+        report[kind] = {
+            'per_second': len(latencies) / seconds,
+            'p50_ms': percentile(latencies, 0.5) * 1000 if latencies else None,
+            'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else None,
+        }
+    return report
+
+def benchmark(config, readers, writers, seconds, url=None):
+    """
+    Yield (profile name, report) for each profile. SQLite runs against a scratch
+    file, since switching a live database out of WAL needs it to be idle;
+    PostgreSQL against a scratch table in the configured database unless `url` is given.
+    """
+    if url is None and make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name() == 'sqlite':
+        with tempfile.TemporaryDirectory() as directory:
+            yield from benchmark(config, readers, writers, seconds, 'sqlite:///' + os.path.join(directory, 'benchmark.db'))
+        return
+    url = url or config['SQLALCHEMY_DATABASE_URI']
+    for name, options, pragmas in profiles(config, url):
+        yield name, run_profile(url, options, pragmas, readers, writers, seconds)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--readers', type=int, default=8, help='Threads running report-style reads.')
+    parser.add_argument('--writers', type=int, default=4, help='Threads running payment-style writes.')
+    parser.add_argument('--seconds', type=float, default=10, help='How long to run each profile.')
+    parser.add_argument('--config', default='default', choices=sorted(configs), help='Config class whose profile to compare.')
+    parser.add_argument('--url', default=None, help='Database to run against (default: a scratch SQLite file, '
+                                                    'or a scratch table in the configured PostgreSQL database).')
+    args = parser.parse_args()
+
+    config_class = configs[args.config]
+    config = {name: getattr(config_class, name) for name in dir(config_class) if name.isupper()}
+    for name, report in benchmark(config, args.readers, args.writers, args.seconds, args.url):
+        print(name)
+        for kind in ('read', 'write'):
+            result = report[kind]
+            latency = (f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms"
+                       if result['p50_ms'] is not None else 'none completed')
+            print(f"  {kind + 's':<7}{result['per_second']:9.0f}/s  {latency}")
+        for error, count in sorted(report['errors'].items()):
+            print(f'  {count} x {error}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Peak Python memory (tracemalloc) for exporting every accounting entry:
+GET /api/accounting/entries/export streamed in chunks, against building the
+whole response at once as the export did before (ORM objects into jsonify).
+
+    python -m benchmarks.export_memory --rows 10000 50000 100000
+"""
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from flask import jsonify
+from backend.database.models import AccountingEntry
+from backend.utils.serializers import ENTRY_FIELDS
+from .common import scratch_app, create_user, insert_rows, signed_in
+
+def seed(app, user_id, start, stop):
+    now = datetime.utcnow()
+    insert_rows(app, AccountingEntry, [
+        {'id': n, 'entry_type': 'Income' if n % 2 else 'Expense', 'category': f'Category {n % 10}',
+         'amount': n, 'description': 'Description ' * 5, 'date': now - timedelta(minutes=n), 'created_at': now,
+         'user_id': user_id}
+        for n in range(start + 1, stop + 1)
+    ])
+
+def peak_mb(run):
+    """(bytes returned by `run`, peak traced memory while it ran in MB)"""
+    tracemalloc.start()
+    try:
+        size = run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return size, peak / 1e6
+
+def streamed(client):
+    response = client.get('/api/accounting/entries/export', buffered=False)
+    try:
+        return sum(len(chunk) for chunk in response.response)
+    finally:
+        response.close()
+
+def buffered(app, user_id):
+    with app.test_request_context():
+        entries = AccountingEntry.query.filter_by(user_id=user_id).all()
+        return len(jsonify({'entries': [ENTRY_FIELDS.serialize(entry) for entry in entries]}).get_data())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory)
+        user_id = create_user(app)
+        client = signed_in(app)
+        seeded = 0
+        for rows in sorted(args.rows):
+            seed(app, user_id, seeded, rows)
+            seeded = rows
+            stream_size, stream_peak = peak_mb(lambda: streamed(client))
+            _, buffer_peak = peak_mb(lambda: buffered(app, user_id))
+            print(f'{rows:8d} entries ({stream_size / 1e6:.1f} MB of JSON): '
+                  f'streamed {stream_peak:7.1f} MB peak, buffered {buffer_peak:7.1f} MB peak')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency of an ordinary request (GET /api/orders) while a storm of logins
+hashes passwords at the configured cost, against the same request with no
+logins running. The app is served by a threaded werkzeug server in this
+process, like one gunicorn gthread worker; the storm is run once for each
+PASSWORD_HASH_WORKERS value given (a value as large as --storm-threads hashes
+every login at once, as request threads did before the pool).
+
+    python -m benchmarks.login_storm --storm-threads 16 --hash-workers 2 16 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import tempfile
+import threading
+import time
+from werkzeug.serving import make_server, WSGIRequestHandler
+from backend.config import Config
+from backend.utils.passwords import init_passwords
+from .common import scratch_app, create_user, percentile, EMAIL, PASSWORD
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+def post_login(connection, email, password):
+    """(status, session cookie) for one POST /api/login"""
+    connection.request('POST', '/api/login', json.dumps({'email': email, 'password': password}),
+                       {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie')
+    return response.status, cookie.split(';')[0] if cookie else None
+
+def probe(port, seconds, interval=0.02):
+    """Latencies (ms) of GET /api/orders?limit=5, signed in, every `interval` seconds for `seconds`"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    _, cookie = post_login(connection, EMAIL, PASSWORD)
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        connection.request('GET', '/api/orders?limit=5', headers={'Cookie': cookie})
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f'probe failed: {response.status}')
+        latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(interval)
+    connection.close()
+    return latencies
+
+def storm(port, accounts, threads, stop):
+    """Run `threads` clients logging in to `accounts` until `stop` is set; returns the count per status"""
+    statuses = {}
+    lock = threading.Lock()
+
+    def work(n):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        while not stop.is_set():
+            status, _ = post_login(connection, accounts[n % len(accounts)], PASSWORD)
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+            if status == 503:
+                time.sleep(1)
+        connection.close()
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    return workers, statuses
+
+def report(name, latencies, statuses=None, seconds=None):
+    line = (f'{name:28s} p50 {percentile(latencies, 0.5):7.1f} ms   p99 {percentile(latencies, 0.99):7.1f} ms'
+            f'   max {max(latencies):7.1f} ms')
+    if statuses is not None:
+        logins = statuses.get(200, 0)
+        line += f'   {logins / seconds:5.1f} logins/s {dict(sorted(statuses.items()))}'
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--storm-threads', type=int, default=16)
+    parser.add_argument('--hash-workers', type=int, nargs='+', default=[2, 16])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--hash-method', default=Config.PASSWORD_HASH_METHOD)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory, PASSWORD_HASH_METHOD=args.hash_method)
+        create_user(app)
+        accounts = [f'storm{n}@example.com' for n in range(min(args.storm_threads, 8))]
+        for email in accounts:
+            create_user(app, email)
+
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+        try:
+            print(f'{args.hash_method}, {args.storm_threads} threads logging in')
+            report('no logins', probe(port, args.seconds))
+            for workers in args.hash_workers:
+                app.config['PASSWORD_HASH_WORKERS'] = workers
+                init_passwords(app)
+                stop = threading.Event()
+                threads, statuses = storm(port, accounts, args.storm_threads, stop)
+                latencies = probe(port, args.seconds)
+                stop.set()
+                for thread in threads:
+                    thread.join()
+                report(f'storm, {workers} hash worker(s)', latencies, statuses, args.seconds)
+        finally:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
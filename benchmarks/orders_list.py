@@ -0,0 +1,88 @@
+"""
+Rows per second served by GET /api/orders, and by the two ways of reading a
+page of orders behind it: ORM objects serialized one by one (the list
+endpoints before they read Core rows) and the Core row projection they use now.
+
+    python -m benchmarks.orders_list --rows 100000
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from backend.database.models import db, Contact, Order, OrderItem
+from backend.utils.serializers import ORDER_FIELDS
+from .common import scratch_app, create_user, insert_rows, signed_in
+
+def seed(app, user_id, rows):
+    insert_rows(app, Contact, [{'id': 1, 'name': 'Contact', 'email': 'contact@example.com', 'user_id': user_id}])
+    now = datetime.utcnow()
+    insert_rows(app, Order, [
+        {'id': n, 'order_number': f'ORD-{n:08X}', 'status': 'Pending', 'total_amount': n, 'notes': 'Note ' * 20,
+         'created_at': now - timedelta(seconds=n), 'updated_at': now, 'user_id': user_id, 'contact_id': 1}
+        for n in range(1, rows + 1)
+    ])
+    insert_rows(app, OrderItem, [
+        {'product_name': 'Widget', 'quantity': 1, 'price': 10.0, 'order_id': n} for n in range(1, rows + 1)
+    ])
+
+def read_pages(app, user_id, page_size, read_page):
+    """Rows per second reading every order, `page_size` at a time (newest first, as the endpoint orders them), with `read_page`"""
+    fields, includes = ORDER_FIELDS.select({}, ['contact', 'items'])
+    total = 0
+    started = time.perf_counter()
+    with app.test_request_context():
+        last = None
+        while True:
+            query = Order.query.filter_by(user_id=user_id)
+            if last is not None:
+                # Seeded orders have distinct created_at, so it alone is a keyset
+                query = query.filter(Order.created_at < last)
+            page = read_page(query, fields, includes, page_size)
+            if not page:
+                break
+            total += len(page)
+            last = datetime.fromisoformat(page[-1]['created_at'])
+        db.session.remove()
+    return total / (time.perf_counter() - started)
+
+def orm_objects(query, fields, includes, page_size):
+    query = query.options(*ORDER_FIELDS.load_options(fields, includes))
+    orders = query.order_by(Order.created_at.desc()).limit(page_size).all()
+    return [ORDER_FIELDS.serialize(order, fields, includes) for order in orders]
+
+def core_rows(query, fields, includes, page_size):
+    query = ORDER_FIELDS.project(query, fields, includes)
+    rows = query.order_by(Order.created_at.desc()).limit(page_size).all()
+    return ORDER_FIELDS.dump_rows(rows, fields, includes)
+
+def endpoint(client, page_size):
+    """Rows per second paging through GET /api/orders"""
+    total = 0
+    cursor = None
+    started = time.perf_counter()
+    while True:
+        url = f'/api/orders?limit={page_size}' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()
+        total += len(data['orders'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    return total / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory)
+        user_id = create_user(app)
+        seed(app, user_id, args.rows)
+        print(f'{args.rows} orders, one item each, pages of {args.page_size}')
+        print(f'  ORM objects:     {read_pages(app, user_id, args.page_size, orm_objects):8.0f} rows/s')
+        print(f'  Core rows:       {read_pages(app, user_id, args.page_size, core_rows):8.0f} rows/s')
+        print(f'  GET /api/orders: {endpoint(signed_in(app), args.page_size):8.0f} rows/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Milliseconds to answer accounting pivots from the in-memory NumPy cube,
+against the SQL GROUP BY that computes the same cells, plus the cube's cold
+load and a warm GET /api/accounting/pivot. Needs NumPy.
+
+    python -m benchmarks.pivot --rows 200000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from backend.database.models import db, AccountingEntry
+from backend.utils.analytics import np, EntryCube, pivot
+from .common import scratch_app, create_user, insert_rows, signed_in, median_ms
+
+def seed(app, user_id, rows):
+    start = datetime(2022, 1, 1)
+    insert_rows(app, AccountingEntry, [
+        {'entry_type': 'Income' if n % 3 else 'Expense', 'category': f'Category {n % 12}', 'amount': n % 500,
+         'date': start + timedelta(minutes=17 * n % (3 * 365 * 24 * 60)), 'created_at': start, 'user_id': user_id}
+        for n in range(rows)
+    ])
+
+def cases(user_id):
+    """(name, pivot arguments, the equivalent GROUP BY) for each pivot compared"""
+    entry = AccountingEntry
+    month = func.strftime('%Y-%m', entry.date)
+
+    def grouped(first, second, measure=func.sum(entry.amount), *where):
+        return select(first, second, measure).where(entry.user_id == user_id, *where).group_by(first, second)
+
+    return [
+        ('category x month', {'rows': 'category', 'columns': 'month'}, grouped(entry.category, month)),
+        ('entry_type x month', {'rows': 'entry_type', 'columns': 'month'}, grouped(entry.entry_type, month)),
+        ('month_of_year x year, Income', {'rows': 'month_of_year', 'columns': 'year', 'entry_type': 'Income'},
+         grouped(func.strftime('%m', entry.date), func.strftime('%Y', entry.date), func.sum(entry.amount),
+                 entry.entry_type == 'Income')),
+        ('day x entry_type, avg', {'rows': 'day', 'columns': 'entry_type', 'measure': 'avg'},
+         grouped(func.date(entry.date), entry.entry_type, func.avg(entry.amount))),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+    if np is None:
+        sys.exit('This benchmark needs NumPy: pip install numpy')
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory)
+        user_id = create_user(app)
+        seed(app, user_id, args.rows)
+        with app.app_context():
+            started = time.perf_counter()
+            cube = EntryCube.load(user_id)
+            print(f'{len(cube)} entries, cube loaded in {(time.perf_counter() - started) * 1000:.0f} ms')
+            for name, arguments, statement in cases(user_id):
+                cube_ms = median_ms(lambda: pivot(cube, **arguments))
+                sql_ms = median_ms(lambda: db.session.execute(statement).all(), repeat=3)
+                print(f'  {name:30s} cube {cube_ms:8.1f} ms   GROUP BY {sql_ms:8.1f} ms')
+        client = signed_in(app)
+        http_ms = median_ms(lambda: client.get('/api/accounting/pivot?rows=category&columns=month'))
+        print(f'  GET /api/accounting/pivot (warm) {http_ms:8.1f} ms')
+
+if __name__ == '__main__':
+    main()
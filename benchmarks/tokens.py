@@ -0,0 +1,57 @@
+"""
+Requests per second on GET /api/contacts authenticated with a session cookie,
+and with an API token (`Authorization: Bearer`), the way an integration calls it.
+
+    python -m benchmarks.tokens --threads 1 8 --seconds 3
+"""
+import argparse
+import tempfile
+import threading
+import time
+from .common import scratch_app, create_user, signed_in
+
+URL = '/api/contacts?limit=5'
+
+def requests_per_second(clients, call, seconds):
+    """One thread per client running `call(client)` in a loop for `seconds`"""
+    counts = [0] * len(clients)
+    deadline = time.perf_counter() + seconds
+
+    def work(n):
+        while time.perf_counter() < deadline:
+            response = call(clients[n])
+            if response.status_code != 200:
+                raise RuntimeError(f'{URL} failed: {response.status_code}')
+            counts[n] += 1
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(len(clients))]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = scratch_app(directory)
+        create_user(app)
+        session = signed_in(app)
+        token = session.post('/api/tokens', json={'name': 'benchmark', 'scopes': ['contacts:read']}).get_json()['token']
+        headers = {'Authorization': f'Bearer {token}'}
+        ways = [
+            ('session cookie', lambda: signed_in(app), lambda client: client.get(URL)),
+            # A client of its own sends no session cookie at all
+            ('API token', app.test_client, lambda client: client.get(URL, headers=headers)),
+        ]
+        for threads in args.threads:
+            for name, new_client, call in ways:
+                clients = [new_client() for _ in range(threads)]
+                print(f'{threads} thread(s), {name:15s} {requests_per_second(clients, call, args.seconds):7.0f} req/s')
+
+if __name__ == '__main__':
+    main()
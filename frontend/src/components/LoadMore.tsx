@@ -0,0 +1,23 @@
+import React from 'react';
+import { Button } from 'react-bootstrap';
+
+interface LoadMoreProps {
+  hasMore: boolean;
+  loading: boolean;
+  onClick: () => void;
+}
+
+// Fetches the next page of a list; hidden once the last page is loaded
+const LoadMore: React.FC<LoadMoreProps> = ({ hasMore, loading, onClick }) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className="text-center mt-3">
+      <Button variant="outline-primary" onClick={onClick} disabled={loading}>
+        {loading ? 'Loading...' : 'Load more'}
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
@@ -0,0 +1,51 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { createPager, ListParams, PageFetcher, Pager } from '../services/api';
+
+// Rows of a list endpoint, one page at a time: the first page on mount and
+// whenever `params` change, then one more page per loadMore() call
+export const usePagedList = <T = any>(fetchPage: PageFetcher, key: string, params: ListParams = {}) => {
+  const [rows, setRows] = useState<T[]>([]);
+  const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [hasMore, setHasMore] = useState(false);
+  const [error, setError] = useState<any>(null);
+  const pager = useRef<Pager<T> | null>(null);
+  const paramsKey = JSON.stringify(params);
+
+  // Pages of a pager replaced meanwhile (params changed, reload()) are dropped
+  const load = useCallback(async (current: Pager<T>, append: boolean) => {
+    try {
+      const page = (await current.next()) || [];
+      if (pager.current !== current) return;
+      setRows(rows => (append ? [...rows, ...page] : page));
+      setHasMore(current.hasMore());
+      setError(null);
+    } catch (err) {
+      if (pager.current !== current) return;
+      console.error(`Error fetching ${key}:`, err);
+      setError(err);
+    }
+  }, [key]);
+
+  const reload = useCallback(async () => {
+    const current = createPager<T>(fetchPage, key, JSON.parse(paramsKey));
+    pager.current = current;
+    setLoading(true);
+    await load(current, false);
+    if (pager.current === current) setLoading(false);
+  }, [fetchPage, key, paramsKey, load]);
+
+  const loadMore = useCallback(async () => {
+    const current = pager.current;
+    if (!current || !current.hasMore() || loadingMore) return;
+    setLoadingMore(true);
+    await load(current, true);
+    setLoadingMore(false);
+  }, [load, loadingMore]);
+
+  useEffect(() => {
+    reload();
+  }, [reload]);
+
+  return { rows, setRows, loading, loadingMore, hasMore, error, loadMore, reload };
+};
@@ -3,12 +3,15 @@ import { Container, Row, Col, Card, Table, Badge, Button, Form, InputGroup, Moda
 import { FaPlus, FaEdit, FaTrash, FaSearch, FaTimes, FaChartPie, FaFilter, FaFileInvoiceDollar, FaReceipt } from 'react-icons/fa';
 import { useNavigate } from 'react-router-dom';
 import { accountingService } from '../services/api';
+import { usePagedList } from '../hooks/usePagedList';
+import LoadMore from '../components/LoadMore';
 import { AccountingEntry } from '../types';
 import Chart from 'chart.js/auto';
 
 const Accounting: React.FC = () => {
-  const [entries, setEntries] = useState<AccountingEntry[]>([]);
-  const [loading, setLoading] = useState(true);
+  const {
+    rows: entries, setRows: setEntries, loading, loadingMore, hasMore, error: loadError, loadMore, reload: reloadEntries
+  } = usePagedList<AccountingEntry>(accountingService.getEntries, 'entries');
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [showDeleteModal, setShowDeleteModal] = useState(false);
@@ -31,7 +34,6 @@ const Accounting: React.FC = () => {
   });
 
   useEffect(() => {
-    fetchEntries();
     fetchSummary('month');
   }, []);
 
@@ -41,24 +43,6 @@ const Accounting: React.FC = () => {
     }
   }, [summaryData]);
 
-  const fetchEntries = async () => {
-    try {
-      setLoading(true);
-      console.log('Fetching accounting entries...');
-      const response = await accountingService.getEntries();
-      console.log('Entries response:', response.data);
-      setEntries(response.data.entries || []);
-      setError(null);
-    } catch (err: any) {
-      console.error('Error fetching accounting entries:', err);
-      console.error('Response status:', err.response?.status);
-      console.error('Response data:', err.response?.data);
-      setError('Failed to load accounting data. Please try again later.');
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const fetchSummary = async (period: string) => {
     try {
       setSummaryLoading(true);
@@ -201,7 +185,7 @@ const Accounting: React.FC = () => {
       };
       
       await accountingService.createEntry(payload);
-      fetchEntries();
+      reloadEntries();
       fetchSummary(activePeriod);
       setShowAddModal(false);
       
@@ -264,6 +248,12 @@ const Accounting: React.FC = () => {
         </Alert>
       )}
 
+      {loadError && (
+        <Alert variant="danger">
+          Failed to load accounting data. Please try again later.
+        </Alert>
+      )}
+
       {loading ? (
         <div className="text-center py-5">
           <div className="spinner-border text-primary" role="status">
@@ -357,6 +347,7 @@ const Accounting: React.FC = () => {
                         ))}
                       </tbody>
                     </Table>
+                    <LoadMore hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
                   </div>
                 )}
               </Card.Body>
@@ -1,33 +1,20 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { Container, Table, Button, Card, Row, Col, Form, InputGroup } from 'react-bootstrap';
 import { Link } from 'react-router-dom';
 import { contactService } from '../services/api';
+import { usePagedList } from '../hooks/usePagedList';
+import LoadMore from '../components/LoadMore';
 import { Contact } from '../types';
 
+const CONTACT_PARAMS = { fields: 'id,name,email,phone,company' };
+
 const Contacts: React.FC = () => {
-  const [contacts, setContacts] = useState<Contact[]>([]);
-  const [loading, setLoading] = useState(true);
+  const {
+    rows: contacts, setRows: setContacts, loading, loadingMore, hasMore, error: loadError, loadMore
+  } = usePagedList<Contact>(contactService.getContacts, 'contacts', CONTACT_PARAMS);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
 
-  useEffect(() => {
-    const fetchContacts = async () => {
-      try {
-        setLoading(true);
-        const response = await contactService.getContacts();
-        setContacts(response.data.contacts);
-        setError(null);
-      } catch (err) {
-        console.error('Error fetching contacts:', err);
-        setError('Failed to load contacts. Please try again later.');
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchContacts();
-  }, []);
-
   // Filter contacts based on search term
   const filteredContacts = contacts.filter(contact => 
     contact.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -67,9 +54,9 @@ const Contacts: React.FC = () => {
         </Link>
       </div>
 
-      {error && (
+      {(error || loadError) && (
         <div className="alert alert-danger" role="alert">
-          {error}
+          {error || 'Failed to load contacts. Please try again later.'}
         </div>
       )}
 
@@ -139,6 +126,7 @@ const Contacts: React.FC = () => {
               {searchTerm ? 'No contacts matching your search.' : 'No contacts found. Add a contact to get started.'}
             </div>
           )}
+          <LoadMore hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
         </Card.Body>
       </Card>
     </Container>
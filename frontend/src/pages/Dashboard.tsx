@@ -1,7 +1,25 @@
 import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Table, Button } from 'react-bootstrap';
 import { Link } from 'react-router-dom';
-import { contactService, leadService, orderService, invoiceService } from '../services/api';
+import { dashboardService } from '../services/api';
+
+const ACTIVITY_TYPES: Record<string, string> = {
+  contacts: 'Contact',
+  leads: 'Lead',
+  orders: 'Order',
+  invoices: 'Invoice',
+  receipts: 'Receipt',
+  accounting_entries: 'Accounting Entry'
+};
+
+const ACTIVITY_LINKS: Record<string, (id: number) => string> = {
+  contacts: (id) => `/contacts/${id}`,
+  leads: (id) => `/leads/${id}`,
+  orders: (id) => `/orders/${id}`,
+  invoices: (id) => `/invoices/${id}`,
+  receipts: () => '/receipts',
+  accounting_entries: () => '/accounting'
+};
 
 const Dashboard: React.FC = () => {
   const [stats, setStats] = useState({
@@ -10,6 +28,11 @@ const Dashboard: React.FC = () => {
     orders: 0,
     invoices: 0
   });
+  const [totals, setTotals] = useState({
+    pipelineValue: 0,
+    receivables: 0,
+    revenue: 0
+  });
   const [recentActivity, setRecentActivity] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
 
@@ -17,60 +40,27 @@ const Dashboard: React.FC = () => {
     const fetchDashboardData = async () => {
       setLoading(true);
       try {
-        // Fetch counts
-        const [contactsRes, leadsRes, ordersRes, invoicesRes] = await Promise.all([
-          contactService.getContacts(),
-          leadService.getLeads(),
-          orderService.getOrders(),
-          invoiceService.getInvoices()
-        ]);
+        // Counts, totals and recent activity in one request
+        const response = await dashboardService.getDashboard({ latest: 0 });
+        const { counts, pipeline_value, receivables, revenue, recent_activity } = response.data;
 
-        setStats({
-          contacts: contactsRes.data.contacts.length,
-          leads: leadsRes.data.leads.length,
-          orders: ordersRes.data.orders.length,
-          invoices: invoicesRes.data.invoices.length
+        setStats(counts);
+        setTotals({
+          pipelineValue: pipeline_value,
+          receivables: receivables,
+          revenue: revenue.total
         });
 
-        // Create recent activity from various sources
-        const activity = [
-          ...contactsRes.data.contacts.slice(0, 3).map((c: any) => ({
-            type: 'Contact',
-            id: c.id,
-            name: c.name,
-            date: new Date(c.created_at).toLocaleDateString(),
-            action: 'Added',
-            link: `/contacts/${c.id}`
-          })),
-          ...leadsRes.data.leads.slice(0, 3).map((l: any) => ({
-            type: 'Lead',
-            id: l.id,
-            name: l.name,
-            date: new Date(l.created_at).toLocaleDateString(),
-            action: 'Created',
-            link: `/leads/${l.id}`
-          })),
-          ...ordersRes.data.orders.slice(0, 3).map((o: any) => ({
-            type: 'Order',
-            id: o.id,
-            name: `Order #${o.id}`,
-            date: new Date(o.created_at).toLocaleDateString(),
-            action: 'Placed',
-            link: `/orders/${o.id}`
-          })),
-          ...invoicesRes.data.invoices.slice(0, 3).map((i: any) => ({
-            type: 'Invoice',
-            id: i.id,
-            name: `Invoice #${i.id}`,
-            date: new Date(i.created_at).toLocaleDateString(),
-            action: 'Generated',
-            link: `/invoices/${i.id}`
-          }))
-        ];
-
-        // Sort by date (newest first) and take first 10
-        activity.sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime());
-        setRecentActivity(activity.slice(0, 10));
+        // Recent activity comes from the server-side activity feed, newest first
+        setRecentActivity(recent_activity.map((a: any) => ({
+          type: ACTIVITY_TYPES[a.collection] || a.collection,
+          id: a.id,
+          name: a.title,
+          action: a.action.charAt(0).toUpperCase() + a.action.slice(1),
+          date: new Date(a.created_at).toLocaleDateString(),
+          // Deleted records have nothing left to view
+          link: a.action === 'deleted' ? null : ACTIVITY_LINKS[a.collection]?.(a.resource_id)
+        })));
       } catch (error) {
         console.error('Error fetching dashboard data:', error);
       } finally {
@@ -81,6 +71,10 @@ const Dashboard: React.FC = () => {
     fetchDashboardData();
   }, []);
 
+  const formatCurrency = (amount: number) => {
+    return new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD' }).format(amount);
+  };
+
   if (loading) {
     return (
       <div className="spinner-container">
@@ -145,6 +139,34 @@ const Dashboard: React.FC = () => {
         </Col>
       </Row>
 
+      {/* Totals */}
+      <Row className="mb-4">
+        <Col md={4} className="mb-3">
+          <Card>
+            <Card.Body>
+              <Card.Title>Open Pipeline</Card.Title>
+              <div className="stat-value">{formatCurrency(totals.pipelineValue)}</div>
+            </Card.Body>
+          </Card>
+        </Col>
+        <Col md={4} className="mb-3">
+          <Card>
+            <Card.Body>
+              <Card.Title>Outstanding Receivables</Card.Title>
+              <div className="stat-value">{formatCurrency(totals.receivables)}</div>
+            </Card.Body>
+          </Card>
+        </Col>
+        <Col md={4} className="mb-3">
+          <Card>
+            <Card.Body>
+              <Card.Title>Revenue (30 days)</Card.Title>
+              <div className="stat-value">{formatCurrency(totals.revenue)}</div>
+            </Card.Body>
+          </Card>
+        </Col>
+      </Row>
+
       {/* Recent Activity */}
       <Row className="mb-4">
         <Col md={12}>
@@ -170,9 +192,11 @@ const Dashboard: React.FC = () => {
                         <td>{activity.name}</td>
                         <td>{activity.date}</td>
                         <td>
-                          <Link to={activity.link}>
-                            <Button size="sm" variant="primary">View</Button>
-                          </Link>
+                          {activity.link && (
+                            <Link to={activity.link}>
+                              <Button size="sm" variant="primary">View</Button>
+                            </Link>
+                          )}
                         </td>
                       </tr>
                     ))}
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Container, Row, Col, Card, Form, Button, Alert, Spinner } from 'react-bootstrap';
 import { FaArrowLeft, FaSave, FaTimes } from 'react-icons/fa';
-import { invoiceService, contactService, orderService } from '../services/api';
+import { invoiceService, contactService, orderService, fetchAll } from '../services/api';
 import { Invoice, Contact } from '../types';
 
 interface Order {
@@ -47,13 +47,13 @@ const InvoiceForm: React.FC = () => {
         setLoading(true);
         
         // Fetch contacts and orders in parallel
-        const [contactsResponse, ordersResponse] = await Promise.all([
-          contactService.getContacts(),
-          orderService.getOrders()
+        const [allContacts, allOrders] = await Promise.all([
+          fetchAll(contactService.getContacts, 'contacts'),
+          fetchAll(orderService.getOrders, 'orders')
         ]);
         
-        setContacts(contactsResponse.data.contacts || []);
-        setOrders(ordersResponse.data.orders || []);
+        setContacts(allContacts);
+        setOrders(allOrders);
         
         // If editing, fetch the invoice details
         if (isEditing && id) {
@@ -1,13 +1,19 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { Container, Row, Col, Card, Table, Badge, Button, Form, InputGroup, Modal } from 'react-bootstrap';
 import { FaPlus, FaEye, FaEdit, FaTrash, FaSearch, FaTimes, FaFileInvoiceDollar } from 'react-icons/fa';
 import { Link, useNavigate } from 'react-router-dom';
 import { invoiceService } from '../services/api';
+import { usePagedList } from '../hooks/usePagedList';
+import LoadMore from '../components/LoadMore';
 import { Invoice } from '../types';
 
+// The table only needs a handful of columns plus the contact
+const INVOICE_PARAMS = { fields: 'id,invoice_number,amount,status,due_date,created_at', include: 'contact' };
+
 const Invoices: React.FC = () => {
-  const [invoices, setInvoices] = useState<Invoice[]>([]);
-  const [loading, setLoading] = useState<boolean>(true);
+  const {
+    rows: invoices, setRows: setInvoices, loading, loadingMore, hasMore, error: loadError, loadMore
+  } = usePagedList<Invoice>(invoiceService.getInvoices, 'invoices', INVOICE_PARAMS);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState<string>('');
   const [showDeleteModal, setShowDeleteModal] = useState<boolean>(false);
@@ -15,24 +21,6 @@ const Invoices: React.FC = () => {
   
   const navigate = useNavigate();
 
-  useEffect(() => {
-    fetchInvoices();
-  }, []);
-
-  const fetchInvoices = async () => {
-    try {
-      setLoading(true);
-      const response = await invoiceService.getInvoices();
-      setInvoices(response.data.invoices || []);
-      setError(null);
-    } catch (err) {
-      console.error('Error fetching invoices:', err);
-      setError('Failed to load invoices. Please try again later.');
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const handleDelete = async () => {
     if (!selectedInvoice) return;
     
@@ -125,8 +113,8 @@ const Invoices: React.FC = () => {
                 <span className="visually-hidden">Loading...</span>
               </div>
             </div>
-          ) : error ? (
-            <div className="text-center text-danger p-3">{error}</div>
+          ) : error || loadError ? (
+            <div className="text-center text-danger p-3">{error || 'Failed to load invoices. Please try again later.'}</div>
           ) : filteredInvoices.length > 0 ? (
             <div className="table-responsive">
               <Table hover>
@@ -179,6 +167,7 @@ const Invoices: React.FC = () => {
                   ))}
                 </tbody>
               </Table>
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
             </div>
           ) : (
             <div className="text-center p-5">
@@ -1,15 +1,21 @@
 import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Table, Badge, Button, Form, InputGroup, Modal, Dropdown } from 'react-bootstrap';
 import { FaPlus, FaEdit, FaTrash, FaTimes, FaFilter, FaUserTie } from 'react-icons/fa';
-import { leadService, contactService } from '../services/api';
+import { leadService, contactService, fetchAll } from '../services/api';
+import { usePagedList } from '../hooks/usePagedList';
+import LoadMore from '../components/LoadMore';
 
 const Leads: React.FC = () => {
-  const [leads, setLeads] = useState<any[]>([]);
   const [contacts, setContacts] = useState<any[]>([]);
-  const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState<string>('');
   const [statusFilter, setStatusFilter] = useState<string>('all');
+  // Status filtering happens server-side; statuses are stored capitalized
+  const {
+    rows: leads, setRows: setLeads, loading, loadingMore, hasMore, error: loadError, loadMore, reload: reloadLeads
+  } = usePagedList(leadService.getLeads, 'leads', statusFilter === 'all'
+    ? {}
+    : { status: statusFilter.charAt(0).toUpperCase() + statusFilter.slice(1) });
   const [showDeleteModal, setShowDeleteModal] = useState<boolean>(false);
   const [selectedLead, setSelectedLead] = useState<any | null>(null);
   const [showAddModal, setShowAddModal] = useState<boolean>(false);
@@ -24,28 +30,12 @@ const Leads: React.FC = () => {
   });
 
   useEffect(() => {
-    fetchLeads();
     fetchContacts();
   }, []);
 
-  const fetchLeads = async () => {
-    try {
-      setLoading(true);
-      const response = await leadService.getLeads();
-      setLeads(response.data.leads || []);
-      setError(null);
-    } catch (err) {
-      console.error('Error fetching leads:', err);
-      setError('Failed to load leads. Please try again later.');
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const fetchContacts = async () => {
     try {
-      const response = await contactService.getContacts();
-      setContacts(response.data.contacts || []);
+      setContacts(await fetchAll(contactService.getContacts, 'contacts'));
     } catch (err) {
       console.error('Error fetching contacts:', err);
     }
@@ -99,7 +89,8 @@ const Leads: React.FC = () => {
         await leadService.createLead(payload);
       }
       
-      fetchLeads();
+      setError(null);
+      reloadLeads();
       setShowAddModal(false);
       
       // Reset form
@@ -132,7 +123,8 @@ const Leads: React.FC = () => {
   const updateLeadStatus = async (lead: any, newStatus: string) => {
     try {
       await leadService.updateLead(lead.id, { ...lead, status: newStatus });
-      fetchLeads();
+      setError(null);
+      reloadLeads();
     } catch (err) {
       console.error('Error updating lead status:', err);
       setError('Failed to update lead status. Please try again.');
@@ -161,14 +153,11 @@ const Leads: React.FC = () => {
   };
 
   const filteredLeads = leads.filter(lead => {
-    const matchesSearch = 
+    return (
       lead.contact_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       lead.source?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      lead.notes?.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesStatus = statusFilter === 'all' || lead.status?.toLowerCase() === statusFilter.toLowerCase();
-    
-    return matchesSearch && matchesStatus;
+      lead.notes?.toLowerCase().includes(searchTerm.toLowerCase())
+    );
   });
 
   const formatCurrency = (amount: number) => {
@@ -245,7 +234,7 @@ const Leads: React.FC = () => {
               <span className="text-muted me-2">
                 {filteredLeads.length} lead{filteredLeads.length !== 1 ? 's' : ''} found
               </span>
-              <Button variant="outline-secondary" size="sm" onClick={() => fetchLeads()}>
+              <Button variant="outline-secondary" size="sm" onClick={() => reloadLeads()}>
                 <FaFilter className="me-1" /> Refresh
               </Button>
             </Col>
@@ -258,8 +247,8 @@ const Leads: React.FC = () => {
                 <span className="visually-hidden">Loading...</span>
               </div>
             </div>
-          ) : error ? (
-            <div className="text-center text-danger p-3">{error}</div>
+          ) : error || loadError ? (
+            <div className="text-center text-danger p-3">{error || 'Failed to load leads. Please try again later.'}</div>
           ) : filteredLeads.length > 0 ? (
             <div className="table-responsive">
               <Table hover>
@@ -320,6 +309,7 @@ const Leads: React.FC = () => {
                   ))}
                 </tbody>
               </Table>
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
             </div>
           ) : (
             <div className="text-center p-5">
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Container, Row, Col, Card, Table, Badge, Button, Alert, Spinner } from 'react-bootstrap';
 import { FaArrowLeft, FaFileInvoice, FaEdit, FaShoppingCart } from 'react-icons/fa';
-import { orderService, invoiceService } from '../services/api';
+import { orderService, invoiceService, fetchAll } from '../services/api';
 
 const OrderDetail: React.FC = () => {
   const { id } = useParams<{ id: string }>();
@@ -39,12 +39,9 @@ const OrderDetail: React.FC = () => {
   const fetchRelatedInvoices = async (orderId: number) => {
     try {
       setInvoiceLoading(true);
-      const response = await invoiceService.getInvoices();
-      // Filter invoices related to this order
-      const relatedInvoices = response.data.invoices.filter((invoice: any) => 
-        invoice.order_id === orderId
-      );
-      setRelatedInvoices(relatedInvoices || []);
+      // Only invoices related to this order are returned
+      const relatedInvoices = await fetchAll(invoiceService.getInvoices, 'invoices', { order_id: orderId });
+      setRelatedInvoices(relatedInvoices);
       setInvoiceError(null);
     } catch (err) {
       console.error('Error fetching related invoices:', err);
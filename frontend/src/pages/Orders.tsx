@@ -2,7 +2,9 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Table, Badge, Button, Form, InputGroup, Modal } from 'react-bootstrap';
 import { FaPlus, FaEye, FaEdit, FaTrash, FaTimes, FaShoppingCart, FaFileInvoice } from 'react-icons/fa';
 import { useNavigate } from 'react-router-dom';
-import { orderService, contactService, invoiceService } from '../services/api';
+import { orderService, contactService, invoiceService, fetchAll } from '../services/api';
+import { usePagedList } from '../hooks/usePagedList';
+import LoadMore from '../components/LoadMore';
 
 interface OrderItem {
   product_name: string;
@@ -11,9 +13,10 @@ interface OrderItem {
 }
 
 const Orders: React.FC = () => {
-  const [orders, setOrders] = useState<any[]>([]);
+  const {
+    rows: orders, setRows: setOrders, loading, loadingMore, hasMore, error: loadError, loadMore, reload: reloadOrders
+  } = usePagedList(orderService.getOrders, 'orders');
   const [contacts, setContacts] = useState<any[]>([]);
-  const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState<string>('');
   const [showDeleteModal, setShowDeleteModal] = useState<boolean>(false);
@@ -44,28 +47,12 @@ const Orders: React.FC = () => {
   });
 
   useEffect(() => {
-    fetchOrders();
     fetchContacts();
   }, []);
 
-  const fetchOrders = async () => {
-    try {
-      setLoading(true);
-      const response = await orderService.getOrders();
-      setOrders(response.data.orders || []);
-      setError(null);
-    } catch (err) {
-      console.error('Error fetching orders:', err);
-      setError('Failed to load orders. Please try again later.');
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const fetchContacts = async () => {
     try {
-      const response = await contactService.getContacts();
-      setContacts(response.data.contacts || []);
+      setContacts(await fetchAll(contactService.getContacts, 'contacts'));
     } catch (err) {
       console.error('Error fetching contacts:', err);
     }
@@ -176,7 +163,8 @@ const Orders: React.FC = () => {
         await orderService.createOrder(payload);
       }
       
-      fetchOrders();
+      setError(null);
+      reloadOrders();
       setShowAddModal(false);
       
       // Reset form
@@ -210,7 +198,8 @@ const Orders: React.FC = () => {
       
       // Success - close modal and refresh
       setShowInvoiceModal(false);
-      fetchOrders();
+      setError(null);
+      reloadOrders();
       
       // Reset form
       setInvoiceData({
@@ -343,8 +332,8 @@ const Orders: React.FC = () => {
                 <span className="visually-hidden">Loading...</span>
               </div>
             </div>
-          ) : error ? (
-            <div className="text-center text-danger p-3">{error}</div>
+          ) : error || loadError ? (
+            <div className="text-center text-danger p-3">{error || 'Failed to load orders. Please try again later.'}</div>
           ) : filteredOrders.length > 0 ? (
             <div className="table-responsive">
               <Table hover>
@@ -406,6 +395,7 @@ const Orders: React.FC = () => {
                   ))}
                 </tbody>
               </Table>
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
             </div>
           ) : (
             <div className="text-center p-5">
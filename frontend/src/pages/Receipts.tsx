@@ -2,12 +2,15 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Table, Badge, Button, Form, InputGroup, Modal } from 'react-bootstrap';
 import { FaPlus, FaEye, FaEdit, FaTrash, FaTimes, FaReceipt, FaFileInvoiceDollar } from 'react-icons/fa';
 import { useNavigate } from 'react-router-dom';
-import { receiptService, invoiceService } from '../services/api';
+import { receiptService, invoiceService, fetchAll } from '../services/api';
+import { usePagedList } from '../hooks/usePagedList';
+import LoadMore from '../components/LoadMore';
 
 const Receipts: React.FC = () => {
-  const [receipts, setReceipts] = useState<any[]>([]);
+  const {
+    rows: receipts, setRows: setReceipts, loading, loadingMore, hasMore, error: loadError, loadMore, reload: reloadReceipts
+  } = usePagedList(receiptService.getReceipts, 'receipts');
   const [invoices, setInvoices] = useState<any[]>([]);
-  const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState<string>('');
   const [showDeleteModal, setShowDeleteModal] = useState<boolean>(false);
@@ -25,31 +28,13 @@ const Receipts: React.FC = () => {
   });
 
   useEffect(() => {
-    fetchReceipts();
     fetchInvoices();
   }, []);
 
-  const fetchReceipts = async () => {
-    try {
-      setLoading(true);
-      const response = await receiptService.getReceipts();
-      setReceipts(response.data.receipts || []);
-      setError(null);
-    } catch (err) {
-      console.error('Error fetching receipts:', err);
-      setError('Failed to load receipts. Please try again later.');
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const fetchInvoices = async () => {
     try {
-      const response = await invoiceService.getInvoices();
-      // Filter to show only unpaid or partially paid invoices
-      const unpaidInvoices = (response.data.invoices || []).filter(
-        (invoice: any) => invoice.status === 'Unpaid' || invoice.status === 'Partial'
-      );
+      // Only unpaid or partially paid invoices can take a payment
+      const unpaidInvoices = await fetchAll(invoiceService.getInvoices, 'invoices', { status: 'Unpaid,Partial' });
       setInvoices(unpaidInvoices);
     } catch (err) {
       console.error('Error fetching invoices:', err);
@@ -101,7 +86,8 @@ const Receipts: React.FC = () => {
       };
       
       await receiptService.createReceipt(payload);
-      fetchReceipts();
+      setError(null);
+      reloadReceipts();
       fetchInvoices();
       setShowAddModal(false);
       
@@ -180,8 +166,8 @@ const Receipts: React.FC = () => {
                 <span className="visually-hidden">Loading...</span>
               </div>
             </div>
-          ) : error ? (
-            <div className="text-center text-danger p-3">{error}</div>
+          ) : error || loadError ? (
+            <div className="text-center text-danger p-3">{error || 'Failed to load receipts. Please try again later.'}</div>
           ) : filteredReceipts.length > 0 ? (
             <div className="table-responsive">
               <Table hover>
@@ -229,6 +215,7 @@ const Receipts: React.FC = () => {
                   ))}
                 </tbody>
               </Table>
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={loadMore} />
             </div>
           ) : (
             <div className="text-center p-5">
@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosResponse } from 'axios';
 
 // Create an instance of axios with default config
 const api = axios.create({
@@ -33,6 +33,50 @@ api.interceptors.response.use(
   }
 );
 
+// Query parameters accepted by the paginated list endpoints
+export interface ListParams {
+  limit?: number;
+  cursor?: string | null;
+  [key: string]: any;
+}
+
+export type PageFetcher = (params?: ListParams) => Promise<AxiosResponse>;
+
+export interface Pager<T> {
+  hasMore: () => boolean;
+  next: () => Promise<T[] | null>;
+}
+
+// Lazily page through a list endpoint: each next() fetches one more page
+// and resolves to null once the server stops returning a next_cursor
+export const createPager = <T = any>(fetchPage: PageFetcher, key: string, params: ListParams = {}): Pager<T> => {
+  let cursor: string | null | undefined = params.cursor;
+  let done = false;
+
+  return {
+    hasMore: () => !done,
+    next: async (): Promise<T[] | null> => {
+      if (done) return null;
+      const response = await fetchPage({ ...params, cursor });
+      cursor = response.data.next_cursor;
+      done = !cursor;
+      return response.data[key] || [];
+    }
+  };
+};
+
+// Walk every page of a list endpoint and collect the rows. Only for pickers
+// that must offer every option; lists shown as tables use usePagedList
+export const fetchAll = async <T = any>(fetchPage: PageFetcher, key: string, params: ListParams = {}): Promise<T[]> => {
+  const pager = createPager<T>(fetchPage, key, params);
+  const rows: T[] = [];
+  while (pager.hasMore()) {
+    const page = await pager.next();
+    if (page) rows.push(...page);
+  }
+  return rows;
+};
+
 // Auth services
 export const authService = {
   login: (email: string, password: string) => 
@@ -50,8 +94,8 @@ export const authService = {
 
 // Contact services
 export const contactService = {
-  getContacts: () => 
-    api.get('/contacts'),
+  getContacts: (params?: ListParams) => 
+    api.get('/contacts', { params }),
   
   getContact: (id: number) => 
     api.get(`/contacts/${id}`),
@@ -68,8 +112,8 @@ export const contactService = {
 
 // Lead services
 export const leadService = {
-  getLeads: () => 
-    api.get('/leads'),
+  getLeads: (params?: ListParams) => 
+    api.get('/leads', { params }),
   
   getLead: (id: number) => 
     api.get(`/leads/${id}`),
@@ -86,8 +130,8 @@ export const leadService = {
 
 // Order services
 export const orderService = {
-  getOrders: () => 
-    api.get('/orders'),
+  getOrders: (params?: ListParams) => 
+    api.get('/orders', { params }),
   
   getOrder: (id: number) => 
     api.get(`/orders/${id}`),
@@ -104,8 +148,8 @@ export const orderService = {
 
 // Invoice services
 export const invoiceService = {
-  getInvoices: () => 
-    api.get('/invoices'),
+  getInvoices: (params?: ListParams) => 
+    api.get('/invoices', { params }),
   
   getInvoice: (id: number) => 
     api.get(`/invoices/${id}`),
@@ -122,8 +166,8 @@ export const invoiceService = {
 
 // Receipt services
 export const receiptService = {
-  getReceipts: () => 
-    api.get('/receipts'),
+  getReceipts: (params?: ListParams) => 
+    api.get('/receipts', { params }),
   
   getReceipt: (id: number) => 
     api.get(`/receipts/${id}`),
@@ -140,8 +184,8 @@ export const receiptService = {
 
 // Accounting services
 export const accountingService = {
-  getEntries: () => 
-    api.get('/accounting/entries'),
+  getEntries: (params?: ListParams) => 
+    api.get('/accounting/entries', { params }),
   
   getEntry: (id: number) => 
     api.get(`/accounting/entries/${id}`),
@@ -156,7 +200,35 @@ export const accountingService = {
     api.delete(`/accounting/entries/${id}`),
     
   getSummary: (period: string) =>
-    api.get(`/accounting/summary?period=${period}`)
+    api.get(`/accounting/summary?period=${period}`),
+  
+  // rows/columns: entry_type, category, year, quarter, month, week, day, month_of_year, weekday
+  getPivot: (params: { rows: string; columns?: string; measure?: string; entry_type?: string; category?: string; date_from?: string; date_to?: string }) =>
+    api.get('/accounting/pivot', { params })
+};
+
+// Dashboard services
+export const dashboardService = {
+  getDashboard: (params?: { period?: string; latest?: number }) => 
+    api.get('/dashboard', { params })
+};
+
+export const activityService = {
+  getActivity: (params?: ListParams & { collection?: string; action?: string }) => 
+    api.get('/activity', { params })
+};
+
+// Change feed: call without `since` for the current cursor, then poll with it
+export const changeService = {
+  getChanges: (since?: string, limit?: number) => 
+    api.get('/changes', { params: { since, limit } }),
+  
+  // Live notifications; EventSource reconnects by itself and resumes from the last cursor
+  subscribe: (onChange: (change: { cursor: string; collections: string[] }) => void) => {
+    const source = new EventSource(`${api.defaults.baseURL}/stream`, { withCredentials: true });
+    source.addEventListener('change', (event) => onChange(JSON.parse((event as MessageEvent).data)));
+    return () => source.close();
+  }
 };
 
 export default api; 
\ No newline at end of file
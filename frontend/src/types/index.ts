@@ -65,6 +65,7 @@ export interface Invoice {
   id: number;
   invoice_number: string;
   amount: number;
+  amount_paid: number;
   status: string;
   due_date: string;
   notes: string;
@@ -0,0 +1,15 @@
+# Picked up automatically when gunicorn is started from the repository root:
+#   FLASK_CONFIG=production gunicorn "backend.app:create_app('production')"
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5002')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+
+# /api/stream keeps its response open. Threaded workers park each idle stream on a
+# sleeping thread (holding no DB connection) instead of tying up a whole sync worker.
+# Streams and regular requests share the one pool of `threads`: with N streams open,
+# threads - N are left for everything else. STREAM_MAX_PER_PROCESS (50) caps the
+# streams, so raise both together and keep the cap well below `threads`.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 100))
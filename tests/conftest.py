@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from backend.app import create_app
+from backend.database.models import db, User, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry
+
+@pytest.fixture
+def app():
+    """The app on the testing config: an in-memory SQLite database of its own"""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def user(app):
+    user = User(email='owner@example.com', name='Owner', password=app.extensions['passwords'].hash('secret'))
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def client(app, user):
+    """A test client signed in as `user`"""
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': 'owner@example.com', 'password': 'secret'})
+    assert response.status_code == 200
+    return client
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting the SQL statements run inside it"""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return counter
+
+def seed(user, count):
+    """`count` rows of every kind for `user`, each with its related rows"""
+    now = datetime.utcnow()
+    for n in range(count):
+        contact = Contact(name=f'Contact {n}', email=f'contact{n}@example.com', user_id=user.id)
+        lead = Lead(title=f'Lead {n}', value=100 + n, contact=contact, user_id=user.id)
+        order = Order(total_amount=30, contact=contact, user_id=user.id,
+                      items=[OrderItem(product_name='Widget', quantity=1, price=10),
+                             OrderItem(product_name='Gadget', quantity=2, price=10)])
+        invoice = Invoice(amount=30, due_date=now + timedelta(days=n), contact=contact, order=order, user_id=user.id)
+        receipt = Receipt(amount=10, payment_method='Cash', invoice=invoice, user_id=user.id)
+        entry = AccountingEntry(entry_type='Income', category='Sales', amount=10 + n, date=now - timedelta(days=n),
+                                user_id=user.id)
+        db.session.add_all([contact, lead, order, invoice, receipt, entry])
+    db.session.commit()
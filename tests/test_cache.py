@@ -0,0 +1,157 @@
+import subprocess
+import sys
+import time
+import types
+import pytest
+from backend.app import create_app
+from backend.config import TestingConfig, config as configs
+from backend.database.rollups import accounting_committed
+from backend.database.versions import changes_committed
+from backend.utils import cache as cache_module
+from backend.utils.cache import MemoryCache, SQLiteCache, RedisCache
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+class FakeRedis:
+    """
+    The part of redis-py's client RedisCache uses, over one dict per URL, with
+    Redis's behaviour: values come back as bytes, `px` expires them, and
+    counters are stored as decimal strings.
+    """
+
+    servers = {}
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def from_url(cls, url):
+        return cls(cls.servers.setdefault(url, {}))
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            entry = None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry is not None else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, px=None):
+        self.data[key] = (value, time.monotonic() + px / 1000 if px is not None else None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incrby(self, key, amount):
+        value = int(self.get(key) or 0) + amount
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point RedisCache at an in-process stand-in: fakeredis if it's installed, else FakeRedis"""
+    if fakeredis is not None:
+        servers = {}
+        client = types.SimpleNamespace(from_url=lambda url: fakeredis.FakeRedis(server=servers.setdefault(url, fakeredis.FakeServer())))
+    else:
+        monkeypatch.setattr(FakeRedis, 'servers', {})
+        client = FakeRedis
+    monkeypatch.setattr(cache_module, 'redis', types.SimpleNamespace(Redis=client))
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCache(100)
+    if request.param == 'sqlite':
+        return SQLiteCache(str(tmp_path / 'cache.db'))
+    request.getfixturevalue('fake_redis')
+    return RedisCache('redis://localhost:6379/0', 'test:')
+
+def test_values_expire_and_counters_do_not(backend):
+    assert backend.get('missing') is None
+    backend.set('short', {'total': 1.5}, 0.05)
+    backend.set('long', [1, 2], 60)
+    assert backend.get_many(['short', 'missing', 'long']) == [{'total': 1.5}, None, [1, 2]]
+    assert backend.get_many([]) == []
+
+    assert backend.counter('seq') == 0
+    assert [backend.incr('seq'), backend.incr('seq', 5)] == [1, 6]
+    time.sleep(0.1)
+    assert backend.get('short') is None
+    assert backend.counter('seq') == 6
+
+    backend.delete('long', 'missing')
+    assert backend.get('long') is None
+
+def test_redis_keys_are_prefixed(fake_redis):
+    first = RedisCache('redis://localhost:6379/0', 'first:')
+    second = RedisCache('redis://localhost:6379/0', 'second:')
+    first.set('key', 'one', 60)
+    second.set('key', 'two', 60)
+    assert (first.get('key'), second.get('key')) == ('one', 'two')
+    # Another worker on the same server sees the first's writes
+    assert RedisCache('redis://localhost:6379/0', 'first:').get('key') == 'one'
+
+def test_sqlite_cache_is_shared_through_its_file(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    first, second = SQLiteCache(path), SQLiteCache(path)
+    first.set('report', 42, 60)
+    assert second.get('report') == 42
+    second.delete('report')
+    assert first.get('report') is None
+    first.incr('seq')
+    assert second.incr('seq') == 2
+
+    # And with another process
+    first.set('report', 42, 60)
+    subprocess.run([sys.executable, '-c', f'from backend.utils.cache import SQLiteCache; SQLiteCache({path!r}).delete("report")'],
+                   check=True)
+    assert first.get('report') is None
+
+def test_writes_through_one_worker_invalidate_reports_cached_by_another(tmp_path, monkeypatch):
+    """Two apps on one database and one SQLite cache file, like two gunicorn workers"""
+    settings = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+                'CACHE_BACKEND': 'sqlite', 'CACHE_PATH': str(tmp_path / 'cache.db')}
+    monkeypatch.setitem(configs, 'shared', type('SharedConfig', (TestingConfig,), settings))
+    first, second = create_app('shared'), create_app('shared')
+    assert first.extensions['cache'] is not second.extensions['cache']
+    # In one process both report caches hear every commit; a worker only hears its own
+    reports = second.extensions['report_cache']
+    accounting_committed.disconnect(reports.on_accounting_committed)
+    changes_committed.disconnect(reports.on_changes_committed)
+
+    client = first.test_client()
+    assert client.post('/api/register', json={'name': 'Owner', 'email': 'owner@example.com', 'password': 'secret'}).status_code == 201
+    assert client.post('/api/login', json={'email': 'owner@example.com', 'password': 'secret'}).status_code == 200
+    other = second.test_client()
+    assert other.post('/api/login', json={'email': 'owner@example.com', 'password': 'secret'}).status_code == 200
+
+    def income(client):
+        return client.get('/api/accounting/summary').get_json()['summary']['total_income']
+
+    assert income(other) == 0
+    assert income(other) == 0
+    client.post('/api/accounting/entries', json={'entry_type': 'Income', 'category': 'Sales', 'amount': 25})
+    assert income(other) == 25
+
+    metrics = other.get('/api/metrics/cache').get_json()
+    assert metrics['backend'] == 'sqlite'
+    assert metrics['caches']['reports.summary'] == {'hits': 1, 'misses': 2, 'hit_ratio': pytest.approx(1 / 3)}
+
+def test_cache_metrics_are_per_cache(client):
+    client.get('/api/accounting/summary')
+    client.get('/api/accounting/summary')
+    client.get('/api/accounting/summary?period=week')
+    metrics = client.get('/api/metrics/cache').get_json()
+    assert metrics['backend'] == 'memory'
+    assert metrics['caches']['reports.summary'] == {'hits': 1, 'misses': 2, 'hit_ratio': pytest.approx(1 / 3)}
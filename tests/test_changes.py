@@ -0,0 +1,69 @@
+from backend.database.models import db, User, Contact
+
+def cursor(client):
+    return client.get('/api/changes').get_json()['cursor']
+
+def changes(client, since, limit=None):
+    path = f'/api/changes?since={since}' + (f'&limit={limit}' if limit else '')
+    response = client.get(path)
+    assert response.status_code == 200
+    return response.get_json()
+
+def create_contact(client, name):
+    response = client.post('/api/contacts', json={'name': name})
+    assert response.status_code == 201
+    return response.get_json()['contact']['id']
+
+def test_feed_follows_the_cursor_in_write_order(client):
+    start = cursor(client)
+    first = create_contact(client, 'First')
+    second = create_contact(client, 'Second')
+    assert client.put(f'/api/contacts/{first}', json={'name': 'First, renamed'}).status_code == 200
+
+    # Each resource appears once, at its latest write: the edit moved `first` after `second`
+    page = changes(client, start, limit=1)
+    assert [contact['id'] for contact in page['changes']['contacts']] == [second]
+    assert page['has_more'] is True
+    page = changes(client, page['cursor'], limit=1)
+    assert [contact['name'] for contact in page['changes']['contacts']] == ['First, renamed']
+    assert page['has_more'] is False
+    assert page['cursor'] == cursor(client)
+
+    # Nothing new: same cursor back, no changes
+    page = changes(client, page['cursor'])
+    assert page['cursor'] == cursor(client)
+    assert all(rows == [] for rows in page['changes'].values())
+
+def test_deleted_records_come_back_as_tombstones(client):
+    kept = create_contact(client, 'Kept')
+    removed = create_contact(client, 'Removed')
+    start = cursor(client)
+    assert client.delete(f'/api/contacts/{removed}').status_code == 200
+    page = changes(client, start)
+    assert page['deleted']['contacts'] == [removed]
+    assert page['changes']['contacts'] == []
+
+    # Read from before it was created, only the tombstone is left
+    page = changes(client, 0)
+    assert [contact['id'] for contact in page['changes']['contacts']] == [kept]
+    assert page['deleted']['contacts'] == [removed]
+
+def test_other_users_changes_are_not_visible(client):
+    start = cursor(client)
+    other = User(email='other@example.com', name='Other', password='x')
+    db.session.add(other)
+    db.session.commit()
+    contact = Contact(name='Theirs', user_id=other.id)
+    db.session.add(contact)
+    db.session.commit()
+    db.session.delete(contact)
+    db.session.commit()
+
+    assert cursor(client) == start
+    page = changes(client, 0)
+    assert all(rows == [] for rows in page['changes'].values())
+    assert all(ids == [] for ids in page['deleted'].values())
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/changes?since=abc')
+    assert response.status_code == 400
@@ -0,0 +1,67 @@
+from backend.database.models import Contact, Lead, AccountingEntry
+from .conftest import seed
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={'If-None-Match': etag})
+
+def test_matching_etag_gets_304_without_running_the_view(client, user, count_queries):
+    seed(user, 3)
+    response = client.get('/api/leads')
+    assert response.status_code == 200
+    etag = response.headers['ETag'].strip('"')
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    with count_queries() as statements:
+        response = revalidate(client, '/api/leads', etag)
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'].strip('"') == etag
+    assert not any('FROM leads' in statement for statement in statements)
+
+    # The ETag covers the query string
+    assert revalidate(client, '/api/leads?limit=1', etag).status_code == 200
+
+def test_write_to_an_embedded_collection_changes_the_list_etag(client, user):
+    seed(user, 2)
+    etag = client.get('/api/leads').headers['ETag'].strip('"')
+    # Writes to collections a list doesn't embed keep its ETag
+    assert client.post('/api/accounting/entries', json={
+        'entry_type': 'Income', 'category': 'Sales', 'amount': 5
+    }).status_code == 201
+    assert revalidate(client, '/api/leads', etag).status_code == 304
+
+    contact = Contact.query.filter_by(name='Contact 0').one()
+    assert client.put(f'/api/contacts/{contact.id}', json={'name': 'Renamed'}).status_code == 200
+    response = revalidate(client, '/api/leads', etag)
+    assert response.status_code == 200
+    assert response.headers['ETag'].strip('"') != etag
+    assert 'Renamed' in response.get_data(as_text=True)
+
+def test_resource_etag_follows_the_row_and_what_it_embeds(client, user):
+    seed(user, 1)
+    lead = Lead.query.one()
+    path = f'/api/leads/{lead.id}'
+    etag = client.get(path).headers['ETag'].strip('"')
+    assert revalidate(client, path, etag).status_code == 304
+
+    assert client.put(f'/api/contacts/{lead.contact_id}', json={'name': 'Renamed'}).status_code == 200
+    response = revalidate(client, path, etag)
+    assert response.status_code == 200
+    etag = response.headers['ETag'].strip('"')
+
+    assert client.put(path, json={'status': 'Qualified'}).status_code == 200
+    response = revalidate(client, path, etag)
+    assert response.status_code == 200
+    assert response.get_json()['lead']['status'] == 'Qualified'
+
+def test_resource_without_updated_at_uses_its_collection_version(client, user):
+    seed(user, 2)
+    entry, other = AccountingEntry.query.order_by(AccountingEntry.id).all()
+    path = f'/api/accounting/entries/{entry.id}'
+    etag = client.get(path).headers['ETag'].strip('"')
+    assert revalidate(client, path, etag).status_code == 304
+    assert client.put(f'/api/accounting/entries/{other.id}', json={'amount': 99}).status_code == 200
+    assert revalidate(client, path, etag).status_code == 200
+
+def test_missing_resource_is_a_404_whatever_the_etag(client):
+    assert revalidate(client, '/api/leads/999', '*').status_code == 404
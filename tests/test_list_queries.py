@@ -0,0 +1,44 @@
+import pytest
+from .conftest import seed
+
+# Every list path, API and Jinja alike, with the relationships it shows by default
+LIST_ENDPOINTS = [
+    '/api/contacts',
+    '/api/leads',
+    '/api/orders',
+    '/api/invoices',
+    '/api/receipts',
+    '/api/accounting/entries',
+    '/api/contacts/export',
+    '/api/leads/export',
+    '/api/orders/export',
+    '/api/invoices/export',
+    '/api/receipts/export',
+    '/api/accounting/entries/export',
+    '/api/activity',
+    '/api/changes',
+    '/contacts',
+    '/leads',
+    '/orders',
+    '/invoices',
+    '/receipts',
+    '/accounting',
+    '/',
+]
+
+def queries_for(client, count_queries, path):
+    # The first request warms the per-process caches (signed-in user, reports)
+    assert client.get(path).status_code == 200
+    with count_queries() as statements:
+        response = client.get(path)
+        assert response.status_code == 200
+        response.get_data()
+    return len(statements)
+
+@pytest.mark.parametrize('path', LIST_ENDPOINTS)
+def test_query_count_does_not_grow_with_rows(client, user, count_queries, path):
+    seed(user, 5)
+    few = queries_for(client, count_queries, path)
+    seed(user, 35)
+    many = queries_for(client, count_queries, path)
+    assert few == many, f'{path}: {few} queries for 5 rows of each kind, {many} for 40'
@@ -0,0 +1,60 @@
+import pytest
+from backend.app import create_app
+from backend.config import TestingConfig, config as configs
+from backend.utils import passwords
+from backend.utils.passwords import LoginThrottle
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.monotonic() for the throttle"""
+    now = [1000.0]
+    monkeypatch.setattr(passwords.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_account_is_slowed_down_not_locked(clock):
+    throttle = LoginThrottle(account_limit=3, address_limit=100, window=300, delay=1)
+    for _ in range(3):
+        assert throttle.retry_after('owner@example.com', '10.0.0.1') == 0
+        throttle.failed('owner@example.com', '10.0.0.1')
+
+    # Each further failure doubles the wait after it: 1, 2, 4, 8 seconds
+    for delay in (1, 2, 4, 8):
+        assert 0 < throttle.retry_after('Owner@example.com', '10.0.0.2') <= delay + 1
+        clock[0] += delay
+        assert throttle.retry_after('owner@example.com', '10.0.0.2') == 0
+        throttle.failed('owner@example.com', '10.0.0.2')
+
+    throttle.succeeded('owner@example.com')
+    assert throttle.retry_after('owner@example.com', '10.0.0.2') == 0
+
+def test_account_delay_stops_at_the_window(clock):
+    throttle = LoginThrottle(account_limit=1, address_limit=100, window=300, delay=1)
+    for _ in range(40):
+        throttle.failed('owner@example.com', '10.0.0.1')
+    assert throttle.retry_after('owner@example.com', '10.0.0.1') == 301
+    clock[0] += 300
+    assert throttle.retry_after('owner@example.com', '10.0.0.1') == 0
+
+def test_address_is_refused_for_the_window(clock):
+    throttle = LoginThrottle(account_limit=100, address_limit=3, window=300, delay=1)
+    for n in range(3):
+        throttle.failed(f'user{n}@example.com', '10.0.0.1')
+    assert throttle.retry_after('other@example.com', '10.0.0.1') == 301
+    assert throttle.retry_after('other@example.com', '10.0.0.2') == 0
+    clock[0] += 300
+    assert throttle.retry_after('other@example.com', '10.0.0.1') == 0
+
+@pytest.mark.parametrize('hops, throttled', [(0, True), (1, False)])
+def test_address_comes_from_the_trusted_proxy(monkeypatch, hops, throttled):
+    """Behind a proxy the address limit applies to the forwarded client, not the proxy"""
+    config = type('ProxyConfig', (TestingConfig,), {'PROXY_FIX_HOPS': hops, 'LOGIN_MAX_FAILURES_PER_ADDRESS': 2})
+    monkeypatch.setitem(configs, 'proxy', config)
+    client = create_app('proxy').test_client()
+
+    def login(client_address):
+        return client.post('/api/login', json={'email': 'nobody@example.com', 'password': 'wrong'},
+                           headers={'X-Forwarded-For': client_address})
+
+    assert login('203.0.113.1').status_code == 401
+    assert login('203.0.113.1').status_code == 401
+    assert login('203.0.113.2').status_code == (429 if throttled else 401)
@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from backend.app import create_app
+from backend.config import TestingConfig, config as configs
+from backend.database.models import db, User, Contact, Invoice, Receipt
+from backend.database.payments import payment_status
+
+THREADS = 8
+PAYMENTS = 250
+HOT_INVOICES = 4
+# Tries at a payment before the test gives up on it
+ATTEMPTS = 20
+
+def test_concurrent_payments_settle_exactly(tmp_path, monkeypatch):
+    """
+    Threads post thousands of receipts of 1 to a few invoices sized to be paid
+    off exactly, while also editing, moving and deleting receipts on others
+    (some of them the same receipt at once).
+    Every invoice must end with amount_paid equal to its receipts, and the hot
+    ones exactly paid, however the requests interleave.
+    """
+    # Threads need a database file they can all open; memory databases are per connection
+    config = type('StressConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'stress.db'}"})
+    monkeypatch.setitem(configs, 'stress', config)
+    app = create_app('stress')
+    with app.app_context():
+        password = app.extensions['passwords'].hash('secret')
+        # The edits belong to another user: SQLite reuses the ids of deleted receipts,
+        # so a stale id picked for an edit must not be able to reach a hot payment
+        payer = User(email='payer@example.com', name='Payer', password=password)
+        editor = User(email='editor@example.com', name='Editor', password=password)
+        hot = [Invoice(amount=THREADS * PAYMENTS / HOT_INVOICES, due_date=datetime.utcnow(),
+                       contact=Contact(name='Customer', owner=payer), owner=payer) for _ in range(HOT_INVOICES)]
+        edited = [Invoice(amount=500, due_date=datetime.utcnow(),
+                          contact=Contact(name='Customer', owner=editor), owner=editor) for _ in range(4)]
+        db.session.add_all(hot + edited)
+        db.session.commit()
+        hot_ids = [invoice.id for invoice in hot]
+        edited_ids = [invoice.id for invoice in edited]
+        db.session.remove()
+
+    lock = threading.Lock()
+    receipt_ids = []
+
+    unexpected = []
+
+    def send(client, method, path, body, allowed=()):
+        """
+        The response, or None when SQLite's busy timeout ran out under this much
+        write contention (the request rolled back). Anything else that fails is
+        recorded in `unexpected`, and the test fails on it.
+        """
+        try:
+            response = getattr(client, method)(path, json=body)
+        except OperationalError as e:
+            if 'database is locked' not in str(e):
+                with lock:
+                    unexpected.append(f'{method.upper()} {path}: {e}')
+            return None
+        except Exception as e:
+            with lock:
+                unexpected.append(f'{method.upper()} {path}: {e!r}')
+            return None
+        if response.status_code >= 300:
+            if response.status_code not in allowed:
+                with lock:
+                    unexpected.append(f'{method.upper()} {path}: {response.status_code} {response.get_data(as_text=True)}')
+            return None
+        return response
+
+    def pay(n):
+        client, editor = app.test_client(), app.test_client()
+        assert client.post('/api/login', json={'email': 'payer@example.com', 'password': 'secret'}).status_code == 200
+        assert editor.post('/api/login', json={'email': 'editor@example.com', 'password': 'secret'}).status_code == 200
+        rng = random.Random(n)
+        for k in range(PAYMENTS):
+            invoice_id = hot_ids[(n + k) % HOT_INVOICES]
+            # Retried until it lands, so the hot invoices must end exactly paid
+            for _ in range(ATTEMPTS):
+                if send(client, 'post', '/api/receipts', {'invoice_id': invoice_id, 'amount': 1, 'payment_method': 'Cash'}):
+                    break
+                time.sleep(0.05)
+            else:
+                with lock:
+                    unexpected.append(f'payment {n}/{k} still locked out after {ATTEMPTS} attempts')
+                return
+            if k % 5:
+                continue
+            response = send(editor, 'post', '/api/receipts', {'invoice_id': rng.choice(edited_ids), 'amount': rng.randint(1, 9),
+                                                               'payment_method': 'Cash'})
+            if response is None:
+                continue
+            with lock:
+                receipt_ids.append(response.get_json()['receipt']['id'])
+                target = rng.choice(receipt_ids)
+            if rng.random() < 0.6:
+                send(editor, 'put', f'/api/receipts/{target}', {'amount': rng.randint(1, 9), 'invoice_id': rng.choice(edited_ids)},
+                     allowed=(404,))
+            else:
+                # Another thread may have deleted it already
+                send(editor, 'delete', f'/api/receipts/{target}', None, allowed=(404,))
+
+    threads = [threading.Thread(target=pay, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert unexpected == []
+    with app.app_context():
+        for invoice in Invoice.query.order_by(Invoice.id):
+            paid = sum(receipt.amount for receipt in Receipt.query.filter_by(invoice_id=invoice.id))
+            assert invoice.amount_paid == paid, f'invoice {invoice.id}: amount_paid {invoice.amount_paid}, receipts {paid}'
+            assert invoice.status == payment_status(paid, invoice.amount)
+            if invoice.id in hot_ids:
+                assert paid == invoice.amount and invoice.status == 'Paid'
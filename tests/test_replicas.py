@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+import time
+import pytest
+from sqlalchemy import event
+from backend.app import create_app
+from backend.config import TestingConfig, config as configs
+from backend.database.models import db, User
+
+STICKY_SECONDS = 0.5
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """An app on a SQLite primary with two SQLite replica files, and a signed-in client"""
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'REPLICA_DATABASE_URLS': [f"sqlite:///{tmp_path / 'replica1.db'}", f"sqlite:///{tmp_path / 'replica2.db'}"],
+        'REPLICA_STICKY_SECONDS': STICKY_SECONDS,
+    }
+    monkeypatch.setitem(configs, 'replicated', type('ReplicatedConfig', (TestingConfig,), settings))
+    app = create_app('replicated')
+    with app.app_context():
+        db.session.add(User(email='owner@example.com', name='Owner', password=app.extensions['passwords'].hash('secret')))
+        db.session.commit()
+        engines = {str(engine.url).rsplit('/', 1)[1]: engine for engine in db.engines.values()}
+    result = app.test_cli_runner().invoke(args=['sync-replicas'])
+    assert result.exit_code == 0, result.output
+    assert result.output.count('Copied the primary') == 2
+
+    client = app.test_client()
+    assert client.post('/api/login', json={'email': 'owner@example.com', 'password': 'secret'}).status_code == 200
+    return app, client, engines
+
+@pytest.fixture
+def databases_used(replicated):
+    """Context manager collecting the names of the database files statements ran on"""
+    _, _, engines = replicated
+
+    @contextmanager
+    def recorder():
+        used = set()
+        listeners = [(engine, lambda *args, name=name: used.add(name)) for name, engine in engines.items()]
+        for engine, listener in listeners:
+            event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            yield used
+        finally:
+            for engine, listener in listeners:
+                event.remove(engine, 'before_cursor_execute', listener)
+    return recorder
+
+def names(client):
+    response = client.get('/api/contacts')
+    assert response.status_code == 200
+    return [contact['name'] for contact in response.get_json()['contacts']]
+
+def test_reads_go_to_replicas_and_writes_to_the_primary(replicated, databases_used):
+    app, client, _ = replicated
+    time.sleep(STICKY_SECONDS)
+
+    used = set()
+    for _ in range(20):
+        with databases_used() as request_used:
+            names(client)
+        # One replica per request, never the primary
+        assert len(request_used) == 1 and 'primary.db' not in request_used
+        used |= request_used
+    assert used == {'replica1.db', 'replica2.db'}
+
+    with databases_used() as request_used:
+        assert client.post('/api/contacts', json={'name': 'Ada'}).status_code == 201
+    assert request_used == {'primary.db'}
+
+def test_a_users_reads_stick_to_the_primary_after_a_write(replicated, databases_used):
+    app, client, _ = replicated
+    assert client.post('/api/contacts', json={'name': 'Ada'}).status_code == 201
+
+    # Straight after the write the user reads it back from the primary
+    with databases_used() as request_used:
+        assert names(client) == ['Ada']
+    assert request_used == {'primary.db'}
+
+    # Once the mark expires, reads go back to the replicas, which haven't caught up yet
+    time.sleep(STICKY_SECONDS)
+    with databases_used() as request_used:
+        assert names(client) == []
+    assert 'primary.db' not in request_used
+
+    assert app.test_cli_runner().invoke(args=['sync-replicas']).exit_code == 0
+    assert names(client) == ['Ada']
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+import pytest
+
+@pytest.fixture
+def summary(app, client):
+    """Read the week's summary; returns (total income, whether it came from the cache)"""
+    def read():
+        before = app.extensions['cache'].stats()['caches'].get('reports.summary', {'hits': 0})['hits']
+        income = client.get('/api/accounting/summary?period=week').get_json()['summary']['total_income']
+        return income, app.extensions['cache'].stats()['caches']['reports.summary']['hits'] > before
+    return read
+
+def add_entry(client, amount, date, description=None):
+    response = client.post('/api/accounting/entries', json={
+        'entry_type': 'Income', 'category': 'Sales', 'amount': amount, 'date': date.isoformat(), 'description': description
+    })
+    assert response.status_code == 201
+    return response.get_json()['entry']['id']
+
+def test_write_inside_the_window_invalidates(client, summary):
+    add_entry(client, 10, datetime.utcnow())
+    assert summary() == (10, False)
+    assert summary() == (10, True)
+    add_entry(client, 5, datetime.utcnow() - timedelta(days=2))
+    assert summary() == (15, False)
+
+def test_write_outside_the_window_keeps_it(client, summary):
+    add_entry(client, 10, datetime.utcnow())
+    assert summary() == (10, False)
+    add_entry(client, 50, datetime.utcnow() - timedelta(days=60))
+    assert summary() == (10, True)
+    # So does a write to a collection the summary doesn't read
+    assert client.post('/api/contacts', json={'name': 'Customer'}).status_code == 201
+    assert summary() == (10, True)
+
+def test_description_edit_keeps_it_and_amount_edit_does_not(client, summary):
+    entry_id = add_entry(client, 10, datetime.utcnow(), 'First')
+    assert summary() == (10, False)
+    assert client.put(f'/api/accounting/entries/{entry_id}', json={'description': 'Renamed'}).status_code == 200
+    assert summary() == (10, True)
+    assert client.put(f'/api/accounting/entries/{entry_id}', json={'amount': 12}).status_code == 200
+    assert summary() == (12, False)
+
+def test_moving_an_entry_out_of_the_window_invalidates(client, summary):
+    entry_id = add_entry(client, 10, datetime.utcnow())
+    assert summary() == (10, False)
+    old = (datetime.utcnow() - timedelta(days=60)).isoformat()
+    assert client.put(f'/api/accounting/entries/{entry_id}', json={'date': old}).status_code == 200
+    assert summary() == (0, False)
+
+def test_dashboard_lists_follow_writes(app, client):
+    def dashboard():
+        data = client.get('/api/dashboard?latest=2').get_json()
+        hit = app.extensions['cache'].stats()['caches']['reports.dashboard-lists']['hits']
+        return [contact['name'] for contact in data['latest']['contacts']], len(data['recent_activity']), hit
+
+    assert client.post('/api/contacts', json={'name': 'First'}).status_code == 201
+    assert dashboard() == (['First'], 1, 0)
+    assert dashboard() == (['First'], 1, 1)
+    contact_id = client.post('/api/contacts', json={'name': 'Second'}).get_json()['contact']['id']
+    assert dashboard() == (['Second', 'First'], 2, 1)
+    # An accounting entry on any day shows up in the activity list
+    add_entry(client, 10, datetime.utcnow() - timedelta(days=400))
+    assert dashboard() == (['Second', 'First'], 3, 1)
+    assert client.delete(f'/api/contacts/{contact_id}').status_code == 200
+    assert dashboard() == (['First'], 4, 1)
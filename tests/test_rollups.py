@@ -0,0 +1,59 @@
+import random
+from datetime import datetime, time, timedelta
+import pytest
+from backend.database.models import AccountingEntry
+from backend.database.rollups import rollup_mismatches
+from backend.routes.accounting_routes import accounting_summary
+
+CATEGORIES = ['Sales', 'Services', 'Rent', 'Travel']
+
+def raw_summary(user_id, start_date=None, end_date=None):
+    """accounting_summary() computed by scanning the entries themselves"""
+    by_category = {'Income': {}, 'Expense': {}}
+    for entry in AccountingEntry.query.filter_by(user_id=user_id):
+        if (start_date is None or entry.date >= start_date) and (end_date is None or entry.date <= end_date):
+            totals = by_category[entry.entry_type]
+            totals[entry.category] = totals.get(entry.category, 0) + entry.amount
+    return by_category
+
+def test_rollup_matches_raw_scan(client, user):
+    """
+    Entries created, edited and deleted through the API, then every kind of
+    range: open-ended, whole days, partial days at either end, within one day
+    """
+    rng = random.Random(17)
+    start = datetime(2026, 1, 1)
+    ids = []
+    for n in range(120):
+        response = client.post('/api/accounting/entries', json={
+            'entry_type': rng.choice(['Income', 'Expense']),
+            'category': rng.choice(CATEGORIES),
+            'amount': rng.randint(1, 400) / 4,
+            'date': (start + timedelta(minutes=rng.randrange(60 * 24 * 90))).isoformat(),
+        })
+        assert response.status_code == 201
+        ids.append(response.get_json()['entry']['id'])
+    for entry_id in rng.sample(ids, 30):
+        assert client.put(f'/api/accounting/entries/{entry_id}', json={
+            'amount': rng.randint(1, 400) / 4,
+            'category': rng.choice(CATEGORIES),
+            'date': (start + timedelta(minutes=rng.randrange(60 * 24 * 90))).isoformat(),
+        }).status_code == 200
+    for entry_id in rng.sample(ids, 20):
+        client.delete(f'/api/accounting/entries/{entry_id}')
+
+    ranges = [
+        (None, None),
+        (datetime(2026, 2, 1), None),
+        (None, datetime.combine(datetime(2026, 2, 14), time.max)),
+        (datetime(2026, 1, 10), datetime.combine(datetime(2026, 3, 10), time.max)),
+        (datetime(2026, 1, 10, 13, 30), datetime(2026, 3, 10, 8, 15)),
+        (datetime(2026, 2, 3, 6), datetime(2026, 2, 3, 18)),
+        (datetime(2026, 2, 3, 6), datetime(2026, 2, 4, 5)),
+    ]
+    for start_date, end_date in ranges:
+        summary = accounting_summary(user.id, start_date, end_date)
+        expected = raw_summary(user.id, start_date, end_date)
+        for entry_type, key in (('Income', 'income_by_category'), ('Expense', 'expense_by_category')):
+            assert summary[key] == pytest.approx(expected[entry_type]), (start_date, end_date, entry_type)
+    assert rollup_mismatches(user.id) == []
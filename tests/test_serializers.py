@@ -0,0 +1,63 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from werkzeug.datastructures import MultiDict
+from backend.database.models import db, Contact, Lead, Order, OrderItem, Invoice, Receipt, AccountingEntry, Activity
+from backend.utils.serializers import (
+    CONTACT_FIELDS, LEAD_FIELDS, ORDER_FIELDS, INVOICE_FIELDS, RECEIPT_FIELDS, ENTRY_FIELDS, ACTIVITY_FIELDS
+)
+from .conftest import seed
+
+FIELDSETS = [
+    (CONTACT_FIELDS, Contact),
+    (LEAD_FIELDS, Lead),
+    (ORDER_FIELDS, Order),
+    (INVOICE_FIELDS, Invoice),
+    (RECEIPT_FIELDS, Receipt),
+    (ENTRY_FIELDS, AccountingEntry),
+    (ACTIVITY_FIELDS, Activity),
+]
+
+@pytest.fixture
+def rows(user):
+    """Seeded rows plus ones with NULL columns, missing to-one relations and Decimal amounts"""
+    seed(user, 3)
+    for model in (Contact, Lead, Order, Invoice, Receipt):
+        for obj in model.query.filter_by(user_id=user.id):
+            obj.notes = f'{model.__tablename__} {obj.id}'
+    for entry in AccountingEntry.query.filter_by(user_id=user.id):
+        entry.description = f'entry {entry.id}'
+    bare = Contact(name='No details', user_id=user.id)
+    order = Order(total_amount=Decimal('19.99'), contact=bare, user_id=user.id, notes=None,
+                  items=[OrderItem(product_name='Odd', quantity=3, price=Decimal('6.663333'))])
+    invoice = Invoice(amount=Decimal('1234.56'), due_date=datetime(2026, 2, 28, 23, 59, 59, 999999),
+                      contact=bare, order=None, user_id=user.id)
+    db.session.add_all([
+        bare, order, invoice,
+        Lead(title='Unvalued', value=None, contact=bare, user_id=user.id),
+        Receipt(amount=Decimal('0.01'), payment_method='Card', invoice=invoice, user_id=user.id),
+        AccountingEntry(entry_type='Expense', category='Travel', amount=Decimal('-7.5'), description=None,
+                        date=datetime(2026, 1, 1), user_id=user.id),
+    ])
+    db.session.commit()
+    return user
+
+def selections(fieldset):
+    """(fields, includes) shapes to compare: the default, every include, and a narrowed one"""
+    shapes = [fieldset.select(MultiDict(), []), (fieldset.fields, list(fieldset.includes))]
+    narrowed = {'fields': f'id,{fieldset.fields[-1]}'}
+    if fieldset.includes:
+        narrowed['include'] = next(iter(fieldset.includes))
+    shapes.append(fieldset.select(MultiDict(narrowed)))
+    return shapes
+
+@pytest.mark.parametrize('fieldset, model', FIELDSETS, ids=[model.__tablename__ for _, model in FIELDSETS])
+def test_row_path_matches_object_path(rows, fieldset, model):
+    for fields, includes in selections(fieldset):
+        query = model.query.filter_by(user_id=rows.id).order_by(model.id)
+        db.session.expire_all()
+        objects = query.options(*fieldset.load_options(fields, includes)).all()
+        from_objects = [fieldset.serialize(obj, fields, includes) for obj in objects]
+        from_rows = fieldset.dump_rows(fieldset.project(query, fields, includes).all(), fields, includes)
+        assert from_rows == from_objects, (fields, includes)
+        assert from_rows, 'no rows to compare'
@@ -0,0 +1,74 @@
+import json
+import threading
+import pytest
+from backend.utils.broker import LocalBroker
+
+@pytest.fixture
+def app(app):
+    app.config.update(STREAM_HEARTBEAT=0.05, STREAM_LIFETIME=0.3)
+    return app
+
+def events(response):
+    """The SSE events and comments of a finished stream, as (kind, payload) pairs"""
+    text = b''.join(response.response).decode()
+    response.close()
+    parsed = []
+    for block in text.split('\n\n'):
+        if block.startswith(':'):
+            parsed.append(('comment', block[1:].strip()))
+        elif 'event: change' in block:
+            parsed.append(('change', json.loads(block.split('data: ', 1)[1])))
+    return parsed
+
+def test_local_broker_wakes_waiters_with_newer_messages():
+    broker = LocalBroker()
+    assert broker.wait(1, 0, 0.01) is None
+
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(broker.wait(1, 5, 5)))
+    waiter.start()
+    broker.publish(1, {'seq': 5, 'collections': ['contacts']})
+    broker.publish(2, {'seq': 6, 'collections': ['leads']})
+    broker.publish(1, {'seq': 6, 'collections': ['orders']})
+    waiter.join(5)
+    assert received == [{'seq': 6, 'collections': ['orders']}]
+    # Only newer messages count, and an older one never replaces the latest
+    broker.publish(1, {'seq': 4, 'collections': ['contacts']})
+    assert broker.wait(1, 6, 0.01) is None
+
+def test_stream_sends_committed_changes_and_heartbeats(app, client):
+    response = client.get('/api/stream', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    # Published through the app's LocalBroker when the write commits
+    assert isinstance(app.extensions['broker'], LocalBroker)
+    assert client.post('/api/contacts', json={'name': 'Customer'}).status_code == 201
+
+    received = events(response)
+    changes = [payload for kind, payload in received if kind == 'change']
+    assert len(changes) == 1
+    assert 'contacts' in changes[0]['collections']
+    assert changes[0]['cursor'] == client.get('/api/changes').get_json()['cursor']
+    assert ('comment', 'keep-alive') in received
+
+def test_stream_resumes_from_last_event_id(app, client):
+    assert client.post('/api/contacts', json={'name': 'Customer'}).status_code == 201
+    received = events(client.get('/api/stream', buffered=False, headers={'Last-Event-ID': '0'}))
+    # Behind the feed: told to catch up at once
+    assert received[0][0] == 'change'
+    assert received[0][1]['collections'] == []
+
+def test_open_streams_are_capped_per_process(app, client):
+    app.config['STREAM_MAX_PER_PROCESS'] = 1
+    first = client.get('/api/stream', buffered=False)
+    assert first.status_code == 200
+
+    refused = client.get('/api/stream')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After']
+
+    first.close()
+    again = client.get('/api/stream', buffered=False)
+    assert again.status_code == 200
+    again.close()